@@ -5,12 +5,11 @@
 from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import Message
-from sqlalchemy import select, func
-from datetime import datetime, timedelta
 
-from backend.database import async_session, User, Course, UserCourse, UserProgress
+from backend.database import read_session
 from backend.config import settings
 from backend.admin_bot.filters import AdminFilter
+from backend.services.admin_read_model import get_overview, get_course_table
 
 router = Router()
 
@@ -62,46 +61,16 @@ async def get_stats(message: Message):
     Общая статистика
     """
     
-    async with async_session() as session:
-        # Всего пользователей
-        result = await session.execute(select(func.count(User.id)))
-        total_users = result.scalar()
-        
-        # Новых за сегодня
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        result = await session.execute(
-            select(func.count(User.id)).where(User.created_at >= today)
-        )
-        new_today = result.scalar()
-        
-        # Новых за неделю
-        week_ago = datetime.now() - timedelta(days=7)
-        result = await session.execute(
-            select(func.count(User.id)).where(User.created_at >= week_ago)
-        )
-        new_week = result.scalar()
-        
-        # Всего курсов
-        result = await session.execute(select(func.count(Course.id)))
-        total_courses = result.scalar()
-        
-        # Активных курсов
-        result = await session.execute(
-            select(func.count(Course.id)).where(Course.is_active == True)
-        )
-        active_courses = result.scalar()
-        
-        # Всего записей на курсы
-        result = await session.execute(select(func.count(UserCourse.id)))
-        total_enrollments = result.scalar()
+    async with read_session() as session:
+        stats = await get_overview(session)
     
     stats_text = (
         "📊 <b>Общая статистика</b>\n\n"
-        f"👥 Всего пользователей: {total_users}\n"
-        f"   ├─ Новых за сегодня: {new_today}\n"
-        f"   └─ Новых за неделю: {new_week}\n\n"
-        f"📚 Курсов: {active_courses} / {total_courses} (активных)\n"
-        f"📝 Записей на курсы: {total_enrollments}\n"
+        f"👥 Всего пользователей: {stats.total_users}\n"
+        f"   ├─ Новых за сегодня: {stats.new_today}\n"
+        f"   └─ Новых за неделю: {stats.new_week}\n\n"
+        f"📚 Курсов: {stats.active_courses} / {stats.total_courses} (активных)\n"
+        f"📝 Записей на курсы: {stats.total_enrollments}\n"
     )
     
     await message.answer(stats_text, parse_mode="HTML")
@@ -113,23 +82,12 @@ async def get_analytics(message: Message):
     Детальная аналитика
     """
     
-    async with async_session() as session:
-        # Топ-5 популярных курсов
-        from sqlalchemy import desc
-        result = await session.execute(
-            select(Course.title, func.count(UserCourse.id).label("enrollments"))
-            .join(UserCourse, UserCourse.course_id == Course.id, isouter=True)
-            .group_by(Course.id, Course.title)
-            .order_by(desc("enrollments"))
-            .limit(5)
-        )
-        top_courses = result.all()
-        
-        # Всего пройденных уроков
-        result = await session.execute(
-            select(func.count(UserProgress.id)).where(UserProgress.completed == True)
-        )
-        total_completed = result.scalar()
+    async with read_session() as session:
+        courses = await get_course_table(session)
+        stats = await get_overview(session)
+    
+    # Топ-5 популярных курсов
+    top_courses = sorted(courses, key=lambda c: c.enrollments, reverse=True)[:5]
     
     # Формируем текст
     courses_text = "\n".join([f"   {i+1}. {c.title} - {c.enrollments} записей" for i, c in enumerate(top_courses)])
@@ -137,7 +95,7 @@ async def get_analytics(message: Message):
     analytics_text = (
         "📈 <b>Детальная аналитика</b>\n\n"
         f"🔥 Топ-5 популярных курсов:\n{courses_text}\n\n"
-        f"✅ Всего пройдено уроков: {total_completed}\n"
+        f"✅ Всего пройдено уроков: {stats.completed_lessons}\n"
     )
     
     await message.answer(analytics_text, parse_mode="HTML")
@@ -5,12 +5,12 @@
 from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import Message
-from sqlalchemy import select
 
-from backend.database import async_session, Course
+from backend.database import read_session
 from backend.config import settings
 from backend.admin_bot.filters import AdminFilter
 from backend.database.seed_data import seed_courses, seed_achievements, seed_communities
+from backend.services.admin_read_model import get_course_table, get_course_detail, invalidate_analytics
 
 router = Router()
 
@@ -29,14 +29,9 @@ async def list_courses(message: Message):
     Список всех курсов
     """
     
-    from sqlalchemy import func, select
-    from backend.database.models import Lesson, UserCourse
-    
-    async with async_session() as session:
-        result = await session.execute(
-            select(Course).order_by(Course.created_at.desc())
-        )
-        courses = result.scalars().all()
+    # Курсы с числом уроков и записей - один запрос
+    async with read_session() as session:
+        courses = await get_course_table(session)
     
     if not courses:
         await message.answer("📭 Курсов пока нет")
@@ -44,21 +39,10 @@ async def list_courses(message: Message):
     
     courses_list = []
     for c in courses:
-        # Подсчитываем количество уроков и записей
-        result = await session.execute(
-            select(func.count(Lesson.id)).where(Lesson.course_id == c.id)
-        )
-        lessons_count = result.scalar() or 0
-        
-        result = await session.execute(
-            select(func.count(UserCourse.id)).where(UserCourse.course_id == c.id)
-        )
-        enrollments = result.scalar() or 0
-        
         course_text = (
             f"• <b>{c.title}</b>\n"
             f"  ID: {c.id} | Категория: {c.category}\n"
-            f"  Уроков: {lessons_count} | Записей: {enrollments}\n"
+            f"  Уроков: {c.lessons} | Записей: {c.enrollments}\n"
             f"  {'🔥 Топ' if c.is_top else ''} "
             f"{'✅ Активен' if c.is_active else '❌ Неактивен'}"
         )
@@ -94,41 +78,21 @@ async def get_course_info(message: Message):
         await message.answer("❌ Неверный формат ID курса")
         return
     
-    from sqlalchemy import select, func
-    from backend.database.models import Lesson, UserCourse, UserProgress
+    async with read_session() as session:
+        detail = await get_course_detail(session, course_id)
     
-    async with async_session() as session:
-        result = await session.execute(
-            select(Course).where(Course.id == course_id)
-        )
-        course = result.scalar_one_or_none()
-        
-        if not course:
-            await message.answer(f"❌ Курс с ID {course_id} не найден")
-            return
-        
-        # Получаем уроки
-        result = await session.execute(
-            select(Lesson).where(Lesson.course_id == course_id).order_by(Lesson.order)
-        )
-        lessons = result.scalars().all()
-        
-        # Подсчитываем статистику
-        result = await session.execute(
-            select(func.count(UserCourse.id)).where(UserCourse.course_id == course_id)
-        )
-        enrollments = result.scalar() or 0
-        
-        result = await session.execute(
-            select(func.count(UserProgress.id))
-            .join(Lesson, UserProgress.lesson_id == Lesson.id)
-            .where(Lesson.course_id == course_id, UserProgress.completed == True)
-        )
-        completed_lessons = result.scalar() or 0
+    if not detail:
+        await message.answer(f"❌ Курс с ID {course_id} не найден")
+        return
+    
+    course = detail.course
+    lessons = detail.lessons
+    enrollments = detail.enrollments
+    completed_lessons = detail.completed_lessons
     
     lessons_text = "\n".join([
-        f"  {i+1}. {lesson.title} {'✅' if lesson.is_free else '🔒'}"
-        for i, lesson in enumerate(lessons)
+        f"  {i+1}. {title} {'✅' if is_free else '🔒'}"
+        for i, (title, is_free) in enumerate(lessons)
     ]) if lessons else "  Уроков нет"
     
     course_info = (
@@ -178,6 +142,8 @@ async def create_test_data(message: Message):
     except Exception as e:
         communities_msg = f"❌ Ошибка создания сообществ: {str(e)}"
     
+    invalidate_analytics()
+    
     result = (
         f"📊 <b>Результат создания тестовых данных:</b>\n\n"
         f"{courses_msg}\n"
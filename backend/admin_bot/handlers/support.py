@@ -5,13 +5,17 @@
 from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import Message
-from sqlalchemy import select, desc
+from sqlalchemy import select
 from datetime import datetime
+from html import escape
 
 from backend.database import async_session, SupportTicket, SupportMessage, User
 from backend.config import settings
 from backend.admin_bot.filters import AdminFilter
 from backend.services.notifications import send_notification
+from backend.services.admin_read_model import get_open_tickets, invalidate_support_inbox
+from backend.services.support_inbox import mark_ticket_read, post_message
+from backend.services.support_live import publish_ticket_update
 
 router = Router()
 
@@ -24,39 +28,29 @@ async def list_support_tickets(message: Message):
     """
     Список открытых тикетов поддержки
     """
+    # Тикеты по последней активности с числом непрочитанных - один запрос
     async with async_session() as session:
-        # Получаем открытые тикеты
-        result = await session.execute(
-            select(SupportTicket, User)
-            .join(User, SupportTicket.user_id == User.id)
-            .where(SupportTicket.status == "open")
-            .order_by(desc(SupportTicket.updated_at))
-            .limit(10)
-        )
-        tickets = result.all()
+        tickets = await get_open_tickets(session, limit=10)
     
     if not tickets:
         await message.answer("✅ Нет открытых тикетов поддержки")
         return
     
     tickets_list = []
-    for ticket, user in tickets:
-        # Подсчитываем непрочитанные сообщения
-        result = await session.execute(
-            select(SupportMessage)
-            .where(
-                SupportMessage.ticket_id == ticket.id,
-                SupportMessage.is_from_admin == False,
-                SupportMessage.read_at == None
-            )
-        )
-        unread_count = len(result.scalars().all())
-        
-        unread_badge = f" 🔴 {unread_count}" if unread_count > 0 else ""
+    for ticket in tickets:
+        unread_badge = f" 🔴 {ticket.unread}" if ticket.unread > 0 else ""
+        last_message = ""
+        if ticket.last_message_preview:
+            sender = "👨‍💼" if ticket.last_message_from_admin else "👤"
+            preview = ticket.last_message_preview
+            if len(preview) > 80:
+                preview = preview[:79] + "…"
+            last_message = f"\n  {sender} {escape(preview)}"
         
         tickets_list.append(
-            f"• <b>#{ticket.id}</b> - {user.full_name}{unread_badge}\n"
-            f"  📅 {ticket.updated_at.strftime('%d.%m.%Y %H:%M')}"
+            f"• <b>#{ticket.id}</b> - {ticket.user_full_name}{unread_badge}\n"
+            f"  📅 {ticket.last_message_at.strftime('%d.%m.%Y %H:%M')}"
+            f"{last_message}"
         )
     
     tickets_text = "\n\n".join(tickets_list)
@@ -111,33 +105,13 @@ async def view_ticket(message: Message):
         if len(args) > 1:
             reply_text = " ".join(args[1:])
             
-            # Создаем сообщение от админа
-            admin_message = SupportMessage(
-                ticket_id=ticket.id,
-                user_id=user.id,  # user_id должен быть ID пользователя из тикета
-                message=reply_text,
-                is_from_admin=True,
-                read_at=datetime.now()
-            )
-            session.add(admin_message)
-            
-            # Отмечаем все сообщения пользователя как прочитанные
-            result = await session.execute(
-                select(SupportMessage)
-                .where(
-                    SupportMessage.ticket_id == ticket.id,
-                    SupportMessage.is_from_admin == False,
-                    SupportMessage.read_at == None
-                )
-            )
-            unread_messages = result.scalars().all()
-            for msg in unread_messages:
-                msg.read_at = datetime.now()
-            
-            # Обновляем updated_at тикета
-            ticket.updated_at = datetime.now()
-            
+            # Сообщение от админа; сообщения пользователя помечаются прочитанными
+            # (user_id должен быть ID пользователя из тикета)
+            await post_message(session, ticket.id, user.id, reply_text, is_from_admin=True)
             await session.commit()
+            invalidate_support_inbox()
+            # Открытый чат в Mini App получит ответ сразу
+            await publish_ticket_update(ticket.id)
             
             # Отправляем уведомление пользователю
             try:
@@ -167,11 +141,11 @@ async def view_ticket(message: Message):
         )
         messages = result.scalars().all()
         
-        # Отмечаем все сообщения как прочитанные
-        for msg in messages:
-            if not msg.is_from_admin and not msg.read_at:
-                msg.read_at = datetime.now()
-        await session.commit()
+        # Отмечаем все сообщения как прочитанные - один UPDATE
+        if ticket.unread_count:
+            await mark_ticket_read(session, ticket.id)
+            await session.commit()
+            invalidate_support_inbox()
         
         # Формируем текст с сообщениями
         messages_text = []
@@ -250,6 +224,8 @@ async def close_ticket(message: Message):
         ticket.status = "closed"
         ticket.updated_at = datetime.now()
         await session.commit()
+        invalidate_support_inbox()
+        await publish_ticket_update(ticket.id)
         
         # Уведомляем пользователя
         try:
@@ -10,6 +10,7 @@ from sqlalchemy import select
 from datetime import datetime
 
 from backend.database import async_session, User, Course, UserCourse
+from backend.services.read_model import CatalogSnapshot, catalog, get_user_snapshot, is_registered
 
 router = Router()
 
@@ -31,6 +32,20 @@ async def cmd_help(message: Message):
     await message.answer(help_text, parse_mode="HTML")
 
 
+NOT_REGISTERED_TEXT = (
+    "❌ Ты ещё не зарегистрирован!\n\n"
+    "Нажми /start чтобы начать 🚀"
+)
+
+# Эмодзи для категорий
+CATEGORY_EMOJIS = {
+    "Маникюр и педикюр": "💅",
+    "Ресницы и брови": "👁",
+    "Подология": "🦶",
+    "Своё дело": "💼",
+}
+
+
 @router.message(Command("profile"))
 async def cmd_profile(message: Message):
     """
@@ -38,18 +53,12 @@ async def cmd_profile(message: Message):
     """
     telegram_id = message.from_user.id
     
-    # Получаем пользователя из БД
+    # Профиль и статистика одним запросом
     async with async_session() as session:
-        result = await session.execute(
-            select(User).where(User.telegram_id == telegram_id)
-        )
-        user = result.scalar_one_or_none()
+        user = await get_user_snapshot(session, telegram_id)
     
     if not user:
-        await message.answer(
-            "❌ Ты ещё не зарегистрирован!\n\n"
-            "Нажми /start чтобы начать 🚀"
-        )
+        await message.answer(NOT_REGISTERED_TEXT)
         return
     
     # Проверяем формат created_at для диагностики
@@ -95,59 +104,14 @@ async def cmd_profile(message: Message):
     await message.answer(profile_text, parse_mode="HTML")
 
 
-@router.message(Command("courses"))
-async def cmd_courses(message: Message):
+def render_courses_text(snapshot: CatalogSnapshot) -> str:
     """
-    Команда /courses - список всех курсов
+    Текст списка курсов по категориям (кешируется на версию каталога)
     """
-    telegram_id = message.from_user.id
-    
-    # Проверяем, зарегистрирован ли пользователь
-    async with async_session() as session:
-        result = await session.execute(
-            select(User).where(User.telegram_id == telegram_id)
-        )
-        user = result.scalar_one_or_none()
-        
-        if not user:
-            await message.answer(
-                "❌ Ты ещё не зарегистрирован!\n\n"
-                "Нажми /start чтобы начать 🚀"
-            )
-            return
-        
-        # Получаем все курсы
-        result = await session.execute(select(Course).order_by(Course.category, Course.title))
-        courses = result.scalars().all()
-    
-    if not courses:
-        await message.answer(
-            "📚 <b>Курсы пока не добавлены</b>\n\n"
-            "Скоро здесь появятся крутые курсы!",
-            parse_mode="HTML"
-        )
-        return
-    
-    # Группируем курсы по категориям
-    courses_by_category = {}
-    for course in courses:
-        if course.category not in courses_by_category:
-            courses_by_category[course.category] = []
-        courses_by_category[course.category].append(course)
-    
-    # Формируем текст сообщения
     message_text = "<b>📚 Доступные курсы:</b>\n\n"
     
-    # Эмодзи для категорий
-    category_emojis = {
-        "Маникюр и педикюр": "💅",
-        "Ресницы и брови": "👁",
-        "Подология": "🦶",
-        "Своё дело": "💼",
-    }
-    
-    for category, category_courses in courses_by_category.items():
-        emoji = category_emojis.get(category, "📖")
+    for category, category_courses in snapshot.by_category.items():
+        emoji = CATEGORY_EMOJIS.get(category, "📖")
         message_text += f"\n{emoji} <b>{category}</b>\n"
         
         for course in category_courses:
@@ -168,7 +132,30 @@ async def cmd_courses(message: Message):
     message_text += (
         "\n<i>Чтобы записаться на курс, открой приложение через /start</i>"
     )
+    return message_text
+
+
+@router.message(Command("courses"))
+async def cmd_courses(message: Message):
+    """
+    Команда /courses - список всех курсов
+    """
+    # Проверяем, зарегистрирован ли пользователь
+    if not await is_registered(message.from_user.id):
+        await message.answer(NOT_REGISTERED_TEXT)
+        return
+    
+    snapshot = await catalog.get()
+    
+    if snapshot.is_empty:
+        await message.answer(
+            "📚 <b>Курсы пока не добавлены</b>\n\n"
+            "Скоро здесь появятся крутые курсы!",
+            parse_mode="HTML"
+        )
+        return
     
+    message_text = catalog.render(snapshot, "courses", render_courses_text)
     await message.answer(message_text, parse_mode="HTML")
 
 
@@ -177,55 +164,21 @@ async def cmd_stats(message: Message):
     """
     Команда /stats - статистика обучения (бонусная)
     """
-    telegram_id = message.from_user.id
-    
     async with async_session() as session:
-        result = await session.execute(
-            select(User).where(User.telegram_id == telegram_id)
-        )
-        user = result.scalar_one_or_none()
-        
-        if not user:
-            await message.answer(
-                "❌ Ты ещё не зарегистрирован!\n\n"
-                "Нажми /start чтобы начать 🚀"
-            )
-            return
-    
-    from sqlalchemy import func
-    from backend.database.models import UserCourse, UserProgress, UserAchievement
+        user = await get_user_snapshot(session, message.from_user.id)
     
-    # Подсчитываем статистику
-    result = await session.execute(
-        select(func.count(UserCourse.id)).where(UserCourse.user_id == user.id)
-    )
-    total_courses = result.scalar() or 0
-    
-    result = await session.execute(
-        select(func.count(UserCourse.id))
-        .where(UserCourse.user_id == user.id, UserCourse.is_completed == True)
-    )
-    completed_courses = result.scalar() or 0
-    
-    result = await session.execute(
-        select(func.count(UserProgress.id))
-        .where(UserProgress.user_id == user.id, UserProgress.completed == True)
-    )
-    completed_lessons = result.scalar() or 0
-    
-    result = await session.execute(
-        select(func.count(UserAchievement.id)).where(UserAchievement.user_id == user.id)
-    )
-    achievements_count = result.scalar() or 0
+    if not user:
+        await message.answer(NOT_REGISTERED_TEXT)
+        return
     
     stats_text = (
         f"<b>📊 Твоя статистика</b>\n\n"
         f"🏆 Баллов заработано: {user.points}\n"
-        f"📚 Курсов записано: {total_courses}\n"
-        f"   ├─ Завершено: {completed_courses}\n"
-        f"   └─ В процессе: {total_courses - completed_courses}\n"
-        f"✅ Уроков завершено: {completed_lessons}\n"
-        f"🏅 Достижений получено: {achievements_count}\n\n"
+        f"📚 Курсов записано: {user.total_courses}\n"
+        f"   ├─ Завершено: {user.completed_courses}\n"
+        f"   └─ В процессе: {user.total_courses - user.completed_courses}\n"
+        f"✅ Уроков завершено: {user.completed_lessons}\n"
+        f"🏅 Достижений получено: {user.achievements}\n\n"
         f"<i>Продолжай обучение чтобы улучшить показатели!</i>"
     )
     
@@ -278,6 +231,7 @@ async def cmd_free8(message: Message):
             session.add(test_course)
             await session.commit()
             await session.refresh(test_course)
+            catalog.invalidate()
             
             all_courses = [test_course]
             
@@ -10,6 +10,7 @@ from sqlalchemy import select
 
 from backend.database import async_session, User
 from backend.config import get_webapp_url
+from backend.services.read_model import is_registered
 
 router = Router()
 
@@ -113,16 +114,8 @@ async def callback_my_courses(callback: CallbackQuery):
     Обработчик кнопки "Мои курсы"
     Открывает Mini App на странице курсов
     """
-    telegram_id = callback.from_user.id
-    
-    # Проверяем, зарегистрирован ли пользователь
-    async with async_session() as session:
-        result = await session.execute(
-            select(User).where(User.telegram_id == telegram_id)
-        )
-        user = result.scalar_one_or_none()
-    
-    if not user:
+    # Проверяем, зарегистрирован ли пользователь (кешируется)
+    if not await is_registered(callback.from_user.id):
         await callback.answer("❌ Ты ещё не зарегистрирован! Нажми /start", show_alert=True)
         return
     
@@ -158,16 +151,8 @@ async def callback_my_profile(callback: CallbackQuery):
     Обработчик кнопки "Профиль"
     Открывает Mini App на странице профиля
     """
-    telegram_id = callback.from_user.id
-    
-    # Проверяем, зарегистрирован ли пользователь
-    async with async_session() as session:
-        result = await session.execute(
-            select(User).where(User.telegram_id == telegram_id)
-        )
-        user = result.scalar_one_or_none()
-    
-    if not user:
+    # Проверяем, зарегистрирован ли пользователь (кешируется)
+    if not await is_registered(callback.from_user.id):
         await callback.answer("❌ Ты ещё не зарегистрирован! Нажми /start", show_alert=True)
         return
     
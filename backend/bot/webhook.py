@@ -0,0 +1,213 @@
+"""
+Webhook-режим основного бота (BOT_MODE=webhook)
+
+Апдейты принимает эндпоинт WEBHOOK_PATH внутри FastAPI-приложения:
+- заголовок X-Telegram-Bot-Api-Secret-Token сверяется с секретом
+- апдейт кладётся в очередь, Telegram сразу получает 200
+- WEBHOOK_MAX_CONCURRENCY воркеров обрабатывают очередь параллельно
+
+Очередь сглаживает всплески (после рассылки все разом жмут кнопки).
+Если она переполнена - отвечаем 503, и Telegram повторит доставку позже.
+Каждый воркер API держит свою очередь, так что бот масштабируется вместе с API;
+FSM и изоляция чатов общие через Redis (см. backend/utils/fsm_storage.py).
+Без Redis у каждого воркера своё FSM - при нескольких воркерах gunicorn
+шаги регистрации разъезжались бы по процессам, поэтому такой запуск
+запрещён (один процесс run_api.py без Redis допустим).
+
+Webhook регистрируется заново, если изменились адрес, секрет или типы
+апдейтов: секрет Telegram не возвращает, поэтому отпечаток набора
+хранится в Redis (без Redis - один процесс, setWebhook при каждом старте).
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+from typing import Optional
+
+from fastapi import FastAPI, Request, Response
+
+from backend.config import settings
+from backend.utils.metrics import Counter, Gauge, register
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+DRAIN_TIMEOUT = 10.0
+FINGERPRINT_KEY = "bot:webhook:fingerprint"
+
+webhook_updates = register(Counter(
+    "telegram_webhook_updates_total", "Апдейты, принятые webhook-эндпоинтом",
+    ("result",),
+))
+
+
+def webhook_secret() -> str:
+    """Секрет webhook: явный или производный от токена (одинаковый во всех воркерах)"""
+    if settings.WEBHOOK_SECRET:
+        return settings.WEBHOOK_SECRET
+    return hashlib.sha256(f"webhook:{settings.BOT_TOKEN}".encode()).hexdigest()
+
+
+def webhook_url() -> str:
+    base = settings.WEBHOOK_BASE_URL or settings.BACKEND_URL
+    return base.rstrip("/") + settings.WEBHOOK_PATH
+
+
+def webhook_fingerprint(url: str, allowed_updates: list[str]) -> str:
+    """Отпечаток параметров setWebhook: меняется вместе с адресом, секретом и типами апдейтов"""
+    payload = "\n".join([url, webhook_secret(), ",".join(sorted(allowed_updates))])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def register_webhook(bot, allowed_updates: list[str]) -> None:
+    """setWebhook, если зарегистрированный webhook отличается от текущих настроек"""
+    from backend.utils.redis_client import get_redis
+
+    url = webhook_url()
+    fingerprint = webhook_fingerprint(url, allowed_updates)
+    redis = get_redis()
+    if redis is not None:
+        info = await bot.get_webhook_info()
+        if info.url == url and await redis.get(FINGERPRINT_KEY) == fingerprint:
+            return
+    await bot.set_webhook(url, secret_token=webhook_secret(), allowed_updates=allowed_updates)
+    if redis is not None:
+        await redis.set(FINGERPRINT_KEY, fingerprint)
+    logger.info("✅ Webhook бота установлен: %s (%s)", url, ", ".join(allowed_updates))
+
+
+class WebhookUpdateProcessor:
+    """Очередь апдейтов и пул обработчиков"""
+
+    def __init__(self, bot, dispatcher, concurrency: int, queue_size: int):
+        self.bot = bot
+        self.dispatcher = dispatcher
+        self.concurrency = concurrency
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._workers: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"webhook-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    def submit(self, update) -> bool:
+        """Поставить апдейт в очередь; False - очередь переполнена"""
+        try:
+            self.queue.put_nowait(update)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            update = await self.queue.get()
+            try:
+                await self.dispatcher.feed_update(self.bot, update)
+            except Exception:
+                logger.error("❌ Ошибка обработки апдейта %s", update.update_id, exc_info=True)
+            finally:
+                self.queue.task_done()
+
+    async def stop(self, timeout: float = DRAIN_TIMEOUT) -> None:
+        """Дообработать очередь (не дольше timeout) и остановить обработчики"""
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ Webhook: не обработано %s апдейтов при остановке", self.queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+
+_processor: Optional[WebhookUpdateProcessor] = None
+
+
+def _queue_size() -> dict:
+    return {(): _processor.queue.qsize()} if _processor is not None else {}
+
+
+register(Gauge("telegram_webhook_queue_size", "Апдейты в очереди webhook", (), _queue_size))
+
+
+def setup_bot_webhook(app: FastAPI) -> None:
+    """
+    Подключить эндпоинт webhook основного бота к приложению FastAPI
+
+    Обработчики запускает start_bot_webhook() (после инициализации БД в startup).
+    """
+    from aiogram.types import Update
+    from backend.utils.fsm_storage import fsm_storage_shared
+
+    if settings.api_processes > 1 and not fsm_storage_shared():
+        raise RuntimeError(
+            f"BOT_MODE=webhook при {settings.api_processes} воркерах API требует FSM в Redis "
+            "(REDIS_HOST и FSM_STORAGE=auto|redis): иначе у каждого воркера своё состояние диалогов. "
+            "Задайте REDIS_HOST или запустите API с одним воркером (API_WORKERS=1)"
+        )
+
+    secret = webhook_secret()
+
+    @app.post(settings.WEBHOOK_PATH, include_in_schema=False)
+    async def telegram_webhook(request: Request):
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), secret):
+            webhook_updates.inc(1, "forbidden")
+            return Response(status_code=403)
+        if _processor is None:
+            webhook_updates.inc(1, "unavailable")
+            return Response(status_code=503)
+
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": _processor.bot})
+        except ValueError:
+            # Битый JSON или не апдейт (ValidationError - тоже ValueError)
+            webhook_updates.inc(1, "invalid")
+            return Response(status_code=400)
+        if not _processor.submit(update):
+            webhook_updates.inc(1, "queue_full")
+            logger.warning("⚠️ Webhook: очередь переполнена, апдейт %s вернётся позже", update.update_id)
+            return Response(status_code=503)
+        webhook_updates.inc(1, "accepted")
+        return Response(status_code=200)
+
+
+async def start_bot_webhook() -> None:
+    """Создать бота и диспетчер, запустить обработчики очереди и зарегистрировать webhook"""
+    global _processor
+    from aiogram import Bot, Dispatcher
+    from backend.bot.bot import setup_bot_handlers
+    from backend.utils.fsm_storage import create_fsm_storage, create_events_isolation
+    from backend.utils.metrics import install_telegram_metrics
+
+    bot = Bot(token=settings.BOT_TOKEN)
+    install_telegram_metrics(bot)
+    storage = create_fsm_storage("bot")
+    dp = Dispatcher(storage=storage, events_isolation=create_events_isolation(storage))
+    setup_bot_handlers(dp)
+    await dp.emit_startup(bot=bot)
+
+    _processor = WebhookUpdateProcessor(
+        bot, dp, settings.WEBHOOK_MAX_CONCURRENCY, settings.WEBHOOK_QUEUE_SIZE
+    )
+    _processor.start()
+
+    # Этот код выполняет каждый воркер API - регистрируем webhook, только если он изменился
+    try:
+        await register_webhook(bot, dp.resolve_used_update_types())
+    except Exception:
+        logger.error("❌ Не удалось установить webhook бота", exc_info=True)
+
+
+async def stop_bot_webhook() -> None:
+    """Дообработать очередь и закрыть бота и хранилище FSM"""
+    global _processor
+    if _processor is None:
+        return
+    processor, _processor = _processor, None
+    await processor.stop()
+    # Webhook не удаляем: остальные воркеры и новый деплой продолжают принимать апдейты
+    await processor.dispatcher.emit_shutdown(bot=processor.bot)
+    await processor.bot.session.close()
+    await processor.dispatcher.storage.close()
@@ -3,6 +3,8 @@
 Загружает переменные окружения из .env файла
 """
 
+import os
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List
 from dotenv import load_dotenv
@@ -27,6 +29,18 @@ class Settings(BaseSettings):
             return []
         return [int(id.strip()) for id in self.ADMIN_IDS.split(',') if id.strip()]
     
+    # Режим основного бота: polling (отдельный процесс) или webhook (внутри API)
+    BOT_MODE: str = "polling"
+    WEBHOOK_BASE_URL: str = ""  # Публичный HTTPS-адрес API; пусто = BACKEND_URL
+    WEBHOOK_PATH: str = "/webhook/bot"
+    WEBHOOK_SECRET: str = ""  # Пусто = производный от BOT_TOKEN
+    WEBHOOK_MAX_CONCURRENCY: int = 32  # Апдейты в обработке одновременно (на воркер API)
+    WEBHOOK_QUEUE_SIZE: int = 1000  # Очередь апдейтов на воркер; при переполнении - 503 и повтор от Telegram
+    
+    @property
+    def bot_webhook_enabled(self) -> bool:
+        return self.BOT_MODE.lower() == "webhook" and bool(self.BOT_TOKEN)
+    
     # ========================================
     # Database
     # ========================================
@@ -61,10 +75,38 @@ class Settings(BaseSettings):
         # Иначе используем отдельные параметры
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
     
+    # Read-реплика (опционально): каталог, лидборд, аналитика, отзывы
+    DATABASE_REPLICA_URL: str = ""
+    READ_YOUR_WRITES_SECONDS: int = 5  # После записи пользователь читает с primary N секунд
+    
+    @property
+    def database_replica_url(self) -> str:
+        """Строка подключения к реплике (async) или пустая строка"""
+        url = self.DATABASE_REPLICA_URL
+        if not url or url.startswith("${"):
+            return ""
+        if url.startswith("postgresql://"):
+            return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+        return url
+    
+    # Пул соединений (PostgreSQL)
+    DB_POOL_SIZE: int = 10  # Постоянные соединения на процесс
+    DB_MAX_OVERFLOW: int = 20  # Дополнительные соединения сверх pool_size
+    DB_POOL_TIMEOUT: float = 30.0  # Сколько ждать свободное соединение (сек)
+    DB_POOL_RECYCLE: int = 3600  # Пересоздавать соединения старше N секунд
+    DB_STATEMENT_CACHE_SIZE: int = 100  # Кеш prepared statements asyncpg (0 = выключен)
+    DB_COMMAND_TIMEOUT: float = 60.0  # Таймаут одного запроса asyncpg (сек)
+    DB_SCHEMA_CHECK_INTERVAL: int = 60  # Как часто проверять alembic_version (сек, 0 = не проверять)
+    # Миграции при старте API: upgrade - применить недостающие под advisory lock,
+    # check - только предупредить, off - не проверять (миграции делает release-шаг)
+    MIGRATIONS_ON_STARTUP: str = "upgrade"
+    
     # ========================================
     # Redis (опционально)
     # ========================================
-    REDIS_HOST: str = "localhost"
+    # Пусто = Redis не используется: общее состояние (read-your-writes, блокировки)
+    # живёт в памяти процесса - подходит только для одного воркера API
+    REDIS_HOST: str = ""
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str = ""
     REDIS_DB: int = 0
@@ -76,11 +118,33 @@ class Settings(BaseSettings):
             return f"redis://:{self.REDIS_PASSWORD}@{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
     
+    @property
+    def redis_enabled(self) -> bool:
+        return bool(self.REDIS_HOST)
+    
+    # FSM-хранилище ботов: auto (Redis, если задан REDIS_HOST, иначе память),
+    # memory, redis или fakeredis (для тестов, нужен пакет fakeredis)
+    FSM_STORAGE: str = "auto"
+    FSM_STATE_TTL: int = 24 * 60 * 60  # Незавершённая регистрация живёт сутки
+    FSM_DATA_TTL: int = 24 * 60 * 60
+    
     # ========================================
     # FastAPI
     # ========================================
     API_PORT: int = 8000
     PORT: int = 8000  # Railway использует PORT переменную
+    API_WORKERS: int = 2  # Воркеры gunicorn (gunicorn.conf.py), WEB_CONCURRENCY имеет приоритет
+    
+    @property
+    def api_workers(self) -> int:
+        """Число процессов API (WEB_CONCURRENCY - стандартная переменная PaaS)"""
+        return int(os.getenv("WEB_CONCURRENCY", self.API_WORKERS))
+    
+    @property
+    def api_processes(self) -> int:
+        """Фактическое число процессов API: gunicorn передаёт его воркерам (post_fork), run_api.py - один"""
+        return int(os.getenv("API_PROCESSES", 1))
+    
     FRONTEND_URL: str = "http://localhost:5173"  # Vite dev сервер
     WEBAPP_URL: str = "http://localhost:5173"  # URL для Mini App (в продакшене будет https://yourdomain.com)
     BACKEND_URL: str = "http://localhost:8000"
@@ -88,12 +152,25 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"  # development / production
     DEV_MODE: bool = True  # Режим разработки - позволяет работать без Telegram initData
     DEV_TELEGRAM_ID: int = 310836227  # Telegram ID для локальной разработки (админ по умолчанию)
+    HTTP_CACHE_MAX_AGE: int = 60  # max-age для публичных справочных ответов (каталог, сообщества)
+    HTTP_CACHE_VERSION_INTERVAL: int = 30  # Как часто воркер сверяет версию данных для ETag (сек)
+    RESPONSE_COMPRESS_MIN_SIZE: int = 1024  # Сжимать (gzip/brotli) ответы от этого размера (байт)
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 4  # 4-5 - баланс скорости и степени сжатия для динамических ответов
+    RESPONSE_CACHE_ENTRIES: int = 256  # Готовых (закодированных) ответов в памяти воркера
+    FAVORITES_CACHE_TTL: int = 300  # Кеш id избранных курсов пользователя (сек), сбрасывается при изменениях
     
     # ========================================
     # File Storage
     # ========================================
     LOCAL_STORAGE_PATH: str = "./uploads"
     
+    # Подписанные ссылки на медиа уроков из LOCAL_STORAGE_PATH (backend/webapp/media.py)
+    MEDIA_SIGNING_KEY: str = ""  # Пусто = производный от SECRET_KEY
+    MEDIA_URL_TTL: int = 6 * 60 * 60  # Срок действия ссылки (сек)
+    MEDIA_BASE_URL: str = ""  # Адрес, с которого отдаются медиа (CDN/nginx); пусто = BACKEND_URL
+    MEDIA_ACCEL_REDIRECT: str = ""  # internal location nginx (например /protected-media); пусто = файл отдаёт API
+    
     # S3 (опционально)
     S3_ENDPOINT: str = ""
     S3_BUCKET: str = ""
@@ -107,11 +184,60 @@ class Settings(BaseSettings):
     YUKASSA_SHOP_ID: str = ""  # Получить в личном кабинете ЮKassa
     YUKASSA_SECRET_KEY: str = ""  # Получить в личном кабинете ЮKassa
     YUKASSA_RETURN_URL: str = ""  # URL для возврата после оплаты (например: https://yourdomain.com/payment/success)
+    YUKASSA_API_URL: str = "https://api.yookassa.ru/v3"  # API ЮKassa (другой адрес - для тестового стенда)
+    # Сверка зависших pending-платежей с ЮKassa (backend/services/payment_reconciliation/)
+    PAYMENT_RECONCILE_INTERVAL: int = 300  # Период сверки (сек, 0 = выключена)
+    PAYMENT_RECONCILE_STALE_AFTER: int = 600  # Сверяются платежи в pending дольше N секунд
+    PAYMENT_RECONCILE_MAX_AGE: int = 259200  # Сверяются pending не старше N секунд (статус старых не меняется)
+    PAYMENT_RECONCILE_PAGE_SIZE: int = 200  # Платежей в одной пачке (одна транзакция)
+    PAYMENT_RECONCILE_CONCURRENCY: int = 8  # Одновременных запросов к ЮKassa
+    PAYMENT_RECONCILE_RATE_LIMIT: float = 10.0  # Запросов к ЮKassa в секунду
     
     # ========================================
     # Logging
     # ========================================
     LOG_LEVEL: str = "INFO"  # DEBUG, INFO, WARNING, ERROR, CRITICAL
+    LOG_FORMAT: str = "auto"  # json / text / auto (json в production)
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0  # Доля DEBUG-записей, попадающих в лог (0.0-1.0)
+    
+    # ========================================
+    # Metrics (Prometheus, /metrics)
+    # ========================================
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""  # /metrics требует Authorization: Bearer <token>; без токена открыт только в development
+    METRICS_QUERY_COUNT_THRESHOLD: int = 20  # Логировать запросы с большим числом SQL (0 = выключено)
+    
+    # ========================================
+    # Admin analytics
+    # ========================================
+    ANALYTICS_CACHE_TTL: int = 30  # Кеш статистики админки (сек, 0 = без кеша)
+    SUPPORT_INBOX_CACHE_TTL: int = 5  # Кеш списка тикетов для админ-бота (сек)
+    ADMIN_EXPORT_CONCURRENCY: int = 2  # Одновременных выгрузок (= соединений их пула) на процесс
+    ADMIN_EXPORT_BATCH_SIZE: int = 2000  # Строк за одну выборку курсора выгрузки
+    
+    # ========================================
+    # Support notifications (уведомления админов о тикетах)
+    # ========================================
+    SUPPORT_NOTIFY_CONCURRENCY: int = 8  # Параллельных отправок в Telegram
+    SUPPORT_NOTIFY_QUEUE_SIZE: int = 1000
+    SUPPORT_NOTIFY_DIGEST_WINDOW: float = 30.0  # Сообщения тикета за это время уходят одним дайджестом (сек)
+    SUPPORT_NOTIFY_DIGEST_SIZE: int = 5  # Отправить дайджест раньше, если набралось столько сообщений
+    SUPPORT_NOTIFY_RETRIES: int = 3  # Попыток отправки каждому админу
+    SUPPORT_LIVE_TIMEOUT: int = 25  # Максимальное ожидание long-poll чата поддержки (сек)
+    SUPPORT_LIVE_RECHECK: float = 3.0  # Перепроверка БД при ожидании, если Redis не настроен (сек)
+    
+    # ========================================
+    # Lesson watch time (heartbeat плеера)
+    # ========================================
+    WATCH_TIME_FLUSH_INTERVAL: float = 5.0  # Как часто буфер просмотров пишется в БД (сек)
+    WATCH_TIME_MAX_HEARTBEAT: int = 60  # Больше этого за один heartbeat не засчитывается (сек)
+    WATCH_TIME_MAX_KEYS: int = 50000  # Пар (пользователь, урок) в буфере до досрочной записи
+    
+    # ========================================
+    # Course recommendations (совместные записи на курсы)
+    # ========================================
+    RECOMMENDATIONS_BUILD_HOUR: int = 4  # Час ежесуточного пересчёта модели (по TIMEZONE)
+    RECOMMENDATIONS_TOP_K: int = 10  # Соседей на курс в модели
     
     # ========================================
     # Misc
@@ -2,7 +2,7 @@
 Модуль работы с базой данных
 """
 
-from backend.database.database import get_engine, get_async_session, Base, get_session, engine, async_session
+from backend.database.database import get_engine, get_async_session, Base, get_session, get_read_session, read_session, engine, async_session
 from backend.database.models import (
     User,
     Course,
@@ -27,6 +27,8 @@ __all__ = [
     "async_session",
     "Base",
     "get_session",
+    "get_read_session",
+    "read_session",
     "User",
     "Course",
     "Lesson",
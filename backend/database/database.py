@@ -3,12 +3,16 @@
 Использует SQLAlchemy 2.0 с async поддержкой
 """
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker, AsyncEngine
 from sqlalchemy.orm import declarative_base
 from typing import AsyncGenerator, Optional
 import asyncio
 
 from backend.config import settings
+from backend.database.pool import InstrumentedQueuePool, install_schema_version_guard
+from backend.database.routing import request_user_key, has_recent_write_shared
+from backend.utils.metrics import install_query_metrics
 
 
 # ========================================
@@ -18,65 +22,96 @@ from backend.config import settings
 # Это гарантирует, что они создаются в правильном event loop
 _engine: Optional[AsyncEngine] = None
 _async_session: Optional[async_sessionmaker] = None
+# Опциональная read-реплика (DATABASE_REPLICA_URL)
+_replica_engine: Optional[AsyncEngine] = None
+_replica_session: Optional[async_sessionmaker] = None
+# Выгрузки админа - отдельный маленький пул (создаётся при первой выгрузке)
+_export_engine: Optional[AsyncEngine] = None
 
 
-def create_engine_and_session():
+def _build_engine(
+    db_url: str,
+    application_name: str,
+    pool_name: str = "primary",
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+) -> AsyncEngine:
     """
-    Создать engine и session factory
-    ДОЛЖНО вызываться только в startup_event FastAPI!
+    Создать engine с настройками пула из Settings (pool_size/max_overflow - свои для пула)
     """
-    global _engine, _async_session
-    
-    print("🔧 Создание engine и session factory...")
-    
-    # КРИТИЧНО: Очищаем метаданные Base перед созданием engine
-    # Это гарантирует, что SQLAlchemy перечитает структуру моделей
-    # Очищаем ДО импорта моделей, чтобы они зарегистрировались заново
-    Base.metadata.clear()
-    # Теперь импортируем модели - они автоматически зарегистрируются в Base.metadata
-    from backend.database.models import User, Course, Lesson, UserCourse, UserProgress, Achievement, UserAchievement, Community, Payment, Certificate, Favorite, Review, Challenge, UserChallenge, SupportTicket, SupportMessage
-    
-    # Параметры для разных типов БД
-    db_url = settings.database_url
-    is_sqlite = db_url.startswith("sqlite")
-    
-    if is_sqlite:
+    if db_url.startswith("sqlite"):
         # SQLite для локальной разработки
-        _engine = create_async_engine(
+        db_engine = create_async_engine(
             db_url,
             echo=settings.ENVIRONMENT == "development",
             future=True,
             connect_args={"check_same_thread": False}  # Для SQLite
         )
-    else:
-        # PostgreSQL для продакшена
-        # Важно: statement_cache_size передается через connect_args для asyncpg
-        # Это отключает кеширование prepared statements, что решает проблему
-        # когда структура таблицы изменилась, но asyncpg использует закешированный statement
-        _engine = create_async_engine(
-            db_url,
-            echo=settings.ENVIRONMENT == "development",
-            future=True,
-            pool_size=10,
-            max_overflow=20,
-            pool_pre_ping=True,
-            pool_recycle=3600,
-            pool_reset_on_return='commit',  # Сбрасываем соединения при возврате в пул
-            connect_args={
-                "server_settings": {
-                    "application_name": "beauty_school_api"
-                },
-                "statement_cache_size": 0  # Отключаем кеш prepared statements в asyncpg
-            }
-        )
+        install_query_metrics(db_engine)
+        return db_engine
     
-    _async_session = async_sessionmaker(
-        _engine,
+    # PostgreSQL для продакшена
+    # Prepared statements asyncpg включены (DB_STATEMENT_CACHE_SIZE).
+    # Защита от устаревших statements после миграции - install_schema_version_guard:
+    # при смене alembic_version соединения со старым кешем отбрасываются
+    db_engine = create_async_engine(
+        db_url,
+        echo=settings.ENVIRONMENT == "development",
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE if pool_size is None else pool_size,
+        max_overflow=settings.DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_reset_on_return='commit',  # Сбрасываем соединения при возврате в пул
+        connect_args={
+            "server_settings": {
+                "application_name": application_name
+            },
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT,
+        }
+    )
+    db_engine.pool.stats.name = pool_name
+    install_schema_version_guard(db_engine)
+    install_query_metrics(db_engine)
+    return db_engine
+
+
+def _build_sessionmaker(db_engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(
+        db_engine,
         class_=AsyncSession,
         expire_on_commit=False,  # Объекты не истекают после commit
         autoflush=False,
         autocommit=False,
     )
+
+
+def create_engine_and_session():
+    """
+    Создать engine и session factory (+ реплику, если задан DATABASE_REPLICA_URL)
+    ДОЛЖНО вызываться только в startup_event FastAPI!
+    """
+    global _engine, _async_session, _replica_engine, _replica_session
+    
+    print("🔧 Создание engine и session factory...")
+    
+    # Импортируем модели, чтобы они гарантированно были зарегистрированы в Base.metadata
+    # (Base.metadata.clear() здесь не нужен: повторный импорт модуля не перерегистрирует модели,
+    # и очистка оставляла metadata пустой)
+    import backend.database.models  # noqa: F401
+    
+    _engine = _build_engine(settings.database_url, "beauty_school_api")
+    _async_session = _build_sessionmaker(_engine)
+    
+    # Реплика только для чтения (каталог, лидборд, аналитика, отзывы)
+    replica_url = settings.database_replica_url
+    if replica_url:
+        _replica_engine = _build_engine(replica_url, "beauty_school_api_replica", pool_name="replica")
+        _replica_session = _build_sessionmaker(_replica_engine)
+        print("✅ Read-реплика подключена")
     
     print("✅ Engine и session factory созданы")
 
@@ -92,6 +127,39 @@ def get_engine() -> AsyncEngine:
     return _engine
 
 
+def get_replica_engine() -> Optional[AsyncEngine]:
+    """
+    Engine read-реплики или None, если DATABASE_REPLICA_URL не задан
+    """
+    return _replica_engine
+
+
+def get_export_engine() -> AsyncEngine:
+    """
+    Engine для потоковых выгрузок админа
+
+    Свой пул на ADMIN_EXPORT_CONCURRENCY соединений (к реплике, если она есть):
+    долгие выгрузки не занимают соединения API и бота.
+    """
+    global _export_engine
+    if _export_engine is None:
+        _export_engine = _build_engine(
+            settings.database_replica_url or settings.database_url,
+            "beauty_school_api_export",
+            pool_name="export",
+            pool_size=settings.ADMIN_EXPORT_CONCURRENCY,
+            max_overflow=0,
+        )
+    return _export_engine
+
+
+async def close_export_engine() -> None:
+    global _export_engine
+    if _export_engine is not None:
+        await _export_engine.dispose()
+        _export_engine = None
+
+
 def get_async_session() -> async_sessionmaker:
     """
     Получить фабрику сессий
@@ -115,9 +183,10 @@ class LazyEngine:
 class LazyAsyncSession:
     """Обертка для ленивой инициализации async_session"""
     def __call__(self):
-        """Вызов async_session() возвращает сам объект для использования как async context manager"""
-        # Возвращаем сам объект, который поддерживает async context manager
-        return self
+        """Вызов async_session() возвращает новую сессию (async context manager)"""
+        # Новый объект на каждый вызов: обработчики бота в webhook-режиме работают
+        # параллельно, и общий self._session закрывал бы чужие сессии
+        return get_async_session()()
     
     def __getattr__(self, name):
         """Доступ к атрибутам фабрики сессий"""
@@ -148,9 +217,9 @@ Base = declarative_base()
 # ========================================
 # Dependency для FastAPI (получение сессии)
 # ========================================
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency для FastAPI эндпоинтов
+    Dependency для FastAPI эндпоинтов (primary БД, чтение и запись)
     
     Использование:
     @app.get("/users")
@@ -162,6 +231,8 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     # Используем async with для правильного управления session
     # Это гарантирует, что session создается и закрывается в правильном event loop
     async with session_factory() as session:
+        # Для read-your-writes: после коммита с изменениями пользователь читает с primary
+        session.info["user_key"] = request_user_key(request)
         try:
             yield session
             await session.commit()
@@ -170,6 +241,41 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency для read-only эндпоинтов (каталог, лидборд, аналитика, отзывы)
+    
+    Идёт на реплику, если она настроена и пользователь недавно ничего не записывал,
+    иначе - на primary. Сессия только читает, commit не выполняется.
+    """
+    user_key = request_user_key(request)
+    session_factory = get_read_session_factory(
+        prefer_primary=_replica_session is not None and await has_recent_write_shared(user_key)
+    )
+    async with session_factory() as session:
+        yield session
+
+
+def get_read_session_factory(prefer_primary: bool = False) -> async_sessionmaker:
+    """
+    Фабрика сессий для чтения: реплика (если есть) или primary
+    """
+    if _replica_session is None or prefer_primary:
+        return get_async_session()
+    return _replica_session
+
+
+def read_session() -> AsyncSession:
+    """
+    Сессия для тяжёлых read-only запросов вне FastAPI (аналитика админ-бота)
+    
+    Использование:
+    async with read_session() as session:
+        ...
+    """
+    return get_read_session_factory()()
+
+
 # ========================================
 # Инициализация БД (создание таблиц)
 # ========================================
@@ -199,11 +305,15 @@ async def close_db():
     """
     Закрывает все соединения с БД
     """
-    global _engine
+    global _engine, _async_session, _replica_engine, _replica_session
     if _engine is not None:
         await _engine.dispose()
         _engine = None
         _async_session = None
+    if _replica_engine is not None:
+        await _replica_engine.dispose()
+        _replica_engine = None
+        _replica_session = None
 
 
 # ========================================
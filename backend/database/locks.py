@@ -0,0 +1,76 @@
+"""
+Фоновые задачи "в одном экземпляре" при нескольких воркерах/процессах
+
+Лидер выбирается через pg_try_advisory_lock: блокировку держит соединение
+лидера, при его падении PostgreSQL снимает её сам и задачу подхватывает
+другой воркер. На SQLite (один процесс разработки) задача просто запускается.
+"""
+
+import asyncio
+import logging
+import zlib
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+def lock_id(name: str) -> int:
+    """Стабильный ключ advisory lock по имени задачи"""
+    return zlib.crc32(f"beauty_school:{name}".encode())
+
+
+async def run_as_leader(engine, name: str, coro_factory, retry_interval: float = 30.0) -> None:
+    """
+    Выполняет coro_factory() только в том процессе, который держит блокировку `name`.
+    Остальные процессы раз в retry_interval пробуют её захватить.
+
+    Args:
+        engine: AsyncEngine
+        name: Имя задачи (из него строится ключ блокировки)
+        coro_factory: Функция без аргументов, возвращающая корутину задачи
+        retry_interval: Период попыток захвата и проверки соединения лидера (сек)
+    """
+    if engine.dialect.name != "postgresql":
+        await coro_factory()
+        return
+
+    key = lock_id(name)
+    while True:
+        try:
+            async with engine.connect() as conn:
+                acquired = (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})).scalar()
+                await conn.commit()
+                if acquired:
+                    await _lead(conn, key, name, coro_factory, retry_interval)
+                    return
+            # Не лидер: соединение вернулось в пул, ждём без него
+            await asyncio.sleep(retry_interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("⚠️ Задача '%s': ошибка, повтор через %s с", name, retry_interval, exc_info=True)
+            await asyncio.sleep(retry_interval)
+
+
+async def _lead(conn, key: int, name: str, coro_factory, retry_interval: float) -> None:
+    """Выполняет задачу, пока соединение conn держит блокировку"""
+    logger.info("👑 Задача '%s' выполняется в этом процессе", name)
+    task = asyncio.create_task(coro_factory())
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=retry_interval)
+            if not task.done():
+                # Соединение с блокировкой живо - иначе лидерство потеряно
+                await conn.execute(text("SELECT 1"))
+                await conn.commit()
+        task.result()
+    finally:
+        if not task.done():
+            task.cancel()
+        try:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+            await conn.commit()
+        except Exception:
+            # Соединение потеряно - блокировку уже сняла БД
+            pass
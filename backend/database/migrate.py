@@ -0,0 +1,106 @@
+"""
+Проверка и применение миграций Alembic при старте API
+
+Быстрый путь: сравнить alembic_version с head из файлов миграций (один SELECT).
+Основной способ применения миграций - release-шаг деплоя (railway.json:
+deploy.preDeployCommand; Procfile: release - для Heroku-совместимых платформ). Если схема всё же отстаёт и
+MIGRATIONS_ON_STARTUP=upgrade - upgrade выполняет ровно один процесс:
+остальные воркеры ждут на pg_advisory_lock и после него видят актуальную версию.
+"""
+
+import asyncio
+import logging
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+# Произвольная константа - ключ pg_advisory_lock для миграций
+MIGRATION_LOCK_ID = 7_391_500_117
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+ALEMBIC_INI = PROJECT_ROOT / "alembic.ini"
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    # script_location в alembic.ini относительный - не зависим от cwd процесса
+    config.set_main_option("script_location", str(PROJECT_ROOT / "backend" / "database" / "migrations"))
+    # env.py не должен перенастраивать logging уже запущенного приложения
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def get_head_revisions() -> set:
+    """Head-ревизии из файлов миграций"""
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(_alembic_config()).get_heads())
+
+
+async def get_current_revisions(conn) -> set:
+    """Ревизии из таблицы alembic_version (пустое множество, если таблицы нет)"""
+    has_table = await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("alembic_version"))
+    if not has_table:
+        return set()
+    result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+    return {row[0] for row in result}
+
+
+def _upgrade_head():
+    from alembic import command
+
+    command.upgrade(_alembic_config(), "head")
+
+
+async def ensure_migrations(engine, mode: str = "upgrade") -> str:
+    """
+    Args:
+        engine: AsyncEngine приложения
+        mode: upgrade - применить недостающие миграции под advisory lock,
+              check - только предупредить в логе, off - ничего не делать
+
+    Returns:
+        off / up_to_date / behind / upgraded
+    """
+    if mode == "off":
+        return "off"
+
+    # Разбор файлов миграций - синхронный, уводим из event loop
+    heads = await asyncio.to_thread(get_head_revisions)
+
+    async with engine.connect() as conn:
+        current = await get_current_revisions(conn)
+        await conn.commit()
+        if current == heads:
+            return "up_to_date"
+
+        if mode != "upgrade":
+            logger.warning(
+                "⚠️ Схема БД отстаёт: %s, head: %s. Выполните 'alembic upgrade head'",
+                sorted(current) or "-", sorted(heads),
+            )
+            return "behind"
+
+        use_lock = engine.dialect.name == "postgresql"
+        if use_lock:
+            # Блокировка уровня сессии - переживает commit, снимается явно
+            await conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            await conn.commit()
+        try:
+            # Пока ждали блокировку, миграции мог применить другой воркер
+            current = await get_current_revisions(conn)
+            await conn.commit()
+            if current == heads:
+                return "up_to_date"
+
+            logger.info("🔄 Применяем миграции: %s -> %s", sorted(current) or "-", sorted(heads))
+            await asyncio.to_thread(_upgrade_head)
+            return "upgraded"
+        finally:
+            if use_lock:
+                await conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                await conn.commit()
@@ -24,7 +24,8 @@ config = context.config
 config.set_main_option('sqlalchemy.url', settings.database_url_sync)
 
 # Interpret the config file for Python logging.
-if config.config_file_name is not None:
+# При запуске из приложения (backend/database/migrate.py) logging уже настроен
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -11,7 +11,7 @@ from sqlalchemy.dialects import postgresql
 
 # revision identifiers, used by Alembic.
 revision = 'add_favorites'
-down_revision = 'add_email_to_users'
+down_revision = 'add_email_users'
 branch_labels = None
 depends_on = None
 
@@ -0,0 +1,47 @@
+"""Add composite and partial indexes for hot predicates
+
+Revision ID: add_hot_indexes
+Revises: add_challenges, add_support_tables
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_indexes'
+# Сливаем две ветки миграций (support_tables создавалась без down_revision)
+down_revision = ('add_challenges', 'add_support_tables')
+branch_labels = None
+depends_on = None
+
+
+# (имя индекса, таблица, колонки, условие частичного индекса)
+INDEXES = [
+    ('ix_user_progress_user_completed', 'user_progress', ['user_id', 'completed'], None),
+    ('ix_user_courses_user_completed', 'user_courses', ['user_id', 'is_completed'], None),
+    ('ix_lessons_course_order', 'lessons', ['course_id', 'order'], None),
+    ('ix_payments_status_created', 'payments', ['status', 'created_at'], None),
+    ('ix_users_active_points', 'users', ['is_active', 'points'], None),
+    ('ix_reviews_course_created', 'reviews', ['course_id', 'created_at'], None),
+    ('ix_support_messages_ticket_created', 'support_messages', ['ticket_id', 'created_at'], None),
+    ('ix_support_messages_ticket_unread', 'support_messages', ['ticket_id'], 'read_at IS NULL'),
+]
+
+
+def upgrade() -> None:
+    # if_not_exists: init_db() в dev мог уже создать индексы из моделей
+    for name, table, columns, where in INDEXES:
+        op.create_index(
+            name,
+            table,
+            columns,
+            unique=False,
+            if_not_exists=True,
+            postgresql_where=sa.text(where) if where else None,
+        )
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,58 @@
+"""Denormalized unread counters and last message on support tickets
+
+Revision ID: add_support_inbox
+Revises: add_hot_indexes
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_support_inbox'
+down_revision = 'add_hot_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('support_tickets', sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('support_tickets', sa.Column('last_message_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False))
+    op.add_column('support_tickets', sa.Column('last_message_preview', sa.String(length=255), nullable=True))
+    op.add_column('support_tickets', sa.Column('last_message_from_admin', sa.Boolean(), nullable=True))
+
+    # Заполняем поля по уже существующим сообщениям
+    op.execute("""
+        UPDATE support_tickets t SET
+            unread_count = (
+                SELECT count(*) FROM support_messages m
+                WHERE m.ticket_id = t.id AND m.is_from_admin = false AND m.read_at IS NULL
+            ),
+            last_message_at = coalesce(last.created_at, t.updated_at, t.created_at),
+            last_message_preview = left(last.message, 255),
+            last_message_from_admin = last.is_from_admin
+        FROM support_tickets t2
+        LEFT JOIN LATERAL (
+            SELECT m.created_at, m.message, m.is_from_admin FROM support_messages m
+            WHERE m.ticket_id = t2.id
+            ORDER BY m.created_at DESC, m.id DESC
+            LIMIT 1
+        ) last ON true
+        WHERE t2.id = t.id
+    """)
+
+    op.create_index(
+        'ix_support_tickets_status_last_message',
+        'support_tickets',
+        ['status', 'last_message_at'],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_support_tickets_status_last_message', table_name='support_tickets', if_exists=True)
+    op.drop_column('support_tickets', 'last_message_from_admin')
+    op.drop_column('support_tickets', 'last_message_preview')
+    op.drop_column('support_tickets', 'last_message_at')
+    op.drop_column('support_tickets', 'unread_count')
@@ -5,7 +5,7 @@ SQLAlchemy модели базы данных
 from datetime import datetime
 from sqlalchemy import (
     Column, Integer, String, Text, Boolean, DECIMAL,
-    TIMESTAMP, ForeignKey, BigInteger, UniqueConstraint
+    TIMESTAMP, ForeignKey, BigInteger, UniqueConstraint, Index, text
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -18,6 +18,9 @@ from backend.database.database import Base
 # ========================================
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_active_points", "is_active", "points"),  # Лидборд: WHERE is_active ORDER BY points
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     telegram_id = Column(BigInteger, unique=True, nullable=False, index=True)
@@ -74,6 +77,9 @@ class Course(Base):
 # ========================================
 class Lesson(Base):
     __tablename__ = "lessons"
+    __table_args__ = (
+        Index("ix_lessons_course_order", "course_id", "order"),  # Уроки курса по порядку
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
@@ -102,6 +108,7 @@ class UserCourse(Base):
     __tablename__ = "user_courses"
     __table_args__ = (
         UniqueConstraint("user_id", "course_id", name="uq_user_course"),
+        Index("ix_user_courses_user_completed", "user_id", "is_completed"),
     )
     
     id = Column(Integer, primary_key=True, index=True)
@@ -126,6 +133,7 @@ class UserProgress(Base):
     __tablename__ = "user_progress"
     __table_args__ = (
         UniqueConstraint("user_id", "lesson_id", name="uq_user_lesson"),
+        Index("ix_user_progress_user_completed", "user_id", "completed"),
     )
     
     id = Column(Integer, primary_key=True, index=True)
@@ -211,6 +219,9 @@ class Community(Base):
 # ========================================
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_status_created", "status", "created_at"),  # Выручка и зависшие pending
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -278,6 +289,9 @@ class Favorite(Base):
 # ========================================
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        Index("ix_reviews_course_created", "course_id", "created_at"),  # Лента отзывов курса
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -351,6 +365,10 @@ class UserChallenge(Base):
 # ========================================
 class SupportTicket(Base):
     __tablename__ = "support_tickets"
+    __table_args__ = (
+        # Инбокс админа: открытые тикеты по последней активности
+        Index("ix_support_tickets_status_last_message", "status", "last_message_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -359,6 +377,12 @@ class SupportTicket(Base):
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
     
+    # Денормализованные поля инбокса (обновляет backend/services/support_inbox.py)
+    unread_count = Column(Integer, default=0, server_default="0", nullable=False)  # Непрочитанные админом сообщения пользователя
+    last_message_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    last_message_preview = Column(String(255), nullable=True)
+    last_message_from_admin = Column(Boolean, nullable=True)
+    
     # Relationships
     user = relationship("User", backref="support_tickets")
     messages = relationship("SupportMessage", back_populates="ticket", cascade="all, delete-orphan", order_by="SupportMessage.created_at")
@@ -372,6 +396,15 @@ class SupportTicket(Base):
 # ========================================
 class SupportMessage(Base):
     __tablename__ = "support_messages"
+    __table_args__ = (
+        Index("ix_support_messages_ticket_created", "ticket_id", "created_at"),
+        # Частичный индекс: только непрочитанные сообщения
+        Index(
+            "ix_support_messages_ticket_unread", "ticket_id",
+            postgresql_where=text("read_at IS NULL"),
+            sqlite_where=text("read_at IS NULL"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     ticket_id = Column(Integer, ForeignKey("support_tickets.id", ondelete="CASCADE"), nullable=False)
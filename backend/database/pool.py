@@ -0,0 +1,150 @@
+"""
+Пул соединений PostgreSQL: статистика и инвалидация prepared statements
+
+- InstrumentedQueuePool считает время ожидания свободного соединения
+- Версия схемы (alembic_version) запоминается на каждом соединении;
+  после миграции старые соединения (с закешированными prepared statements
+  под старую структуру таблиц) выбрасываются при checkout
+"""
+
+import asyncio
+import logging
+import time
+import threading
+from typing import Optional
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from backend.utils.metrics import observe_pool_wait
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Накопительная статистика ожидания соединений из пула"""
+
+    def __init__(self, name: str = "primary"):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+        observe_pool_wait(self.name, seconds)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool с замером времени ожидания соединения"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.stats.record_wait(time.perf_counter() - start, timed_out)
+
+    def recreate(self):
+        # dispose() пересоздаёт пул - сохраняем имя для метрик
+        new_pool = super().recreate()
+        new_pool.stats.name = self.stats.name
+        return new_pool
+
+
+# ========================================
+# Версия схемы БД
+# ========================================
+_schema_version: Optional[str] = None
+
+
+def install_schema_version_guard(engine) -> None:
+    """
+    Помечает каждое соединение текущей версией схемы.
+    Если версия сменилась (применена миграция) - соединение отбрасывается
+    при checkout, и пул открывает новое с пустым кешем prepared statements.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        connection_record.info["schema_version"] = _schema_version
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        if connection_record.info.get("schema_version") != _schema_version:
+            # DisconnectionError => пул закроет соединение и возьмёт новое
+            raise exc.DisconnectionError("Schema version changed, dropping cached statements")
+
+
+async def refresh_schema_version(engine) -> Optional[str]:
+    """
+    Перечитывает alembic_version.
+    Возвращает новую версию, если она изменилась, иначе None
+    """
+    global _schema_version
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version ORDER BY version_num"))
+            version = ",".join(row[0] for row in result)
+    except Exception:
+        # Таблицы alembic_version может не быть (dev через init_db)
+        return None
+
+    if version == _schema_version:
+        return None
+    _schema_version = version
+    return version
+
+
+async def watch_schema_version(engine, interval: int) -> None:
+    """
+    Фоновая задача: периодически проверяет alembic_version.
+    Нужна, когда миграцию применил другой процесс (release-шаг деплоя)
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            version = await refresh_schema_version(engine)
+            if version:
+                logger.info(f"🔄 Версия схемы БД изменилась: {version}, кеш prepared statements сброшен")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Ошибка проверки версии схемы БД: {e}")
+
+
+def get_pool_stats(engine) -> dict:
+    """Снимок состояния пула для мониторинга"""
+    pool = engine.pool
+    wait = getattr(pool, "stats", None) or PoolStats()
+    stats = {
+        "pool_class": type(pool).__name__,
+        "schema_version": _schema_version,
+        "checkouts": wait.checkouts,
+        "wait_total_seconds": round(wait.wait_total, 6),
+        "wait_max_seconds": round(wait.wait_max, 6),
+        "wait_avg_seconds": round(wait.wait_total / wait.checkouts, 6) if wait.checkouts else 0.0,
+        "timeouts": wait.timeouts,
+    }
+    # Не у всех пулов (NullPool, StaticPool) есть счётчики
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
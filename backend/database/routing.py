@@ -0,0 +1,147 @@
+"""
+Маршрутизация чтения на read-реплику с read-your-writes
+
+После того как пользователь сам что-то записал (завершил урок, оставил отзыв),
+его чтения в течение READ_YOUR_WRITES_SECONDS идут на primary,
+чтобы не увидеть устаревшие данные из-за лага репликации.
+
+При нескольких воркерах следующий запрос может попасть в другой процесс,
+поэтому отметка о записи дублируется в Redis (если он настроен).
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+# Ключ пользователя -> monotonic-время последней записи
+_recent_writes: dict[str, float] = {}
+_MAX_TRACKED = 50_000
+_REDIS_PREFIX = "ryw:"
+# Ссылки на фоновые SET в Redis, чтобы задачи не собрал GC
+_pending: set = set()
+
+
+def mark_recent_write(user_key: str) -> None:
+    """Запомнить, что пользователь только что записал данные"""
+    if len(_recent_writes) >= _MAX_TRACKED:
+        _prune()
+    _recent_writes[user_key] = time.monotonic()
+    
+    redis = get_redis()
+    if redis is not None:
+        # Вызывается из синхронного события сессии - пишем в Redis фоновой задачей
+        try:
+            task = asyncio.get_running_loop().create_task(_mark_shared(redis, user_key))
+        except RuntimeError:
+            return
+        _pending.add(task)
+        task.add_done_callback(_pending.discard)
+
+
+async def _mark_shared(redis, user_key: str) -> None:
+    try:
+        await redis.set(_REDIS_PREFIX + user_key, 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+    except Exception as e:
+        logger.warning("Не удалось записать read-your-writes в Redis: %s", e)
+
+
+def has_recent_write(user_key: Optional[str]) -> bool:
+    """Писал ли пользователь в последние READ_YOUR_WRITES_SECONDS"""
+    if not user_key:
+        return False
+    written_at = _recent_writes.get(user_key)
+    if written_at is None:
+        return False
+    if time.monotonic() - written_at > settings.READ_YOUR_WRITES_SECONDS:
+        _recent_writes.pop(user_key, None)
+        return False
+    return True
+
+
+async def has_recent_write_shared(user_key: Optional[str]) -> bool:
+    """has_recent_write с учётом записей, сделанных в других воркерах (Redis)"""
+    if has_recent_write(user_key):
+        return True
+    redis = get_redis()
+    if not user_key or redis is None:
+        return False
+    try:
+        return bool(await redis.exists(_REDIS_PREFIX + user_key))
+    except Exception as e:
+        # Redis недоступен - читаем с реплики, как без него
+        logger.warning("Не удалось проверить read-your-writes в Redis: %s", e)
+        return False
+
+
+def _prune() -> None:
+    deadline = time.monotonic() - settings.READ_YOUR_WRITES_SECONDS
+    for key, written_at in list(_recent_writes.items()):
+        if written_at < deadline:
+            del _recent_writes[key]
+
+
+def request_user_key(request: Request) -> Optional[str]:
+    """
+    Идентификатор пользователя запроса - только для маршрутизации, не для авторизации.
+    initData здесь не валидируется: подделка лишь отправит чтение на primary
+    """
+    telegram_user = getattr(request.state, "telegram_user", None)
+    if telegram_user and telegram_user.get("id"):
+        return str(telegram_user["id"])
+
+    dev_telegram_id = request.headers.get("X-Telegram-User-ID")
+    if dev_telegram_id:
+        return dev_telegram_id
+
+    init_data = request.headers.get("X-Telegram-Init-Data")
+    if init_data:
+        try:
+            user_data = json.loads(dict(parse_qsl(init_data)).get("user", "{}"))
+            if user_data.get("id"):
+                return str(user_data["id"])
+        except ValueError:
+            return None
+    return None
+
+
+# ========================================
+# Отслеживание записей в сессиях
+# ========================================
+# get_session кладёт в session.info["user_key"]; если сессия что-то
+# флашила и закоммитила - пользователь помечается как "недавно писавший"
+@event.listens_for(Session, "after_flush")
+def _on_after_flush(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_orm_execute(orm_execute_state):
+    # UPDATE/DELETE/INSERT через session.execute() минуют flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _on_after_commit(session):
+    if session.info.pop("has_writes", False):
+        user_key = session.info.get("user_key")
+        if user_key:
+            mark_recent_write(user_key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_after_rollback(session):
+    session.info.pop("has_writes", None)
@@ -1,13 +1,26 @@
 """
 Скрипт для заполнения БД тестовыми данными
 Запуск: python -m backend.database.seed_data
+
+Синтетические данные для нагрузочного тестирования (scripts/load_test.py):
+    python -m backend.database.seed_data --synthetic --users 10000 --courses 50
 """
 
+import argparse
 import asyncio
-from sqlalchemy import select
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import select, insert, func
 
 from backend.database import async_session
-from backend.database.models import Course, Lesson, Achievement, Community
+from backend.database.database import create_engine_and_session, get_engine
+from backend.database.models import (
+    Course, Lesson, Achievement, Community,
+    User, UserCourse, UserProgress, Payment, Review, Certificate,
+)
+from backend.services.gamification import POINTS_PER_LESSON, POINTS_PER_COURSE
 
 
 async def seed_courses():
@@ -241,8 +254,227 @@ async def seed_communities():
         await session.commit()
 
 
-async def main():
+# ========================================
+# Синтетические данные для нагрузочного теста
+# ========================================
+# telegram_id синтетического пользователя = SYNTHETIC_TELEGRAM_ID_BASE + его номер,
+# load_test.py выбирает пользователей по номеру без доступа к БД
+SYNTHETIC_TELEGRAM_ID_BASE = 7_000_000_000
+SYNTHETIC_CATEGORIES = ["Маникюр и педикюр", "Ресницы и брови", "Своё дело", "Макияж", "Волосы"]
+# Москва и Петербург - большинство пользователей
+SYNTHETIC_CITIES = ["Москва", "Санкт-Петербург", "Казань", "Екатеринбург", "Новосибирск", None]
+SYNTHETIC_CITY_WEIGHTS = [40, 20, 8, 8, 6, 18]
+REVIEW_RATINGS = [5, 4, 3, 2, 1]
+REVIEW_RATING_WEIGHTS = [55, 25, 10, 5, 5]
+
+
+async def seed_synthetic(
+    users: int = 1000,
+    courses: int = 20,
+    lessons_per_course: int = 8,
+    seed: int = 42,
+    chunk_size: int = 2000,
+):
+    """
+    Генерирует N пользователей, M курсов с уроками, записи на курсы, прогресс,
+    платежи, отзывы и сертификаты с реалистичным перекосом:
+    - популярность курсов по закону Ципфа (несколько курсов собирают большую часть записей)
+    - число курсов у пользователя - распределение Парето (большинство 0-1, единицы - много)
+    - прогресс по курсу - Beta-распределение (многие бросают в начале)
+
+    Один и тот же seed даёт одинаковые данные - базовая линия для сравнения замеров.
+    Вставка пачками через executemany (insert().returning для id).
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    
+    async with async_session() as session:
+        existing = (await session.execute(
+            select(func.count(User.id)).where(User.telegram_id >= SYNTHETIC_TELEGRAM_ID_BASE)
+        )).scalar()
+        if existing:
+            print(f"⏭️  Пропущено: синтетические пользователи уже есть ({existing})")
+            return
+        
+        # Курсы и уроки
+        course_rows = []
+        for i in range(courses):
+            paid = rng.random() < 0.7
+            course_rows.append({
+                "title": f"Нагрузочный курс #{i + 1}",
+                "description": f"Синтетический курс {i + 1} для нагрузочного тестирования",
+                "full_description": "Полное описание синтетического курса. " * 5,
+                "category": SYNTHETIC_CATEGORIES[i % len(SYNTHETIC_CATEGORIES)],
+                "is_top": i < 3,
+                "price": Decimal(rng.choice([990, 1990, 2990, 4990])) if paid else Decimal(0),
+                "duration_hours": rng.randint(4, 40),
+                "cover_image_url": f"https://via.placeholder.com/400x200?text=Course+{i + 1}",
+            })
+        course_ids = (await session.execute(
+            insert(Course).returning(Course.id, sort_by_parameter_order=True), course_rows
+        )).scalars().all()
+        course_prices = {cid: row["price"] for cid, row in zip(course_ids, course_rows)}
+        
+        lesson_rows = []
+        for course_id in course_ids:
+            count = max(1, rng.randint(lessons_per_course // 2, lessons_per_course * 3 // 2))
+            for order in range(1, count + 1):
+                lesson_rows.append({
+                    "course_id": course_id,
+                    "title": f"Урок {order}",
+                    "description": f"Описание урока {order}",
+                    "order": order,
+                    "video_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+                    "video_duration": rng.randint(300, 2400),
+                    "is_free": order == 1,
+                })
+        lesson_ids = (await session.execute(
+            insert(Lesson).returning(Lesson.id, sort_by_parameter_order=True), lesson_rows
+        )).scalars().all()
+        course_lessons: dict[int, list] = {cid: [] for cid in course_ids}
+        for lesson_id, row in zip(lesson_ids, lesson_rows):
+            course_lessons[row["course_id"]].append(lesson_id)
+        await session.commit()
+        print(f"✅ Создано курсов: {len(course_ids)}, уроков: {len(lesson_ids)}")
+        
+        # Вес курса по Ципфу, ранги перемешаны - популярные курсы не обязательно первые
+        ranks = list(range(1, courses + 1))
+        rng.shuffle(ranks)
+        course_weights = [1 / rank ** 1.1 for rank in ranks]
+        
+        totals = {"enrollments": 0, "progress": 0, "payments": 0, "reviews": 0, "certificates": 0}
+        for start in range(0, users, chunk_size):
+            batch = range(start, min(start + chunk_size, users))
+            user_rows, enrollments = [], []
+            
+            for n in batch:
+                enrolled_count = min(max(1, courses // 2), int(rng.paretovariate(1.3)) - 1)
+                picked = set()
+                while len(picked) < enrolled_count:
+                    picked.add(rng.choices(course_ids, course_weights)[0])
+                
+                points = 0
+                for course_id in picked:
+                    lessons = course_lessons[course_id]
+                    done = round(len(lessons) * rng.betavariate(0.8, 1.2))
+                    points += done * POINTS_PER_LESSON
+                    if done == len(lessons):
+                        points += POINTS_PER_COURSE
+                    enrollments.append((n, course_id, done))
+                
+                user_rows.append({
+                    "telegram_id": SYNTHETIC_TELEGRAM_ID_BASE + n,
+                    "username": f"bench_user_{n}",
+                    "full_name": f"Пользователь {n}",
+                    "phone": f"+7900{n:07d}",
+                    "city": rng.choices(SYNTHETIC_CITIES, SYNTHETIC_CITY_WEIGHTS)[0],
+                    "consent_personal_data": True,
+                    "points": points,
+                    "created_at": now - timedelta(days=rng.randint(0, 365)),
+                })
+            
+            user_ids = (await session.execute(
+                insert(User).returning(User.id, sort_by_parameter_order=True), user_rows
+            )).scalars().all()
+            
+            user_course_rows, progress_rows, payment_rows, review_rows, certificate_rows = [], [], [], [], []
+            for n, course_id, done in enrollments:
+                user_id = user_ids[n - start]
+                lessons = course_lessons[course_id]
+                purchased_at = now - timedelta(days=rng.randint(0, 180), minutes=rng.randint(0, 1440))
+                completed = done == len(lessons)
+                # Производные даты не позже now: иначе "за последние 30 дней" и метрики по дням
+                # видят будущие записи
+                completed_at = min(purchased_at + timedelta(days=rng.randint(1, 30)), now) if completed else None
+                lessons_done_by = completed_at or now
+                
+                user_course_rows.append({
+                    "user_id": user_id,
+                    "course_id": course_id,
+                    "purchased_at": purchased_at,
+                    "is_completed": completed,
+                    "completed_at": completed_at,
+                })
+                for i, lesson_id in enumerate(lessons[:done]):
+                    progress_rows.append({
+                        "user_id": user_id,
+                        "lesson_id": lesson_id,
+                        "completed": True,
+                        "completed_at": min(purchased_at + timedelta(hours=12 * (i + 1)), lessons_done_by),
+                        "watch_time": rng.randint(60, 2400),
+                    })
+                if course_prices[course_id] > 0:
+                    payment_rows.append({
+                        "user_id": user_id,
+                        "course_id": course_id,
+                        "amount": course_prices[course_id],
+                        "yookassa_payment_id": f"bench-{user_id}-{course_id}",
+                        "status": "succeeded",
+                        "payment_method": "bank_card",
+                        "created_at": purchased_at,
+                        "paid_at": purchased_at,
+                    })
+                if completed:
+                    certificate_rows.append({
+                        "user_id": user_id,
+                        "course_id": course_id,
+                        "certificate_number": f"BENCH-{user_id}-{course_id}",
+                        "certificate_url": f"/certificates/BENCH-{user_id}-{course_id}.pdf",
+                        "issued_at": completed_at,
+                    })
+                if done and rng.random() < (0.4 if completed else 0.08):
+                    review_rows.append({
+                        "user_id": user_id,
+                        "course_id": course_id,
+                        "rating": rng.choices(REVIEW_RATINGS, REVIEW_RATING_WEIGHTS)[0],
+                        "comment": rng.choice([None, "Отличный курс!", "Полезно, но хотелось бы больше практики"]),
+                        "created_at": min(purchased_at + timedelta(days=rng.randint(1, 60)), now),
+                    })
+            
+            # Брошенные оплаты: pending/canceled без записи на курс
+            for user_id in rng.sample(user_ids, k=len(user_ids) // 20):
+                course_id = rng.choices(course_ids, course_weights)[0]
+                if course_prices[course_id] > 0:
+                    created_at = now - timedelta(days=rng.randint(0, 30), minutes=rng.randint(0, 1440))
+                    payment_rows.append({
+                        "user_id": user_id,
+                        "course_id": course_id,
+                        "amount": course_prices[course_id],
+                        "yookassa_payment_id": f"bench-pending-{user_id}-{course_id}-{rng.getrandbits(32)}",
+                        "status": rng.choice(["pending", "canceled"]),
+                        "payment_method": "bank_card",
+                        "created_at": created_at,
+                    })
+            
+            for model, rows in (
+                (UserCourse, user_course_rows),
+                (UserProgress, progress_rows),
+                (Payment, payment_rows),
+                (Review, review_rows),
+                (Certificate, certificate_rows),
+            ):
+                if rows:
+                    await session.execute(insert(model), rows)
+            await session.commit()
+            
+            totals["enrollments"] += len(user_course_rows)
+            totals["progress"] += len(progress_rows)
+            totals["payments"] += len(payment_rows)
+            totals["reviews"] += len(review_rows)
+            totals["certificates"] += len(certificate_rows)
+            print(f"   ... пользователей: {batch.stop}/{users}")
+        
+        print(
+            f"✅ Создано пользователей: {users}, записей на курсы: {totals['enrollments']}, "
+            f"прогресса: {totals['progress']}, платежей: {totals['payments']}, "
+            f"отзывов: {totals['reviews']}, сертификатов: {totals['certificates']}"
+        )
+
+
+async def main(args=None):
     """Главная функция"""
+    create_engine_and_session()
+    
     print("🌱 Начинаем заполнение БД тестовыми данными...")
     print("=" * 60)
     print()
@@ -259,16 +491,33 @@ async def main():
     await seed_communities()
     print()
     
+    if args is not None and args.synthetic:
+        print(f"⚙️  Синтетические данные (users={args.users}, courses={args.courses}, seed={args.seed})...")
+        await seed_synthetic(args.users, args.courses, args.lessons, args.seed)
+        print()
+    
     print("=" * 60)
     print("✅ Готово! База данных заполнена тестовыми данными.")
+    await get_engine().dispose()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Заполнение БД тестовыми данными")
+    parser.add_argument("--synthetic", action="store_true", help="Сгенерировать данные для нагрузочного теста")
+    parser.add_argument("--users", type=int, default=1000, help="Число пользователей")
+    parser.add_argument("--courses", type=int, default=20, help="Число курсов")
+    parser.add_argument("--lessons", type=int, default=8, help="Среднее число уроков в курсе")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора (одинаковый seed = одинаковые данные)")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))
 
 
 # ========================================
 # Запуск:
 # ========================================
 # python -m backend.database.seed_data
+# python -m backend.database.seed_data --synthetic --users 10000 --courses 50 --seed 42
 
@@ -0,0 +1,25 @@
+"""
+INSERT ... ON CONFLICT для диалектов проекта
+
+PostgreSQL в проде и SQLite в разработке поддерживают одинаковый синтаксис
+(on_conflict_do_nothing / on_conflict_do_update), но конструкция insert у
+каждого своя.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_insert(dialect: str):
+    """insert() с поддержкой ON CONFLICT для диалекта dialect"""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"ON CONFLICT не поддерживается для {dialect}")
+    return insert
+
+
+def session_insert(session: AsyncSession):
+    """insert() для диалекта, к которому привязана сессия"""
+    return dialect_insert(session.bind.dialect.name)
@@ -1,18 +1,20 @@
 """
 Точка входа приложения
 Запускает все сервисы: Telegram бот, FastAPI, Админ-бот
+
+Каждый сервис работает в отдельном процессе (backend/supervisor.py).
+Функции start_* ниже оставлены для запуска одного сервиса в текущем процессе.
 """
 
-import asyncio
 import logging
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 
 from backend.config import settings
+from backend.utils.fsm_storage import create_fsm_storage, create_events_isolation
+from backend.utils.metrics import install_telegram_metrics
 from backend.bot.bot import setup_bot_handlers
 from backend.admin_bot.bot import setup_admin_bot_handlers
 from backend.webapp.app import create_app
-from backend.database.database import init_db
 
 
 # Настройка логирования
@@ -31,8 +33,9 @@ async def start_telegram_bot():
     
     # Создаём бота и диспетчер
     bot = Bot(token=settings.BOT_TOKEN)
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
+    install_telegram_metrics(bot)
+    storage = create_fsm_storage("bot")
+    dp = Dispatcher(storage=storage, events_isolation=create_events_isolation(storage))
     
     # Регистрируем обработчики
     setup_bot_handlers(dp)
@@ -49,8 +52,9 @@ async def start_admin_bot():
     logger.info("Запуск админ-бота...")
     
     bot = Bot(token=settings.ADMIN_BOT_TOKEN)
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
+    install_telegram_metrics(bot)
+    storage = create_fsm_storage("admin_bot")
+    dp = Dispatcher(storage=storage, events_isolation=create_events_isolation(storage))
     
     # Регистрируем обработчики админ-бота
     setup_admin_bot_handlers(dp)
@@ -79,52 +83,32 @@ async def start_fastapi():
     await server.serve()
 
 
-async def main():
+def main():
     """
-    Главная функция: инициализирует БД и запускает все сервисы
+    Главная функция: запускает API и ботов в отдельных процессах
     """
-    logger.info("=" * 50)
-    logger.info("Beauty School Backend - Запуск")
-    logger.info("=" * 50)
-    
-    # Инициализация базы данных
-    logger.info("Инициализация базы данных...")
-    await init_db()
-    logger.info("База данных готова")
+    from backend.supervisor import main as run_supervisor
     
-    # Запускаем все сервисы параллельно
-    await asyncio.gather(
-        start_telegram_bot(),
-        start_admin_bot(),
-        start_fastapi()
-    )
+    run_supervisor()
 
 
 if __name__ == "__main__":
     """
     Запуск приложения:
-    python backend/main.py
+    python -m backend.main
     """
-    try:
-        asyncio.run(main())
-    except KeyboardInterrupt:
-        logger.info("Получен сигнал остановки (Ctrl+C)")
-        logger.info("Завершение работы...")
-    except Exception as e:
-        logger.error(f"Критическая ошибка: {e}", exc_info=True)
+    main()
 
 
 # ========================================
-# АЛЬТЕРНАТИВНЫЙ ЗАПУСК (отдельные процессы)
+# ЗАПУСК ОТДЕЛЬНЫХ СЕРВИСОВ
 # ========================================
-# Если нужно запускать сервисы отдельно:
-#
 # 1. Только бот:
-#    asyncio.run(start_telegram_bot())
+#    python -m backend.supervisor bot
 #
-# 2. Только FastAPI:
-#    uvicorn backend.main:app --reload
+# 2. Только FastAPI (gunicorn, несколько воркеров):
+#    gunicorn -c gunicorn.conf.py backend.webapp.app:app
 #
 # 3. Только админ-бот:
-#    asyncio.run(start_admin_bot())
+#    python -m backend.supervisor admin_bot
 
@@ -0,0 +1,29 @@
+"""
+Read-model админки: статистика, аналитика курсов, список тикетов
+
+Общий для админ-бота (/stats, /analytics, /courses, /course, /support)
+и HTTP-эндпоинтов /api/analytics. Каждый ответ - фиксированное число
+запросов с группировкой (обычно один), независимо от числа курсов,
+дней или тикетов. Результаты кешируются в памяти процесса на
+ANALYTICS_CACHE_TTL / SUPPORT_INBOX_CACHE_TTL секунд.
+
+- analytics - общая статистика, выручка, воронка, метрики по дням
+- courses - таблица курсов и карточка курса
+- support - открытые тикеты для админ-бота
+"""
+
+from backend.services.admin_read_model.analytics import (
+    AdminOverview, ConversionFunnel, DailyStats, RevenueStats,
+    get_conversion_funnel, get_daily_stats, get_overview, get_revenue_stats, invalidate_analytics,
+)
+from backend.services.admin_read_model.courses import (
+    CourseDetail, CourseStatsRow, get_course_detail, get_course_table,
+)
+from backend.services.admin_read_model.support import get_open_tickets, invalidate_support_inbox
+
+__all__ = [
+    "AdminOverview", "ConversionFunnel", "DailyStats", "RevenueStats",
+    "get_conversion_funnel", "get_daily_stats", "get_overview", "get_revenue_stats", "invalidate_analytics",
+    "CourseDetail", "CourseStatsRow", "get_course_detail", "get_course_table",
+    "get_open_tickets", "invalidate_support_inbox",
+]
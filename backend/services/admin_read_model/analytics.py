@@ -0,0 +1,196 @@
+"""
+Read-model админки: общая статистика, выручка, воронка и метрики по дням
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, literal, select, true, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.database.models import Certificate, Course, Payment, User, UserCourse, UserProgress
+from backend.services.admin_read_model.cache import cache
+
+
+def invalidate_analytics() -> None:
+    """Сбросить кеш статистики (после массовых изменений из админки)"""
+    for prefix in ("overview", "revenue", "funnel", "courses", "course", "daily"):
+        cache.invalidate(prefix)
+
+
+def _day_bounds() -> tuple[datetime, datetime, datetime]:
+    now = datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return today, now - timedelta(days=7), now - timedelta(days=30)
+
+
+# ========================================
+# Общая статистика
+# ========================================
+@dataclass(frozen=True)
+class AdminOverview:
+    total_users: int
+    new_today: int
+    new_week: int
+    active_users: int  # Проходили уроки за 30 дней
+    total_courses: int
+    active_courses: int
+    total_enrollments: int
+    completed_courses: int
+    completed_lessons: int
+
+
+async def get_overview(session: AsyncSession) -> AdminOverview:
+    """Пользователи, курсы, записи и уроки - один запрос"""
+    async def load() -> AdminOverview:
+        today, week_ago, month_ago = _day_bounds()
+        users = select(
+            func.count(User.id).label("total_users"),
+            func.count(User.id).filter(User.created_at >= today).label("new_today"),
+            func.count(User.id).filter(User.created_at >= week_ago).label("new_week"),
+        ).subquery()
+        courses = select(
+            func.count(Course.id).label("total_courses"),
+            func.count(Course.id).filter(Course.is_active == True).label("active_courses"),
+        ).subquery()
+        enrollments = select(
+            func.count(UserCourse.id).label("total_enrollments"),
+            func.count(UserCourse.id).filter(UserCourse.is_completed == True).label("completed_courses"),
+        ).subquery()
+        progress = select(
+            func.count(UserProgress.id).filter(UserProgress.completed == True).label("completed_lessons"),
+            func.count(func.distinct(UserProgress.user_id))
+            .filter(UserProgress.completed_at >= month_ago).label("active_users"),
+        ).subquery()
+
+        result = await session.execute(
+            select(users, courses, enrollments, progress)
+            .select_from(users)
+            .join(courses, true())
+            .join(enrollments, true())
+            .join(progress, true())
+        )
+        row = result.one()
+        return AdminOverview(**{field: int(row._mapping[field] or 0) for field in AdminOverview.__dataclass_fields__})
+
+    return await cache.get_or_load(("overview",), settings.ANALYTICS_CACHE_TTL, load)
+
+
+@dataclass(frozen=True)
+class RevenueStats:
+    total_revenue: float
+    revenue_today: float
+    revenue_week: float
+    revenue_month: float
+    total_payments: int
+    successful_payments: int
+
+
+async def get_revenue_stats(session: AsyncSession) -> RevenueStats:
+    """Выручка и число платежей - один проход по payments"""
+    async def load() -> RevenueStats:
+        today, week_ago, month_ago = _day_bounds()
+        succeeded = Payment.status == "succeeded"
+        result = await session.execute(
+            select(
+                func.sum(Payment.amount).filter(succeeded),
+                func.sum(Payment.amount).filter(succeeded, Payment.created_at >= today),
+                func.sum(Payment.amount).filter(succeeded, Payment.created_at >= week_ago),
+                func.sum(Payment.amount).filter(succeeded, Payment.created_at >= month_ago),
+                func.count(Payment.id),
+                func.count(Payment.id).filter(succeeded),
+            )
+        )
+        total, day, week, month, payments, successful = result.one()
+        return RevenueStats(
+            total_revenue=float(total or 0),
+            revenue_today=float(day or 0),
+            revenue_week=float(week or 0),
+            revenue_month=float(month or 0),
+            total_payments=int(payments or 0),
+            successful_payments=int(successful or 0),
+        )
+
+    return await cache.get_or_load(("revenue",), settings.ANALYTICS_CACHE_TTL, load)
+
+
+@dataclass(frozen=True)
+class ConversionFunnel:
+    visitors: int
+    purchased: int
+    started_learning: int
+    completed_course: int
+
+
+async def get_conversion_funnel(session: AsyncSession) -> ConversionFunnel:
+    """Воронка: пользователи -> оплатившие -> начавшие -> получившие сертификат"""
+    async def load() -> ConversionFunnel:
+        result = await session.execute(
+            select(
+                select(func.count(User.id)).scalar_subquery(),
+                select(func.count(func.distinct(Payment.user_id)))
+                .where(Payment.status == "succeeded").scalar_subquery(),
+                select(func.count(func.distinct(UserProgress.user_id))).scalar_subquery(),
+                select(func.count(func.distinct(Certificate.user_id))).scalar_subquery(),
+            )
+        )
+        return ConversionFunnel(*(int(value or 0) for value in result.one()))
+
+    return await cache.get_or_load(("funnel",), settings.ANALYTICS_CACHE_TTL, load)
+
+
+# ========================================
+# Статистика по дням
+# ========================================
+@dataclass(frozen=True)
+class DailyStats:
+    date: str
+    new_users: int
+    new_enrollments: int
+    completed_lessons: int
+    revenue: float
+
+
+async def get_daily_stats(session: AsyncSession, days: int) -> list[DailyStats]:
+    """
+    Метрики по дням за `days` дней (от старых к новым) -
+    четыре группировки по дате в одном UNION ALL
+    """
+    async def load() -> list[DailyStats]:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = today - timedelta(days=days - 1)
+
+        def per_day(column, metric: str, value, *where):
+            day = func.date(column)
+            return (
+                select(day.label("day"), literal(metric).label("metric"), value.label("value"))
+                .where(column >= start, *where)
+                .group_by(day)
+            )
+
+        result = await session.execute(union_all(
+            per_day(User.created_at, "new_users", func.count(User.id)),
+            per_day(UserCourse.purchased_at, "new_enrollments", func.count(UserCourse.id)),
+            per_day(UserProgress.completed_at, "completed_lessons", func.count(UserProgress.id)),
+            per_day(Payment.created_at, "revenue", func.sum(Payment.amount), Payment.status == "succeeded"),
+        ))
+        # PostgreSQL возвращает date, SQLite - строку
+        values: dict[tuple[str, str], float] = {}
+        for day, metric, value in result:
+            values[(str(day)[:10], metric)] = value or 0
+
+        stats = []
+        for offset in range(days):
+            day = (start + timedelta(days=offset)).strftime("%Y-%m-%d")
+            stats.append(DailyStats(
+                date=day,
+                new_users=int(values.get((day, "new_users"), 0)),
+                new_enrollments=int(values.get((day, "new_enrollments"), 0)),
+                completed_lessons=int(values.get((day, "completed_lessons"), 0)),
+                revenue=float(values.get((day, "revenue"), 0)),
+            ))
+        return stats
+
+    key = ("daily", days, date.today())
+    return await cache.get_or_load(key, settings.ANALYTICS_CACHE_TTL, load)
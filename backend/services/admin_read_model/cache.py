@@ -0,0 +1,64 @@
+"""
+Кеш read-model админки в памяти процесса
+
+Ключи - кортежи вида (префикс, параметры...); часть из них меняется
+со временем (дата в ключе метрик по дням, id курса), поэтому просроченные
+записи удаляются при каждом промахе, а блокировка ключа - сразу после
+загрузки: словари не растут за время жизни воркера.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+
+class TTLCache:
+    """Кеш с TTL; параллельные промахи по одному ключу выполняют один запрос"""
+
+    def __init__(self):
+        self._values: dict = {}
+        # ключ -> [блокировка, сколько корутин её ждут или держат]
+        self._locks: dict = {}
+
+    def _fresh(self, key):
+        entry = self._values.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry
+        return None
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self._values.items() if expires <= now]:
+            del self._values[key]
+
+    async def get_or_load(self, key, ttl: float, loader: Callable[[], Awaitable]):
+        if ttl <= 0:
+            return await loader()
+        entry = self._fresh(key)
+        if entry is not None:
+            return entry[1]
+
+        slot = self._locks.get(key)
+        if slot is None:
+            slot = self._locks[key] = [asyncio.Lock(), 0]
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                entry = self._fresh(key)
+                if entry is not None:
+                    return entry[1]
+                value = await loader()
+                self._evict_expired()
+                self._values[key] = (time.monotonic() + ttl, value)
+                return value
+        finally:
+            slot[1] -= 1
+            if not slot[1]:
+                del self._locks[key]
+
+    def invalidate(self, prefix: str) -> None:
+        for key in [key for key in self._values if key[0] == prefix]:
+            del self._values[key]
+
+
+cache = TTLCache()
@@ -0,0 +1,139 @@
+"""
+Read-model админки: таблица курсов и карточка курса
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.database.models import Course, Lesson, Payment, UserCourse, UserProgress
+from backend.services.admin_read_model.cache import cache
+
+
+@dataclass(frozen=True)
+class CourseStatsRow:
+    id: int
+    title: str
+    category: str
+    is_top: bool
+    is_active: bool
+    lessons: int
+    enrollments: int
+    completions: int
+    completed_lessons: int
+    revenue: float
+
+    @property
+    def completion_rate(self) -> float:
+        return round(self.completions / self.enrollments * 100, 2) if self.enrollments else 0.0
+
+    @property
+    def average_progress(self) -> float:
+        """Средний % пройденных уроков на одну запись на курс"""
+        if not self.enrollments or not self.lessons:
+            return 0.0
+        return round(min(100.0, self.completed_lessons / (self.enrollments * self.lessons) * 100), 2)
+
+
+async def get_course_table(session: AsyncSession) -> list[CourseStatsRow]:
+    """
+    Все курсы (новые первыми) с числом уроков, записей, завершений,
+    пройденных уроков и выручкой - один запрос с группировками
+    """
+    async def load() -> list[CourseStatsRow]:
+        lessons = (
+            select(Lesson.course_id, func.count(Lesson.id).label("lessons"))
+            .group_by(Lesson.course_id)
+            .subquery()
+        )
+        enrollments = (
+            select(
+                UserCourse.course_id,
+                func.count(UserCourse.id).label("enrollments"),
+                func.count(UserCourse.id).filter(UserCourse.is_completed == True).label("completions"),
+            )
+            .group_by(UserCourse.course_id)
+            .subquery()
+        )
+        progress = (
+            select(Lesson.course_id, func.count(UserProgress.id).label("completed_lessons"))
+            .join(UserProgress, UserProgress.lesson_id == Lesson.id)
+            .where(UserProgress.completed == True)
+            .group_by(Lesson.course_id)
+            .subquery()
+        )
+        revenue = (
+            select(Payment.course_id, func.sum(Payment.amount).label("revenue"))
+            .where(Payment.status == "succeeded")
+            .group_by(Payment.course_id)
+            .subquery()
+        )
+        result = await session.execute(
+            select(
+                Course.id, Course.title, Course.category, Course.is_top, Course.is_active,
+                func.coalesce(lessons.c.lessons, 0),
+                func.coalesce(enrollments.c.enrollments, 0),
+                func.coalesce(enrollments.c.completions, 0),
+                func.coalesce(progress.c.completed_lessons, 0),
+                func.coalesce(revenue.c.revenue, 0),
+            )
+            .outerjoin(lessons, lessons.c.course_id == Course.id)
+            .outerjoin(enrollments, enrollments.c.course_id == Course.id)
+            .outerjoin(progress, progress.c.course_id == Course.id)
+            .outerjoin(revenue, revenue.c.course_id == Course.id)
+            .order_by(Course.created_at.desc(), Course.id.desc())
+        )
+        return [
+            CourseStatsRow(*row[:9], revenue=float(row[9] or 0))
+            for row in result
+        ]
+
+    return await cache.get_or_load(("courses",), settings.ANALYTICS_CACHE_TTL, load)
+
+
+@dataclass(frozen=True)
+class CourseDetail:
+    course: Course
+    lessons: list  # [(title, is_free)] по порядку
+    enrollments: int
+    completed_lessons: int
+
+
+async def get_course_detail(session: AsyncSession, course_id: int) -> Optional[CourseDetail]:
+    """Курс со статистикой (один запрос) и список уроков (второй запрос)"""
+    async def load() -> Optional[CourseDetail]:
+        enrollments = (
+            select(func.count(UserCourse.id))
+            .where(UserCourse.course_id == Course.id)
+            .scalar_subquery()
+        )
+        completed_lessons = (
+            select(func.count(UserProgress.id))
+            .join(Lesson, UserProgress.lesson_id == Lesson.id)
+            .where(Lesson.course_id == Course.id, UserProgress.completed == True)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            select(Course, enrollments, completed_lessons).where(Course.id == course_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        course, enrollment_count, completed_count = row
+
+        result = await session.execute(
+            select(Lesson.title, Lesson.is_free)
+            .where(Lesson.course_id == course_id)
+            .order_by(Lesson.order)
+        )
+        return CourseDetail(
+            course=course,
+            lessons=[tuple(lesson) for lesson in result],
+            enrollments=int(enrollment_count or 0),
+            completed_lessons=int(completed_count or 0),
+        )
+
+    return await cache.get_or_load(("course", course_id), settings.ANALYTICS_CACHE_TTL, load)
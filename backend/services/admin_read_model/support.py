@@ -0,0 +1,22 @@
+"""
+Read-model админки: открытые тикеты поддержки для админ-бота
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.services.admin_read_model.cache import cache
+from backend.services.support_inbox import InboxTicket, get_inbox
+
+
+def invalidate_support_inbox() -> None:
+    """Сбросить кеш списка тикетов (после ответа или закрытия тикета)"""
+    cache.invalidate("support")
+
+
+async def get_open_tickets(session: AsyncSession, limit: int = 10) -> list[InboxTicket]:
+    """Открытые тикеты по последней активности (счётчики денормализованы в тикете)"""
+    async def load() -> list[InboxTicket]:
+        return await get_inbox(session, status="open", limit=limit)
+
+    return await cache.get_or_load(("support", limit), settings.SUPPORT_INBOX_CACHE_TTL, load)
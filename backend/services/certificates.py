@@ -6,13 +6,6 @@ import os
 from datetime import datetime
 from typing import Optional
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.enums import TA_CENTER
-
 from backend.database.models import User, Course
 
 
@@ -43,6 +36,14 @@ def generate_certificate_pdf(
     Returns:
         Путь к созданному PDF файлу
     """
+    # reportlab тяжёлый - импортируем только при генерации PDF, а не при старте API
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.enums import TA_CENTER
+    
     # Создаем директорию если её нет
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
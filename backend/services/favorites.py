@@ -0,0 +1,127 @@
+"""
+Избранные курсы пользователя
+
+Каталог и карточка курса отмечают is_favorite сами, без запроса
+/api/favorites/check на каждую карточку. Для этого множество id избранных
+курсов пользователя кешируется:
+- в Redis (ключ favorites:<telegram_id>) - общий кеш всех воркеров
+- без Redis - в памяти процесса (LRU)
+Кеш сбрасывается после добавления/удаления (вызывать после коммита),
+FAVORITES_CACHE_TTL - страховка от изменений в обход API.
+
+Без Redis сброс виден только воркеру, который изменил избранное: при
+нескольких воркерах API остальные отдавали бы старые is_favorite (и ETag
+каталога по ним) до FAVORITES_CACHE_TTL. Поэтому тогда кеш в памяти
+живёт LOCAL_SHARED_TTL секунд - хватает на серию запросов одного экрана.
+
+Добавление - один INSERT ... ON CONFLICT DO NOTHING вместо
+"проверить, вставить, поймать IntegrityError".
+"""
+
+import logging
+import time
+from collections import OrderedDict
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.database import async_session
+from backend.database.models import Favorite, User
+from backend.database.upsert import session_insert
+from backend.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "favorites:"
+_MAX_LOCAL_ENTRIES = 10_000
+LOCAL_SHARED_TTL = 2.0
+
+# telegram_id -> (monotonic-время истечения, id курсов); только без Redis
+_local: OrderedDict[int, tuple[float, frozenset]] = OrderedDict()
+
+
+def _local_ttl() -> float:
+    if settings.api_workers <= 1:
+        return settings.FAVORITES_CACHE_TTL
+    return min(LOCAL_SHARED_TTL, settings.FAVORITES_CACHE_TTL)
+
+
+async def _load(telegram_id: int) -> frozenset:
+    # Primary: сразу после добавления реплика может ещё не знать о записи
+    async with async_session() as session:
+        result = await session.execute(
+            select(Favorite.course_id)
+            .join(User, Favorite.user_id == User.id)
+            .where(User.telegram_id == telegram_id)
+        )
+        return frozenset(result.scalars())
+
+
+async def get_favorite_ids(telegram_id: int) -> frozenset:
+    """id избранных курсов пользователя (из кеша или одним запросом)"""
+    redis = get_redis()
+    if redis is not None:
+        try:
+            cached = await redis.get(f"{_KEY_PREFIX}{telegram_id}")
+            if cached is not None:
+                return frozenset(int(course_id) for course_id in cached.split(",") if course_id)
+        except Exception as e:
+            logger.warning("⚠️ [Favorites] Redis недоступен, читаем избранное из БД: %s", e)
+            return await _load(telegram_id)
+        course_ids = await _load(telegram_id)
+        try:
+            await redis.set(
+                f"{_KEY_PREFIX}{telegram_id}",
+                ",".join(str(course_id) for course_id in sorted(course_ids)),
+                ex=settings.FAVORITES_CACHE_TTL,
+            )
+        except Exception as e:
+            logger.warning("⚠️ [Favorites] Не удалось закешировать избранное: %s", e)
+        return course_ids
+
+    entry = _local.get(telegram_id)
+    if entry is not None and entry[0] > time.monotonic():
+        _local.move_to_end(telegram_id)
+        return entry[1]
+    course_ids = await _load(telegram_id)
+    _local[telegram_id] = (time.monotonic() + _local_ttl(), course_ids)
+    _local.move_to_end(telegram_id)
+    while len(_local) > _MAX_LOCAL_ENTRIES:
+        _local.popitem(last=False)
+    return course_ids
+
+
+async def invalidate_favorites(telegram_id: int) -> None:
+    """Сбросить кеш избранного пользователя (после коммита изменений)"""
+    _local.pop(telegram_id, None)
+    redis = get_redis()
+    if redis is not None:
+        try:
+            await redis.delete(f"{_KEY_PREFIX}{telegram_id}")
+        except Exception as e:
+            logger.warning("⚠️ [Favorites] Не удалось сбросить кеш избранного: %s", e)
+
+
+async def add_favorite(session: AsyncSession, user_id: int, course_id: int) -> bool:
+    """
+    Добавить курс в избранное одним запросом; True - добавлен, False - уже был
+
+    Несуществующий курс - IntegrityError (внешний ключ).
+    """
+    insert = session_insert(session)
+    result = await session.execute(
+        insert(Favorite)
+        .values(user_id=user_id, course_id=course_id)
+        .on_conflict_do_nothing(index_elements=[Favorite.user_id, Favorite.course_id])
+        .returning(Favorite.id)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def remove_favorite(session: AsyncSession, user_id: int, course_id: int) -> bool:
+    """Удалить курс из избранного; True - был в избранном"""
+    result = await session.execute(
+        delete(Favorite).where(Favorite.user_id == user_id, Favorite.course_id == course_id)
+    )
+    return result.rowcount > 0
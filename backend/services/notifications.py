@@ -3,22 +3,25 @@
 """
 
 import logging
-from typing import Optional
-from aiogram import Bot
-from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from typing import Optional, TYPE_CHECKING
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from backend.config import settings
 from backend.database import User
+from backend.utils.metrics import install_telegram_metrics
+
+# aiogram импортируется лениво: его загрузка - основная часть времени старта API
+if TYPE_CHECKING:
+    from aiogram import Bot
 
 logger = logging.getLogger(__name__)
 
 # Глобальный экземпляр бота для уведомлений
-_notification_bot: Optional[Bot] = None
+_notification_bot: Optional["Bot"] = None
 
 
-def get_notification_bot() -> Optional[Bot]:
+def get_notification_bot() -> Optional["Bot"]:
     """
     Получить экземпляр бота для отправки уведомлений
     Создается лениво при первом использовании
@@ -27,7 +30,9 @@ def get_notification_bot() -> Optional[Bot]:
     
     if _notification_bot is None and settings.BOT_TOKEN:
         try:
+            from aiogram import Bot
             _notification_bot = Bot(token=settings.BOT_TOKEN)
+            install_telegram_metrics(_notification_bot)
             logger.info("✅ Notification bot initialized")
         except Exception as e:
             logger.error(f"❌ Failed to initialize notification bot: {e}")
@@ -58,6 +63,8 @@ async def send_notification(
         logger.warning("Notification bot not available, skipping notification")
         return False
     
+    from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+    
     try:
         await bot.send_message(
             chat_id=telegram_id,
@@ -0,0 +1,29 @@
+"""
+Сверка зависших pending-платежей с ЮKassa
+
+Статус платежа обновляет webhook ЮKassa, а если он не дошёл - платёж
+висел в pending, пока клиент не откроет /api/payment/status. Фоновая
+сверка проверяет такие платежи у ЮKassa пачками.
+
+- provider - клиент ЮKassa (статус платежа по id)
+- statuses - применение статусов провайдера к платежам и выдача курсов
+- throttle - ограничение одновременности и частоты запросов к ЮKassa
+- reconciler - постраничная сверка
+"""
+
+from backend.services.payment_reconciliation.provider import (
+    PaymentProvider, ProviderError, ProviderPayment, YooKassaProvider,
+    close_yookassa_provider, get_yookassa_provider,
+)
+from backend.services.payment_reconciliation.statuses import (
+    FINAL_STATUSES, ReconcileResult, ReconcileStats, apply_provider_statuses, cancel_pending,
+)
+from backend.services.payment_reconciliation.throttle import RateLimiter, ThrottledFetcher
+from backend.services.payment_reconciliation.reconciler import PaymentReconciler
+
+__all__ = [
+    "PaymentProvider", "ProviderError", "ProviderPayment", "YooKassaProvider",
+    "close_yookassa_provider", "get_yookassa_provider",
+    "FINAL_STATUSES", "ReconcileResult", "ReconcileStats", "apply_provider_statuses", "cancel_pending",
+    "RateLimiter", "ThrottledFetcher", "PaymentReconciler",
+]
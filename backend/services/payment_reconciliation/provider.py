@@ -0,0 +1,108 @@
+"""
+Клиент ЮKassa для сверки и проверки статуса платежей
+
+Async httpx вместо синхронного SDK. 429 и 5xx повторяются с экспоненциальной
+задержкой (Retry-After, если ЮKassa его прислала), остальные ответы - сразу
+ProviderError. Ответы PERMANENT_STATUS_CODES помечаются permanent: ЮKassa
+не знает такой платёж.
+
+Провайдер - любой объект с async get_payment(id) -> ProviderPayment:
+для нагрузочной проверки без ЮKassa см. scripts/reconcile_payments.py --fake.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+import httpx
+
+from backend.config import settings
+
+PROVIDER_RETRIES = 3
+PROVIDER_TIMEOUT = 10.0
+# Ответы ЮKassa "платежа нет": сверка отменяет платёж, получив такой ответ дважды подряд
+PERMANENT_STATUS_CODES = (400, 404)
+
+
+@dataclass(frozen=True)
+class ProviderPayment:
+    id: str
+    # pending, waiting_for_capture, succeeded, canceled
+    status: str
+    payment_method: Optional[str] = None
+
+
+class PaymentProvider(Protocol):
+    async def get_payment(self, payment_id: str) -> ProviderPayment: ...
+
+
+class ProviderError(Exception):
+    """
+    Статус платежа не получен - платёж остаётся pending до следующей проверки
+
+    permanent=True - провайдер не знает такой платёж (см. PERMANENT_STATUS_CODES)
+    """
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+class YooKassaProvider:
+    """Статусы платежей из API ЮKassa (async httpx вместо синхронного SDK)"""
+
+    def __init__(self, shop_id: str, secret_key: str, api_url: str = settings.YUKASSA_API_URL):
+        self._client = httpx.AsyncClient(
+            base_url=api_url.rstrip("/"),
+            auth=(shop_id, secret_key),
+            timeout=PROVIDER_TIMEOUT,
+        )
+
+    async def get_payment(self, payment_id: str) -> ProviderPayment:
+        delay = 1.0
+        permanent = False
+        for attempt in range(PROVIDER_RETRIES):
+            try:
+                response = await self._client.get(f"/payments/{payment_id}")
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if response.status_code == 200:
+                    data = response.json()
+                    return ProviderPayment(
+                        id=data["id"],
+                        status=data["status"],
+                        payment_method=(data.get("payment_method") or {}).get("type"),
+                    )
+                error = f"HTTP {response.status_code}"
+                # 429 и 5xx - временные, остальное повторять бесполезно
+                if response.status_code != 429 and response.status_code < 500:
+                    permanent = response.status_code in PERMANENT_STATUS_CODES
+                    break
+                retry_after = response.headers.get("retry-after", "")
+                delay = float(retry_after) if retry_after.isdigit() else delay
+            if attempt < PROVIDER_RETRIES - 1:
+                await asyncio.sleep(delay)
+                delay *= 2
+        raise ProviderError(f"{payment_id}: {error}", permanent=permanent)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_provider: Optional[YooKassaProvider] = None
+
+
+def get_yookassa_provider() -> Optional[YooKassaProvider]:
+    """Общий клиент ЮKassa процесса или None, если ЮKassa не настроена"""
+    global _provider
+    if _provider is None and settings.YUKASSA_SHOP_ID and settings.YUKASSA_SECRET_KEY:
+        _provider = YooKassaProvider(settings.YUKASSA_SHOP_ID, settings.YUKASSA_SECRET_KEY)
+    return _provider
+
+
+async def close_yookassa_provider() -> None:
+    global _provider
+    if _provider is not None:
+        await _provider.aclose()
+        _provider = None
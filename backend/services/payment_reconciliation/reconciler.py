@@ -0,0 +1,150 @@
+"""
+Фоновая сверка pending-платежей (одна на все воркеры - run_as_leader)
+
+Раз в PAYMENT_RECONCILE_INTERVAL секунд - pending старше STALE_AFTER и моложе
+MAX_AGE страницами по PAGE_SIZE (keyset по (created_at, id), индекс
+ix_payments_status_created), изменения страницы - одной транзакцией. Более
+старые сверка не трогает: их проверяет /api/payment/status.
+
+Ответ "платежа нет" (404/400) отменяет платёж, только если пришёл и в прошлом
+проходе; 404 на всю страницу (скорее неверный YUKASSA_API_URL) - ошибка.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select, tuple_
+
+from backend.config import settings
+from backend.database import async_session
+from backend.database.models import Payment
+from backend.services.payment_reconciliation.provider import PaymentProvider, ProviderError
+from backend.services.payment_reconciliation.statuses import (
+    FINAL_STATUSES, ReconcileStats, apply_provider_statuses, cancel_pending,
+)
+from backend.services.payment_reconciliation.throttle import ThrottledFetcher
+from backend.utils.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+reconciled_total = register(Counter(
+    "payment_reconciliation_total", "Платежи, проверенные сверкой с ЮKassa",
+    ("result",),
+))
+
+
+class PaymentReconciler:
+    """Постраничная сверка pending-платежей с провайдером"""
+
+    def __init__(
+        self,
+        provider: PaymentProvider,
+        page_size: int = settings.PAYMENT_RECONCILE_PAGE_SIZE,
+        concurrency: int = settings.PAYMENT_RECONCILE_CONCURRENCY,
+        rate_limit: float = settings.PAYMENT_RECONCILE_RATE_LIMIT,
+        stale_after: int = settings.PAYMENT_RECONCILE_STALE_AFTER,
+        max_age: int = settings.PAYMENT_RECONCILE_MAX_AGE,
+    ):
+        self.page_size = page_size
+        self.stale_after = stale_after
+        self.max_age = max_age
+        # Платежи, на которые в прошлом проходе пришёл ответ "платежа нет"
+        self._missing: set[int] = set()
+        self._fetcher = ThrottledFetcher(provider, concurrency, rate_limit)
+
+    async def _load_page(self, oldest: datetime, cutoff: datetime, after: Optional[tuple]) -> list:
+        query = (
+            select(Payment.id, Payment.yookassa_payment_id, Payment.created_at)
+            .where(
+                Payment.status == "pending",
+                Payment.created_at >= oldest,
+                Payment.created_at < cutoff,
+                Payment.yookassa_payment_id.isnot(None),
+            )
+            .order_by(Payment.created_at, Payment.id)
+            .limit(self.page_size)
+        )
+        if after is not None:
+            query = query.where(tuple_(Payment.created_at, Payment.id) > tuple_(*after))
+        async with async_session() as session:
+            return (await session.execute(query)).all()
+
+    async def run_once(self) -> ReconcileStats:
+        """Один проход по всем зависшим pending-платежам"""
+        started = time.monotonic()
+        stats = ReconcileStats()
+        now = datetime.now()
+        cutoff = now - timedelta(seconds=self.stale_after)
+        oldest = now - timedelta(seconds=self.max_age)
+        missing_now: set[int] = set()
+        after = None
+        while True:
+            rows = await self._load_page(oldest, cutoff, after)
+            if not rows:
+                break
+            after = (rows[-1].created_at, rows[-1].id)
+            stats.pages += 1
+
+            remotes = await asyncio.gather(*(self._fetcher.fetch(row.yookassa_payment_id) for row in rows))
+            final, missing, answered = [], [], 0
+            for row, remote in zip(rows, remotes):
+                if isinstance(remote, ProviderError) and remote.permanent:
+                    missing.append(row.id)
+                elif isinstance(remote, ProviderError):
+                    stats.errors += 1
+                    stats.failed_ids.append(row.id)
+                else:
+                    answered += 1
+                    if remote.status in FINAL_STATUSES:
+                        final.append((row.id, remote))
+                    else:
+                        stats.unchanged += 1
+            if missing and not answered:
+                # Ни одного платежа страницы ЮKassa не знает - не отменяем их из-за настроек
+                logger.error("❌ [Reconcile] ЮKassa не знает ни одного платежа страницы - проверьте YUKASSA_API_URL")
+                stats.errors += len(missing)
+                stats.failed_ids.extend(missing)
+                missing = []
+            missing_now.update(missing)
+            confirmed = [payment_id for payment_id in missing if payment_id in self._missing]
+            # Первый ответ "платежа нет" - ждём подтверждения в следующем проходе
+            stats.unchanged += len(missing) - len(confirmed)
+
+            async with async_session() as session:
+                result = await apply_provider_statuses(session, final)
+                if confirmed:
+                    stats.not_found += await cancel_pending(session, Payment.id.in_(confirmed))
+                await session.commit()
+            stats.checked += len(rows)
+            stats.succeeded += result.succeeded
+            stats.canceled += result.canceled
+            stats.enrolled += result.enrolled
+            # Финальный статус, но платёж уже обновил webhook
+            stats.unchanged += len(final) - result.succeeded - result.canceled
+
+            if len(rows) < self.page_size:
+                break
+
+        self._missing = missing_now
+        for name in ("succeeded", "canceled", "not_found", "unchanged", "errors"):
+            reconciled_total.inc(getattr(stats, name), name)
+        stats.seconds = time.monotonic() - started
+        if stats.checked:
+            logger.info(
+                "💳 [Reconcile] Проверено %s платежей за %.1f с: оплачено %s, отменено %s, "
+                "неизвестны ЮKassa %s, без изменений %s, ошибок %s",
+                stats.checked, stats.seconds, stats.succeeded, stats.canceled,
+                stats.not_found, stats.unchanged, stats.errors,
+            )
+        return stats
+
+    async def run_forever(self, interval: float) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.error("❌ [Reconcile] Ошибка сверки платежей", exc_info=True)
+            await asyncio.sleep(interval)
@@ -0,0 +1,106 @@
+"""
+Применение статусов провайдера к платежам
+
+Общее для фоновой сверки и /api/payment/status. UPDATE ... RETURNING по
+группам (статус, способ оплаты) и один INSERT ... ON CONFLICT DO NOTHING
+в user_courses для оплаченных. По умолчанию UPDATE только из pending: если
+webhook успел раньше, платёж не трогается и курс повторно не выдаётся.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database.models import Payment, UserCourse
+from backend.database.upsert import session_insert
+from backend.services.payment_reconciliation.provider import ProviderPayment
+
+FINAL_STATUSES = ("succeeded", "canceled")
+
+
+async def cancel_pending(session: AsyncSession, *conditions) -> int:
+    """Отменить pending-платежи по условию (без commit); возвращает число отменённых"""
+    canceled = await session.execute(
+        update(Payment)
+        .where(Payment.status == "pending", *conditions)
+        .values(status="canceled")
+        .execution_options(synchronize_session=False)
+    )
+    return canceled.rowcount
+
+
+@dataclass
+class ReconcileResult:
+    succeeded: int = 0
+    canceled: int = 0
+    enrolled: int = 0
+
+
+async def apply_provider_statuses(
+    session: AsyncSession,
+    statuses: list[tuple[int, ProviderPayment]],
+    succeeded_from: tuple[str, ...] = ("pending",),
+) -> ReconcileResult:
+    """
+    Перевести pending-платежи в финальный статус провайдера (без commit)
+
+    Args:
+        statuses: (payments.id, статус провайдера); не финальные статусы пропускаются
+        succeeded_from: Из каких статусов платёж может стать оплаченным
+            (проверка по запросу клиента исправляет и ошибочно отменённые)
+    """
+    succeeded_by_method: dict[Optional[str], list[int]] = defaultdict(list)
+    canceled_ids = []
+    for payment_id, remote in statuses:
+        if remote.status == "succeeded":
+            succeeded_by_method[remote.payment_method].append(payment_id)
+        elif remote.status == "canceled":
+            canceled_ids.append(payment_id)
+
+    result = ReconcileResult()
+    paid_at = datetime.now()
+    purchases = set()
+    for payment_method, payment_ids in succeeded_by_method.items():
+        rows = await session.execute(
+            update(Payment)
+            .where(Payment.id.in_(payment_ids), Payment.status.in_(succeeded_from))
+            .values(status="succeeded", paid_at=paid_at, payment_method=payment_method)
+            .returning(Payment.user_id, Payment.course_id)
+            .execution_options(synchronize_session=False)
+        )
+        for user_id, course_id in rows:
+            result.succeeded += 1
+            purchases.add((user_id, course_id))
+
+    if purchases:
+        insert = session_insert(session)
+        enrolled = await session.execute(
+            insert(UserCourse)
+            .values([{"user_id": user_id, "course_id": course_id} for user_id, course_id in sorted(purchases)])
+            .on_conflict_do_nothing(index_elements=[UserCourse.user_id, UserCourse.course_id])
+        )
+        result.enrolled = max(enrolled.rowcount, 0)
+
+    if canceled_ids:
+        result.canceled = await cancel_pending(session, Payment.id.in_(canceled_ids))
+    return result
+
+
+@dataclass
+class ReconcileStats:
+    checked: int = 0
+    succeeded: int = 0
+    canceled: int = 0
+    enrolled: int = 0
+    unchanged: int = 0
+    errors: int = 0
+    # Отменены: провайдер не знает платёж два прохода подряд
+    not_found: int = 0
+    pages: int = 0
+    seconds: float = 0.0
+    # Платежи, которые сверка не смогла проверить
+    failed_ids: list[int] = field(default_factory=list)
@@ -0,0 +1,56 @@
+"""
+Ограничение нагрузки сверки на ЮKassa
+
+Не больше concurrency запросов одновременно и не чаще rate в секунду.
+Ошибка по отдельному платежу не прерывает пачку: fetch возвращает
+ProviderError вместо исключения.
+"""
+
+import asyncio
+import logging
+import time
+
+from backend.services.payment_reconciliation.provider import PaymentProvider, ProviderError, ProviderPayment
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Не чаще rate вызовов в секунду: каждый acquire занимает следующий интервал"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class ThrottledFetcher:
+    """Статусы платежей у провайдера с ограничением одновременности и частоты"""
+
+    def __init__(self, provider: PaymentProvider, concurrency: int, rate_limit: float):
+        self.provider = provider
+        self._semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self._limiter = RateLimiter(rate_limit)
+
+    async def fetch(self, yookassa_payment_id: str) -> ProviderPayment | ProviderError:
+        async with self._semaphore:
+            await self._limiter.acquire()
+            try:
+                return await self.provider.get_payment(yookassa_payment_id)
+            except ProviderError as e:
+                error = e
+            except Exception as e:
+                error = ProviderError(f"{yookassa_payment_id}: {type(e).__name__}: {e}")
+        if error.permanent:
+            logger.warning("⚠️ [Reconcile] Платёж %s неизвестен ЮKassa: %s", yookassa_payment_id, error)
+        else:
+            logger.warning("⚠️ [Reconcile] Статус платежа %s не получен: %s", yookassa_payment_id, error)
+        return error
@@ -0,0 +1,18 @@
+"""
+Read-model для команд бота (/courses, /stats, /profile, меню)
+
+- catalog - каталог активных курсов в памяти процесса с проверкой версии
+- users - профиль и статистика пользователя, проверка регистрации
+
+Кеши пользователей для частых запросов API - backend/services/user_cache.py.
+"""
+
+from backend.services.read_model.catalog import (
+    CatalogCourse, CatalogReadModel, CatalogSnapshot, catalog, catalog_version,
+)
+from backend.services.read_model.users import UserSnapshot, get_user_snapshot, is_registered
+
+__all__ = [
+    "CatalogCourse", "CatalogReadModel", "CatalogSnapshot", "catalog", "catalog_version",
+    "UserSnapshot", "get_user_snapshot", "is_registered",
+]
@@ -0,0 +1,117 @@
+"""
+Каталог активных курсов для бота
+
+Каталог, сгруппированный по категориям, держится в памяти процесса. Раз в
+CATALOG_CHECK_INTERVAL секунд сверяется версия каталога (один агрегатный
+запрос), сам каталог перечитывается только при её смене - так изменения
+из API/админ-бота (другие процессы) видны без инвалидации. Готовый текст
+сообщений кешируется для текущей версии каталога.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database.database import read_session
+from backend.database.models import Course
+
+CATALOG_CHECK_INTERVAL = 30.0
+
+
+@dataclass(frozen=True)
+class CatalogCourse:
+    id: int
+    title: str
+    description: str
+    category: str
+    is_top: bool
+    price: Decimal
+    duration_hours: Optional[int]
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: tuple
+    # Категория -> курсы (категории и курсы по алфавиту)
+    by_category: dict[str, tuple[CatalogCourse, ...]]
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.by_category
+
+
+async def catalog_version(session: AsyncSession) -> tuple:
+    """
+    Версия каталога: меняется при добавлении, удалении и изменении курсов
+    """
+    result = await session.execute(
+        select(func.count(Course.id), func.max(Course.id), func.max(Course.updated_at))
+    )
+    count, max_id, updated_at = result.one()
+    return (count, max_id, updated_at.isoformat() if updated_at else None)
+
+
+async def _load_catalog(session: AsyncSession, version: tuple) -> CatalogSnapshot:
+    result = await session.execute(
+        select(
+            Course.id, Course.title, Course.description, Course.category,
+            Course.is_top, Course.price, Course.duration_hours,
+        )
+        .where(Course.is_active == True)
+        .order_by(Course.category, Course.title)
+    )
+    by_category: dict[str, list[CatalogCourse]] = {}
+    for row in result:
+        by_category.setdefault(row.category, []).append(CatalogCourse(*row))
+    return CatalogSnapshot(
+        version=version,
+        by_category={category: tuple(courses) for category, courses in by_category.items()},
+    )
+
+
+class CatalogReadModel:
+    """Каталог в памяти процесса с проверкой версии и кешем отрендеренного текста"""
+
+    def __init__(self, check_interval: float = CATALOG_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._rendered: dict[str, str] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> CatalogSnapshot:
+        if self._snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return self._snapshot
+
+        async with self._lock:
+            # Пока ждали блокировку, каталог мог обновить другой обработчик
+            if self._snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._snapshot
+            async with read_session() as session:
+                version = await catalog_version(session)
+                if self._snapshot is None or version != self._snapshot.version:
+                    self._snapshot = await _load_catalog(session, version)
+                    self._rendered = {}
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def render(self, snapshot: CatalogSnapshot, key: str, renderer: Callable[[CatalogSnapshot], str]) -> str:
+        """Текст для snapshot, построенный renderer один раз на версию каталога"""
+        if snapshot is not self._snapshot:
+            return renderer(snapshot)
+        text = self._rendered.get(key)
+        if text is None:
+            text = self._rendered[key] = renderer(snapshot)
+        return text
+
+    def invalidate(self) -> None:
+        """Проверить версию при следующем обращении (после изменения курсов в этом процессе)"""
+        self._checked_at = 0.0
+
+
+catalog = CatalogReadModel()
@@ -0,0 +1,105 @@
+"""
+Пользователь в командах бота: профиль и статистика, проверка регистрации
+
+Профиль и статистика - один запрос со скалярными подзапросами. Регистрация
+проверяется на каждом апдейте, поэтому положительный ответ кешируется на
+REGISTERED_TTL секунд.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database.database import async_session
+from backend.database.models import User, UserAchievement, UserCourse, UserProgress
+
+REGISTERED_TTL = 10 * 60
+_MAX_REGISTERED = 50_000
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    id: int
+    telegram_id: int
+    full_name: str
+    phone: str
+    username: Optional[str]
+    points: int
+    city: Optional[str]
+    created_at: datetime
+    total_courses: int
+    completed_courses: int
+    completed_lessons: int
+    achievements: int
+
+
+async def get_user_snapshot(session: AsyncSession, telegram_id: int) -> Optional[UserSnapshot]:
+    """
+    Профиль и статистика обучения одним запросом (None - пользователь не зарегистрирован)
+    """
+    total_courses = (
+        select(func.count(UserCourse.id))
+        .where(UserCourse.user_id == User.id)
+        .scalar_subquery()
+    )
+    completed_courses = (
+        select(func.count(UserCourse.id))
+        .where(UserCourse.user_id == User.id, UserCourse.is_completed == True)
+        .scalar_subquery()
+    )
+    completed_lessons = (
+        select(func.count(UserProgress.id))
+        .where(UserProgress.user_id == User.id, UserProgress.completed == True)
+        .scalar_subquery()
+    )
+    achievements = (
+        select(func.count(UserAchievement.id))
+        .where(UserAchievement.user_id == User.id)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        select(
+            User.id, User.telegram_id, User.full_name, User.phone, User.username,
+            User.points, User.city, User.created_at,
+            total_courses, completed_courses, completed_lessons, achievements,
+        ).where(User.telegram_id == telegram_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        _registered.pop(telegram_id, None)
+        return None
+    _remember_registered(telegram_id)
+    return UserSnapshot(*row)
+
+
+# telegram_id -> monotonic-время, до которого считаем пользователя зарегистрированным.
+# Кешируется только положительный ответ: только что зарегистрированный
+# пользователь сразу проходит проверку.
+_registered: dict[int, float] = {}
+
+
+def _remember_registered(telegram_id: int) -> None:
+    if len(_registered) >= _MAX_REGISTERED:
+        now = time.monotonic()
+        for key in [key for key, expires in _registered.items() if expires <= now]:
+            del _registered[key]
+        if len(_registered) >= _MAX_REGISTERED:
+            _registered.clear()
+    _registered[telegram_id] = time.monotonic() + REGISTERED_TTL
+
+
+async def is_registered(telegram_id: int) -> bool:
+    """Зарегистрирован ли пользователь (с кешем положительных ответов)"""
+    expires = _registered.get(telegram_id)
+    if expires is not None and expires > time.monotonic():
+        return True
+    async with async_session() as session:
+        result = await session.execute(select(User.id).where(User.telegram_id == telegram_id))
+        found = result.scalar_one_or_none() is not None
+    if found:
+        _remember_registered(telegram_id)
+    return found
@@ -0,0 +1,235 @@
+"""
+Рекомендации следующего курса по совместным записям (user_courses)
+
+Раз в сутки (RECOMMENDATIONS_BUILD_HOUR по TIMEZONE) и при старте каждый
+воркер строит модель в памяти:
+- user_courses читается потоком с реплики: (пользователь, курс, пройден)
+- матрица пользователь x курс (1 - записан, 2 - прошёл курс) собирается
+  частями по BUILD_CHUNK пользователей: C += X.T @ X (NumPy, в потоке)
+- близость курсов - косинус: C[i, j] / sqrt(C[i, i] * C[j, j])
+- для каждого курса хранятся RECOMMENDATIONS_TOP_K ближайших соседей
+  и популярность (число записавшихся)
+
+Подбор курса - без запросов к БД: сумма близостей соседей курсов
+пользователя (курс, который он только что прошёл, весит больше), кроме
+купленных и неактивных. Если соседей не хватило - популярные курсы той же
+категории, затем просто популярные.
+
+NumPy - опциональная зависимость: без него модель содержит только
+популярность. Импортируется при первом построении модели (в потоке
+пересчёта), а не при импорте приложения - не удлиняет холодный старт.
+"""
+
+import asyncio
+import logging
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.database import read_session
+from backend.database.models import UserCourse
+from backend.utils.metrics import Counter, Gauge, register
+
+logger = logging.getLogger(__name__)
+
+# Пользователей в одной части матрицы: BUILD_CHUNK x курсов float32
+BUILD_CHUNK = 4096
+STREAM_PARTITION = 10_000
+# Вес соседей курса, после которого делается рекомендация
+SEED_WEIGHT = 2.0
+
+recommendations_total = register(Counter(
+    "course_recommendations_total", "Рекомендованные курсы по источнику",
+    ("source",),
+))
+
+
+@dataclass(frozen=True)
+class RecommendationModel:
+    built_at: Optional[datetime] = None
+    # id курса -> ((id соседа, близость), ...) по убыванию близости
+    neighbors: dict[int, tuple[tuple[int, float], ...]] = field(default_factory=dict)
+    # id курса -> записавшихся пользователей
+    popularity: dict[int, int] = field(default_factory=dict)
+
+
+def build_model(user_ids, course_ids, completed, top_k: int) -> RecommendationModel:
+    """
+    Модель по строкам user_courses (массивы одной длины, отсортированы по пользователю)
+
+    CPU-часть пересчёта: вызывается в отдельном потоке.
+    """
+    popularity: dict[int, int] = {}
+    for course_id in course_ids:
+        popularity[course_id] = popularity.get(course_id, 0) + 1
+    try:
+        import numpy as np
+    except ImportError:  # numpy опционален - без него только популярные курсы
+        np = None
+    if np is None or not len(course_ids):
+        return RecommendationModel(built_at=datetime.now(), popularity=popularity)
+
+    users = np.asarray(user_ids, dtype=np.int64)
+    courses, columns = np.unique(np.asarray(course_ids, dtype=np.int64), return_inverse=True)
+    # Пользователи отсортированы - номера строк идут подряд, части берутся срезами
+    _, rows = np.unique(users, return_inverse=True)
+    weights = np.where(np.asarray(completed, dtype=bool), 2.0, 1.0).astype(np.float32)
+
+    size = len(courses)
+    co_occurrence = np.zeros((size, size), dtype=np.float64)
+    total_users = int(rows[-1]) + 1
+    for first in range(0, total_users, BUILD_CHUNK):
+        start, end = np.searchsorted(rows, [first, first + BUILD_CHUNK])
+        chunk = np.zeros((min(BUILD_CHUNK, total_users - first), size), dtype=np.float32)
+        chunk[rows[start:end] - first, columns[start:end]] = weights[start:end]
+        co_occurrence += chunk.T @ chunk
+
+    norms = np.sqrt(np.diag(co_occurrence))
+    similarity = co_occurrence / np.outer(norms, norms)
+    np.fill_diagonal(similarity, 0.0)
+
+    k = min(top_k, size - 1)
+    neighbors = {}
+    if k > 0:
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        for index, candidates in enumerate(top):
+            scores = similarity[index, candidates]
+            order = np.argsort(-scores, kind="stable")
+            neighbors[int(courses[index])] = tuple(
+                (int(courses[candidates[i]]), round(float(scores[i]), 6))
+                for i in order
+                if scores[i] > 0
+            )
+    return RecommendationModel(built_at=datetime.now(), neighbors=neighbors, popularity=popularity)
+
+
+async def _load_enrollments() -> tuple[array, array, array]:
+    user_ids, course_ids, completed = array("q"), array("q"), array("b")
+    async with read_session() as session:
+        result = await session.stream(
+            select(UserCourse.user_id, UserCourse.course_id, UserCourse.is_completed)
+            .order_by(UserCourse.user_id)
+            .execution_options(yield_per=STREAM_PARTITION)
+        )
+        async for partition in result.partitions():
+            for user_id, course_id, is_completed in partition:
+                user_ids.append(user_id)
+                course_ids.append(course_id)
+                completed.append(bool(is_completed))
+    return user_ids, course_ids, completed
+
+
+async def owned_course_ids(session: AsyncSession, user_id: int) -> frozenset:
+    """Курсы пользователя (купленные и выданные) - их не рекомендуем"""
+    result = await session.execute(select(UserCourse.course_id).where(UserCourse.user_id == user_id))
+    return frozenset(result.scalars())
+
+
+class CourseRecommender:
+    """Модель рекомендаций в памяти воркера и её ежесуточный пересчёт"""
+
+    def __init__(self, top_k: int, build_hour: int):
+        self.top_k = top_k
+        self.build_hour = build_hour
+        self.model = RecommendationModel()
+        self._task: Optional[asyncio.Task] = None
+
+    async def rebuild(self) -> RecommendationModel:
+        started = datetime.now()
+        user_ids, course_ids, completed = await _load_enrollments()
+        self.model = await asyncio.to_thread(build_model, user_ids, course_ids, completed, self.top_k)
+        logger.info(
+            "🧭 [Recommendations] Модель пересчитана: %s записей, %s курсов, %.1f с",
+            len(course_ids), len(self.model.popularity), (datetime.now() - started).total_seconds(),
+        )
+        return self.model
+
+    def _seconds_until_build(self) -> float:
+        now = datetime.now(ZoneInfo(settings.TIMEZONE))
+        next_build = now.replace(hour=self.build_hour, minute=0, second=0, microsecond=0)
+        if next_build <= now:
+            next_build += timedelta(days=1)
+        return (next_build - now).total_seconds()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.error("❌ [Recommendations] Ошибка пересчёта модели", exc_info=True)
+            await asyncio.sleep(self._seconds_until_build())
+
+    def start(self) -> None:
+        """Построить модель сейчас и пересчитывать раз в сутки"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="course-recommendations")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def recommend(
+        self,
+        owned: Iterable[int],
+        active: dict[int, str],
+        seed: Optional[int] = None,
+        limit: int = 1,
+    ) -> list[int]:
+        """
+        id курсов для пользователя по убыванию уместности
+
+        Args:
+            owned: Курсы пользователя (не рекомендуются)
+            active: id активного курса -> категория
+            seed: Курс, после которого делается рекомендация (только что пройден)
+            limit: Сколько курсов нужно
+        """
+        model = self.model
+        owned = set(owned)
+        scores: dict[int, float] = {}
+        for course_id in owned | ({seed} if seed is not None else set()):
+            weight = SEED_WEIGHT if course_id == seed else 1.0
+            for neighbor, similarity in model.neighbors.get(course_id, ()):
+                scores[neighbor] = scores.get(neighbor, 0.0) + weight * similarity
+
+        def popular(course_ids) -> list[int]:
+            return sorted(course_ids, key=lambda course_id: (-model.popularity.get(course_id, 0), course_id))
+
+        candidates = [course_id for course_id in active if course_id not in owned and course_id != seed]
+        picked = sorted(
+            (course_id for course_id in candidates if course_id in scores),
+            key=lambda course_id: (-scores[course_id], -model.popularity.get(course_id, 0), course_id),
+        )[:limit]
+        recommendations_total.inc(len(picked), "model")
+
+        if len(picked) < limit:
+            # Та же категория, что у исходного курса (или у курсов пользователя)
+            categories = {active.get(seed)} if seed in active else {active.get(course_id) for course_id in owned}
+            rest = [course_id for course_id in popular(candidates) if course_id not in picked]
+            same_category = [course_id for course_id in rest if active[course_id] in categories][:limit - len(picked)]
+            picked += same_category
+            recommendations_total.inc(len(same_category), "category")
+        if len(picked) < limit:
+            fallback = [course_id for course_id in popular(candidates) if course_id not in picked][:limit - len(picked)]
+            picked += fallback
+            recommendations_total.inc(len(fallback), "popular")
+        return picked
+
+
+recommender = CourseRecommender(
+    top_k=settings.RECOMMENDATIONS_TOP_K,
+    build_hour=settings.RECOMMENDATIONS_BUILD_HOUR,
+)
+
+register(Gauge(
+    "course_recommendations_model_courses", "Курсов с соседями в модели рекомендаций", (),
+    lambda: {(): len(recommender.model.neighbors)},
+))
@@ -0,0 +1,130 @@
+"""
+Инбокс поддержки
+
+Число непрочитанных и последнее сообщение хранятся прямо в SupportTicket
+(unread_count, last_message_*), поэтому список тикетов - один запрос по
+индексу (status, last_message_at) без подсчёта сообщений, а "прочитать
+тикет" - два UPDATE без загрузки сообщений.
+
+Все новые сообщения поддержки добавляются только через post_message(),
+иначе счётчики разойдутся с таблицей сообщений.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import desc, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database.models import SupportMessage, SupportTicket, User
+
+PREVIEW_LENGTH = 255
+
+
+def _preview(text: str) -> str:
+    text = " ".join(text.split())
+    if len(text) <= PREVIEW_LENGTH:
+        return text
+    return text[:PREVIEW_LENGTH - 1] + "…"
+
+
+async def post_message(
+    session: AsyncSession,
+    ticket_id: int,
+    user_id: int,
+    text: str,
+    is_from_admin: bool,
+) -> SupportMessage:
+    """
+    Добавить сообщение в тикет и обновить поля инбокса (коммит - за вызывающим)
+
+    Ответ админа заодно помечает тикет прочитанным.
+    """
+    now = datetime.now()
+    if is_from_admin:
+        await mark_ticket_read(session, ticket_id, now)
+
+    message = SupportMessage(
+        ticket_id=ticket_id,
+        user_id=user_id,
+        message=text,
+        is_from_admin=is_from_admin,
+        created_at=now,
+        read_at=now if is_from_admin else None,
+    )
+    session.add(message)
+
+    values = dict(
+        last_message_at=now,
+        last_message_preview=_preview(text),
+        last_message_from_admin=is_from_admin,
+        updated_at=now,
+    )
+    if not is_from_admin:
+        # Атомарный инкремент: параллельные сообщения не теряются
+        values["unread_count"] = SupportTicket.unread_count + 1
+    await session.execute(
+        update(SupportTicket).where(SupportTicket.id == ticket_id).values(**values)
+    )
+    return message
+
+
+async def mark_ticket_read(session: AsyncSession, ticket_id: int, read_at: Optional[datetime] = None) -> int:
+    """
+    Пометить сообщения пользователя в тикете прочитанными (коммит - за вызывающим)
+
+    Returns:
+        Сколько сообщений было непрочитано
+    """
+    read_at = read_at or datetime.now()
+    # Сначала счётчик: UPDATE блокирует строку тикета до коммита, и сообщение,
+    # пришедшее в это время, увеличит счётчик уже после обнуления
+    await session.execute(
+        update(SupportTicket)
+        .where(SupportTicket.id == ticket_id, SupportTicket.unread_count != 0)
+        .values(unread_count=0)
+    )
+    result = await session.execute(
+        update(SupportMessage)
+        .where(
+            SupportMessage.ticket_id == ticket_id,
+            SupportMessage.is_from_admin == False,
+            SupportMessage.read_at == None,
+        )
+        .values(read_at=read_at)
+    )
+    return result.rowcount
+
+
+@dataclass(frozen=True)
+class InboxTicket:
+    id: int
+    user_full_name: str
+    status: str
+    last_message_at: datetime
+    last_message_preview: Optional[str]
+    last_message_from_admin: Optional[bool]
+    unread: int
+
+
+async def get_inbox(
+    session: AsyncSession,
+    status: str = "open",
+    limit: int = 20,
+    offset: int = 0,
+) -> list[InboxTicket]:
+    """Тикеты по последней активности - один запрос по ix_support_tickets_status_last_message"""
+    result = await session.execute(
+        select(
+            SupportTicket.id, User.full_name, SupportTicket.status,
+            SupportTicket.last_message_at, SupportTicket.last_message_preview,
+            SupportTicket.last_message_from_admin, SupportTicket.unread_count,
+        )
+        .join(User, SupportTicket.user_id == User.id)
+        .where(SupportTicket.status == status)
+        .order_by(desc(SupportTicket.last_message_at))
+        .limit(limit)
+        .offset(offset)
+    )
+    return [InboxTicket(*row) for row in result]
@@ -0,0 +1,115 @@
+"""
+Живые обновления чата поддержки (long-poll по since_id)
+
+Mini App держит запрос /api/support/ticket/updates, пока в тикете не
+появятся сообщения новее since_id. Сигнал "в тикете что-то изменилось"
+приходит:
+- через Redis pub/sub (канал support:ticket:<id>) - админ-бот и воркеры
+  API это разные процессы, каждый воркер слушает каналы одной задачей
+- через локальный hub, если Redis не настроен; тогда ответы из
+  админ-бота подхватываются перепроверкой раз в SUPPORT_LIVE_RECHECK секунд
+
+Сигнал не несёт данных - сообщения читаются из БД по since_id, поэтому
+потерянный или повторный сигнал ничего не ломает.
+"""
+
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Iterator
+
+from backend.config import settings
+from backend.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "support:ticket:"
+
+
+class _LocalHub:
+    """Ожидающие long-poll запросы этого процесса по тикетам"""
+
+    def __init__(self):
+        self._waiters: dict[int, set[asyncio.Event]] = {}
+
+    @contextmanager
+    def subscribe(self, ticket_id: int) -> Iterator[asyncio.Event]:
+        event = asyncio.Event()
+        self._waiters.setdefault(ticket_id, set()).add(event)
+        try:
+            yield event
+        finally:
+            waiters = self._waiters.get(ticket_id)
+            if waiters is not None:
+                waiters.discard(event)
+                if not waiters:
+                    del self._waiters[ticket_id]
+
+    def notify(self, ticket_id: int) -> None:
+        for event in self._waiters.get(ticket_id, ()):
+            event.set()
+
+
+hub = _LocalHub()
+_listener_connected = False
+
+
+def subscribe(ticket_id: int):
+    """Контекст с asyncio.Event, который выставляется при изменениях тикета"""
+    return hub.subscribe(ticket_id)
+
+
+def recheck_interval() -> float:
+    """Как часто перечитывать БД без сигнала (сигналы из других процессов идут только через Redis)"""
+    if _listener_connected:
+        return float(settings.SUPPORT_LIVE_TIMEOUT)
+    return settings.SUPPORT_LIVE_RECHECK
+
+
+async def publish_ticket_update(ticket_id: int) -> None:
+    """Сообщить ожидающим клиентам, что в тикете новое сообщение (вызывать после коммита)"""
+    redis = get_redis()
+    if redis is not None:
+        try:
+            await redis.publish(f"{CHANNEL_PREFIX}{ticket_id}", "1")
+            return
+        except Exception as e:
+            logger.warning("⚠️ [Support] Не удалось опубликовать обновление тикета %s: %s", ticket_id, e)
+    hub.notify(ticket_id)
+
+
+async def listen_ticket_updates() -> None:
+    """
+    Пересылать сигналы из Redis в локальный hub (фоновая задача воркера API)
+
+    Отдельное соединение без socket_timeout: подписка ждёт сообщений сколько угодно.
+    """
+    global _listener_connected
+    from redis.asyncio import Redis
+
+    delay = 1.0
+    while True:
+        redis = Redis.from_url(settings.redis_url, decode_responses=True, socket_connect_timeout=5)
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+            _listener_connected = True
+            delay = 1.0
+            logger.info("✅ [Support] Подписка на обновления тикетов в Redis")
+            async for message in pubsub.listen():
+                if message["type"] != "pmessage":
+                    continue
+                try:
+                    hub.notify(int(message["channel"][len(CHANNEL_PREFIX):]))
+                except ValueError:
+                    continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("⚠️ [Support] Подписка на обновления тикетов прервана: %s", e)
+        finally:
+            _listener_connected = False
+            await pubsub.aclose()
+            await redis.aclose()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 30.0)
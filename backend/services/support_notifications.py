@@ -0,0 +1,249 @@
+"""
+Фоновые уведомления админов о тикетах поддержки
+
+Запрос пользователя только кладёт событие в память процесса и сразу
+возвращает ответ - отправкой в Telegram занимается фоновая очередь:
+- первое сообщение тикета уходит админам сразу, следующие за
+  SUPPORT_NOTIFY_DIGEST_WINDOW секунд собираются в один дайджест
+  (раньше - если набралось SUPPORT_NOTIFY_DIGEST_SIZE сообщений)
+- SUPPORT_NOTIFY_CONCURRENCY обработчиков рассылают админам параллельно
+- временные ошибки Telegram (429, сеть, 5xx) повторяются с паузой
+
+Очередь своя у каждого воркера API. Если она переполнена, уведомление
+теряется, но тикет уже сохранён и виден в /support админ-бота.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from html import escape
+from typing import Optional
+
+from backend.config import settings
+from backend.utils.metrics import Counter, Gauge, register
+
+logger = logging.getLogger(__name__)
+
+DRAIN_TIMEOUT = 10.0
+MESSAGE_PREVIEW = 500
+DIGEST_MESSAGE_PREVIEW = 200
+
+notifications_total = register(Counter(
+    "support_admin_notifications_total", "Уведомления админов о тикетах поддержки",
+    ("result",),
+))
+
+
+@dataclass(frozen=True)
+class SupportEvent:
+    ticket_id: int
+    user_full_name: str
+    user_telegram_id: int
+    text: str
+    is_new_ticket: bool = False
+
+
+def _cut(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def render_notification(events: list[SupportEvent]) -> str:
+    """Текст уведомления: одно событие - как раньше, несколько - дайджест"""
+    first = events[0]
+    user_line = (
+        f"👤 Пользователь: {escape(first.user_full_name)}\n"
+        f"🆔 Telegram ID: <code>{first.user_telegram_id}</code>\n"
+    )
+    footer = "💡 Ответьте пользователю через админ-бота"
+
+    if len(events) == 1:
+        text = escape(_cut(first.text, MESSAGE_PREVIEW))
+        if first.is_new_ticket:
+            return (
+                f"🆕 <b>Новый тикет поддержки</b>\n\n"
+                f"{user_line}"
+                f"📋 Тикет: #{first.ticket_id}\n\n"
+                f"💬 Сообщение:\n{text}\n\n"
+                f"{footer}"
+            )
+        return (
+            f"💬 <b>Новое сообщение в тикете #{first.ticket_id}</b>\n\n"
+            f"{user_line}\n"
+            f"💬 Сообщение:\n{text}\n\n"
+            f"{footer}"
+        )
+
+    title = "🆕 <b>Новый тикет" if any(e.is_new_ticket for e in events) else "💬 <b>Тикет"
+    messages = "\n\n".join(f"• {escape(_cut(e.text, DIGEST_MESSAGE_PREVIEW))}" for e in events)
+    return (
+        f"{title} #{first.ticket_id}: {len(events)} новых сообщений</b>\n\n"
+        f"{user_line}\n"
+        f"{messages}\n\n"
+        f"{footer}"
+    )
+
+
+class _TicketDigest:
+    __slots__ = ("events", "timer")
+
+    def __init__(self):
+        self.events: list[SupportEvent] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class AdminNotifier:
+    """Склейка событий по тикетам и параллельная рассылка админам с повторами"""
+
+    def __init__(
+        self,
+        concurrency: int,
+        queue_size: int,
+        digest_window: float,
+        digest_size: int,
+        retries: int,
+    ):
+        self.concurrency = concurrency
+        self.digest_window = digest_window
+        self.digest_size = max(digest_size, 1)
+        self.retries = max(retries, 1)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._digests: dict[int, _TicketDigest] = {}
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"support-notify-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    def submit(self, event: SupportEvent) -> None:
+        """Принять событие (не блокирует и не бросает исключений)"""
+        if not settings.admin_ids_list:
+            logger.warning("⚠️ [Support] Список админов пуст, уведомления не отправляются")
+            return
+        self.start()
+
+        digest = self._digests.get(event.ticket_id)
+        if digest is None:
+            # Тикет давно не писал - уведомляем сразу и открываем окно склейки
+            digest = self._digests[event.ticket_id] = _TicketDigest()
+            digest.events.append(event)
+            self._flush(event.ticket_id)
+            return
+
+        digest.events.append(event)
+        if len(digest.events) >= self.digest_size:
+            self._flush(event.ticket_id)
+
+    def _flush(self, ticket_id: int) -> None:
+        digest = self._digests[ticket_id]
+        events, digest.events = digest.events, []
+        if digest.timer is not None:
+            digest.timer.cancel()
+        digest.timer = asyncio.get_running_loop().call_later(
+            self.digest_window, self._window_closed, ticket_id
+        )
+        if events:
+            self._enqueue(render_notification(events))
+
+    def _window_closed(self, ticket_id: int) -> None:
+        digest = self._digests.get(ticket_id)
+        if digest is None:
+            return
+        if digest.events:
+            self._flush(ticket_id)
+        else:
+            del self._digests[ticket_id]
+
+    def _enqueue(self, text: str) -> None:
+        for admin_id in settings.admin_ids_list:
+            try:
+                self.queue.put_nowait((admin_id, text))
+            except asyncio.QueueFull:
+                notifications_total.inc(1, "dropped")
+                logger.warning("⚠️ [Support] Очередь уведомлений переполнена, админ %s пропущен", admin_id)
+
+    async def _worker(self) -> None:
+        while True:
+            admin_id, text = await self.queue.get()
+            try:
+                await self._deliver(admin_id, text)
+            except Exception:
+                notifications_total.inc(1, "failed")
+                logger.error("❌ [Support] Ошибка отправки уведомления админу %s", admin_id, exc_info=True)
+            finally:
+                self.queue.task_done()
+
+    async def _deliver(self, admin_id: int, text: str) -> None:
+        from aiogram.exceptions import (
+            TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter,
+        )
+        from backend.services.notifications import get_notification_bot
+
+        bot = get_notification_bot()
+        if bot is None:
+            notifications_total.inc(1, "failed")
+            return
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                await bot.send_message(chat_id=admin_id, text=text, parse_mode="HTML")
+                notifications_total.inc(1, "sent")
+                return
+            except (TelegramForbiddenError, TelegramBadRequest) as e:
+                # Повтор не поможет (админ заблокировал бота, неверный чат)
+                notifications_total.inc(1, "failed")
+                logger.warning("⚠️ [Support] Админ %s не получил уведомление: %s", admin_id, e)
+                return
+            except TelegramRetryAfter as e:
+                delay = e.retry_after
+            except Exception as e:
+                # Сеть, 5xx Telegram
+                delay = 2 ** attempt
+                logger.warning("⚠️ [Support] Попытка %s отправки админу %s: %s", attempt, admin_id, e)
+            if attempt < self.retries:
+                notifications_total.inc(1, "retried")
+                await asyncio.sleep(delay)
+
+        notifications_total.inc(1, "failed")
+        logger.error("❌ [Support] Уведомление админу %s не отправлено после %s попыток", admin_id, self.retries)
+
+    async def stop(self, timeout: float = DRAIN_TIMEOUT) -> None:
+        """Отправить накопленные дайджесты, дождаться очереди (не дольше timeout) и остановиться"""
+        for ticket_id, digest in list(self._digests.items()):
+            if digest.timer is not None:
+                digest.timer.cancel()
+            if digest.events:
+                self._enqueue(render_notification(digest.events))
+        self._digests.clear()
+
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ [Support] Не отправлено %s уведомлений при остановке", self.queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+admin_notifier = AdminNotifier(
+    concurrency=settings.SUPPORT_NOTIFY_CONCURRENCY,
+    queue_size=settings.SUPPORT_NOTIFY_QUEUE_SIZE,
+    digest_window=settings.SUPPORT_NOTIFY_DIGEST_WINDOW,
+    digest_size=settings.SUPPORT_NOTIFY_DIGEST_SIZE,
+    retries=settings.SUPPORT_NOTIFY_RETRIES,
+)
+
+register(Gauge(
+    "support_admin_notifications_queue_size", "Уведомления админов в очереди", (),
+    lambda: {(): admin_notifier.queue.qsize()},
+))
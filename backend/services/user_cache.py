@@ -0,0 +1,82 @@
+"""
+Кеши пользователя для частых запросов API (heartbeat, избранное, каталог)
+
+- users.id по telegram_id. Запись живёт USER_ID_TTL секунд: пользователя могут
+  удалить и зарегистрировать заново (или перенести импортом) в другом
+  процессе, а forget_user_id чистит кеш только текущего воркера.
+- Курсы пользователя для проверки доступа к урокам.
+
+Кеши в памяти процесса, с ограничением размера (LRU).
+"""
+
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import select
+
+from backend.database.database import async_session
+from backend.database.models import User, UserCourse
+
+USER_ID_TTL = 60.0
+OWNED_TTL = 10 * 60
+# Курса нет в наборе - перечитать из БД, но не чаще раза в столько секунд
+OWNED_REFRESH_INTERVAL = 10.0
+_MAX_USER_IDS = 50_000
+_MAX_OWNED = 50_000
+
+# telegram_id -> (monotonic-время истечения, users.id)
+_user_ids: OrderedDict[int, tuple[float, int]] = OrderedDict()
+
+
+async def resolve_user_id(telegram_id: int) -> Optional[int]:
+    """users.id по telegram_id (с кешем найденных пользователей; промах читает primary)"""
+    entry = _user_ids.get(telegram_id)
+    if entry is not None and entry[0] > time.monotonic():
+        _user_ids.move_to_end(telegram_id)
+        return entry[1]
+    async with async_session() as session:
+        result = await session.execute(select(User.id).where(User.telegram_id == telegram_id))
+        user_id = result.scalar_one_or_none()
+    if user_id is None:
+        _user_ids.pop(telegram_id, None)
+        return None
+    _user_ids[telegram_id] = (time.monotonic() + USER_ID_TTL, user_id)
+    _user_ids.move_to_end(telegram_id)
+    while len(_user_ids) > _MAX_USER_IDS:
+        _user_ids.popitem(last=False)
+    return user_id
+
+
+def forget_user_id(user_id: int) -> None:
+    """Убрать из кеша пользователя, которого больше нет в БД"""
+    for telegram_id in [t for t, (_, u) in _user_ids.items() if u == user_id]:
+        del _user_ids[telegram_id]
+    _owned_courses.pop(user_id, None)
+
+
+# users.id -> (monotonic-время загрузки, id курсов пользователя). Курсы почти
+# всегда только добавляются: курс, которого нет в наборе, перечитывает набор
+# с primary (покупка видна сразу), но не чаще OWNED_REFRESH_INTERVAL - перебор
+# чужих уроков не превращается в запрос на каждый heartbeat
+_owned_courses: OrderedDict[int, tuple[float, frozenset]] = OrderedDict()
+
+
+async def user_owns_course(user_id: int, course_id: int) -> bool:
+    """Есть ли у пользователя курс (купленный или выданный), с кешем набора курсов"""
+    entry = _owned_courses.get(user_id)
+    if entry is not None:
+        _owned_courses.move_to_end(user_id)
+        age = time.monotonic() - entry[0]
+        if course_id in entry[1] and age < OWNED_TTL:
+            return True
+        if course_id not in entry[1] and age < OWNED_REFRESH_INTERVAL:
+            return False
+    async with async_session() as session:
+        result = await session.execute(select(UserCourse.course_id).where(UserCourse.user_id == user_id))
+        owned = frozenset(result.scalars())
+    _owned_courses[user_id] = (time.monotonic(), owned)
+    _owned_courses.move_to_end(user_id)
+    while len(_owned_courses) > _MAX_OWNED:
+        _owned_courses.popitem(last=False)
+    return course_id in owned
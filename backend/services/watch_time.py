@@ -0,0 +1,205 @@
+"""
+Время просмотра уроков (UserProgress.watch_time) по heartbeat плеера
+
+Плеер шлёт /api/lessons/{id}/heartbeat каждые несколько секунд. Запись
+в БД на каждый heartbeat - тысячи UPDATE в секунду, поэтому:
+- heartbeat только прибавляет секунды в буфер воркера по ключу
+  (пользователь, урок) - без запросов к БД. Засчитывается не больше
+  WATCH_TIME_MAX_HEARTBEAT секунд и не больше, чем прошло с прошлого
+  heartbeat этого ключа: незасчитанные доли секунды переносятся, а запас
+  HEARTBEAT_SLACK на сетевой джиттер даётся ключу один раз, поэтому за
+  любой отрезок времени засчитывается не больше его длины плюс
+  WATCH_TIME_MAX_HEARTBEAT + HEARTBEAT_SLACK (повторы запроса не накручивают время)
+- ограничение действует в пределах воркера: прошедшее время считается
+  по heartbeat, попавшим в этот процесс. gunicorn раздаёт запросы разным
+  воркерам, поэтому клиент, который шлёт heartbeat чаще плеера, может получить
+  до N x (длина отрезка) при N воркерах. Для статистики просмотров это
+  допустимо; за watch_time не начисляются баллы и не открывается доступ
+- раз в WATCH_TIME_FLUSH_INTERVAL секунд (раньше - если в буфере
+  WATCH_TIME_MAX_KEYS пар) буфер пишется пачкой:
+  INSERT ... ON CONFLICT (user_id, lesson_id) DO UPDATE
+  SET watch_time = watch_time + excluded.watch_time
+- прибавление, а не перезапись: буферы разных воркеров не мешают друг другу
+- при ошибке записи секунды возвращаются в буфер, при остановке
+  воркера буфер записывается (stop)
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from backend.config import settings
+from backend.database import async_session
+from backend.database.models import Lesson, User, UserProgress
+from backend.database.upsert import dialect_insert
+from backend.services.user_cache import forget_user_id
+from backend.utils.metrics import Counter, Gauge, register
+
+logger = logging.getLogger(__name__)
+
+# 4 параметра на строку: 1000 строк далеко от лимита asyncpg (32767)
+FLUSH_CHUNK = 1000
+# Запас к прошедшему времени (один на ключ): heartbeat приходят с сетевым джиттером
+HEARTBEAT_SLACK = 5.0
+
+heartbeats_total = register(Counter(
+    "watch_time_heartbeats_total", "Heartbeat плеера уроков",
+    ("result",),
+))
+flushed_rows_total = register(Counter(
+    "watch_time_flushed_rows_total", "Строк user_progress, записанных из буфера просмотров",
+    ("result",),
+))
+
+
+def _upsert_statement(dialect: str, rows: list[dict]):
+    statement = dialect_insert(dialect)(UserProgress).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[UserProgress.user_id, UserProgress.lesson_id],
+        set_={"watch_time": UserProgress.watch_time + statement.excluded.watch_time},
+    )
+
+
+async def _write(rows: list[dict]) -> None:
+    if not rows:
+        return
+    async with async_session() as session:
+        dialect = session.bind.dialect.name
+        for start in range(0, len(rows), FLUSH_CHUNK):
+            await session.execute(_upsert_statement(dialect, rows[start:start + FLUSH_CHUNK]))
+        await session.commit()
+
+
+async def _drop_missing(rows: list[dict]) -> list[dict]:
+    user_ids = {row["user_id"] for row in rows}
+    lesson_ids = {row["lesson_id"] for row in rows}
+    async with async_session() as session:
+        users = set((await session.execute(select(User.id).where(User.id.in_(user_ids)))).scalars())
+        lessons = set((await session.execute(select(Lesson.id).where(Lesson.id.in_(lesson_ids)))).scalars())
+    kept = [row for row in rows if row["user_id"] in users and row["lesson_id"] in lessons]
+    flushed_rows_total.inc(len(rows) - len(kept), "dropped")
+    for user_id in user_ids - users:
+        forget_user_id(user_id)
+    return kept
+
+
+class WatchTimeBuffer:
+    """Накопление секунд просмотра в памяти и периодическая запись пачкой"""
+
+    def __init__(self, flush_interval: float, max_heartbeat: int, max_keys: int):
+        self.flush_interval = flush_interval
+        self.max_heartbeat = max_heartbeat
+        self.max_keys = max_keys
+        self._pending: dict[tuple[int, int], int] = {}
+        # ключ -> (время прошлого heartbeat, незасчитанный остаток секунд)
+        self._last_seen: dict[tuple[int, int], tuple[float, float]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="watch-time-flush")
+
+    def add(self, user_id: int, lesson_id: int, seconds: float) -> int:
+        """Засчитать просмотр (не больше max_heartbeat секунд за раз); возвращает принятые секунды"""
+        key = (user_id, lesson_id)
+        now = time.monotonic()
+        seen = self._last_seen.get(key)
+        if seen is None:
+            # Первый heartbeat: прошедшее время неизвестно, остаток - разовый запас
+            budget = float(self.max_heartbeat)
+            carry = HEARTBEAT_SLACK
+        else:
+            budget = seen[1] + (now - seen[0])
+            carry = None
+        accepted = int(min(max(seconds, 0), self.max_heartbeat, budget))
+        # Остаток не копится дольше запаса: пауза плеера не даёт "кредит" на потом
+        self._last_seen[key] = (now, carry if carry is not None else min(budget - accepted, HEARTBEAT_SLACK))
+        if accepted == 0:
+            heartbeats_total.inc(1, "empty")
+            return 0
+        self.start()
+        self._pending[key] = self._pending.get(key, 0) + accepted
+        heartbeats_total.inc(1, "accepted")
+        if len(self._pending) >= self.max_keys:
+            self._wakeup.set()
+        return accepted
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.error("❌ [WatchTime] Ошибка записи буфера просмотров", exc_info=True)
+
+    def _forget_idle(self) -> None:
+        # Ключи без heartbeat дольше max_heartbeat больше не ограничивают прирост
+        deadline = time.monotonic() - self.max_heartbeat
+        for key in [key for key, (seen, _) in self._last_seen.items() if seen < deadline]:
+            del self._last_seen[key]
+
+    async def flush(self) -> int:
+        """Записать накопленное; при ошибке секунды остаются в буфере до следующей записи"""
+        async with self._flush_lock:
+            self._forget_idle()
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            # Один порядок строк во всех воркерах - без взаимных блокировок в PostgreSQL
+            rows = [
+                {"user_id": user_id, "lesson_id": lesson_id, "watch_time": seconds, "completed": False}
+                for (user_id, lesson_id), seconds in sorted(pending.items())
+            ]
+            try:
+                try:
+                    await _write(rows)
+                except IntegrityError:
+                    # Пользователя или урок удалили, пока секунды лежали в буфере
+                    rows = await _drop_missing(rows)
+                    await _write(rows)
+            except Exception:
+                for key, seconds in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + seconds
+                flushed_rows_total.inc(len(rows), "failed")
+                raise
+            flushed_rows_total.inc(len(rows), "written")
+            logger.debug("[WatchTime] Записано %s строк просмотров", len(rows))
+            return len(rows)
+
+    async def stop(self) -> None:
+        """Остановить периодическую запись и записать остаток буфера"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.error("❌ [WatchTime] Не записано %s пар просмотров при остановке", self.size, exc_info=True)
+
+
+watch_time_buffer = WatchTimeBuffer(
+    flush_interval=settings.WATCH_TIME_FLUSH_INTERVAL,
+    max_heartbeat=settings.WATCH_TIME_MAX_HEARTBEAT,
+    max_keys=settings.WATCH_TIME_MAX_KEYS,
+)
+
+register(Gauge(
+    "watch_time_buffer_size", "Пар (пользователь, урок) в буфере просмотров", (),
+    lambda: {(): watch_time_buffer.size},
+))
+
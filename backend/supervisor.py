@@ -0,0 +1,176 @@
+"""
+Супервизор процессов: API, основной бот и админ-бот в отдельных процессах
+
+Раньше всё крутилось в одном event loop (asyncio.gather), и тяжёлый запрос
+к API (PDF, аналитика) останавливал polling ботов. Теперь:
+- API - gunicorn с несколькими воркерами uvicorn (gunicorn.conf.py)
+- каждый бот - свой процесс (run_bot_production.py / run_admin_bot_production.py)
+- упавший процесс перезапускается с экспоненциальной задержкой
+
+Использование:
+    python -m backend.supervisor              # все сервисы
+    python -m backend.supervisor api bot      # только указанные
+"""
+
+import argparse
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Optional
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICES = ("api", "bot", "admin_bot")
+
+# Задержка перезапуска: 1, 2, 4 ... до 60 секунд;
+# если процесс проработал дольше STABLE_UPTIME - снова с 1 секунды
+MIN_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+STABLE_UPTIME = 60.0
+STOP_TIMEOUT = 30.0
+
+
+def _api_workers() -> int:
+    return settings.api_workers
+
+
+def service_command(name: str) -> list[str]:
+    """Команда запуска сервиса"""
+    if name == "api":
+        # gunicorn не работает на Windows; с одним воркером он не нужен
+        if sys.platform == "win32" or _api_workers() <= 1:
+            return [sys.executable, "run_api.py"]
+        return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "backend.webapp.app:app"]
+    if name == "bot":
+        return [sys.executable, "run_bot_production.py"]
+    if name == "admin_bot":
+        return [sys.executable, "run_admin_bot_production.py"]
+    raise ValueError(f"Неизвестный сервис: {name}")
+
+
+class Service:
+    """Дочерний процесс с политикой перезапуска"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.process: Optional[subprocess.Popen] = None
+        self.started_at = 0.0
+        self.backoff = MIN_BACKOFF
+        self.restart_at = 0.0
+
+    def start(self) -> None:
+        self.process = subprocess.Popen(service_command(self.name), cwd=PROJECT_ROOT)
+        self.started_at = time.monotonic()
+        logger.info("▶️ %s запущен (pid %s)", self.name, self.process.pid)
+
+    def poll(self) -> None:
+        """Проверить процесс и при необходимости запланировать/выполнить перезапуск"""
+        now = time.monotonic()
+        if self.process is None:
+            if now >= self.restart_at:
+                self.start()
+            return
+
+        code = self.process.poll()
+        if code is None:
+            return
+
+        uptime = now - self.started_at
+        if uptime >= STABLE_UPTIME:
+            self.backoff = MIN_BACKOFF
+        logger.error(
+            "❌ %s завершился с кодом %s после %.0f с, перезапуск через %.0f с",
+            self.name, code, uptime, self.backoff,
+        )
+        self.process = None
+        self.restart_at = now + self.backoff
+        self.backoff = min(self.backoff * 2, MAX_BACKOFF)
+
+    def terminate(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+    def wait(self, deadline: float) -> None:
+        if self.process is None:
+            return
+        try:
+            self.process.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            logger.warning("⚠️ %s не остановился за %.0f с - kill", self.name, STOP_TIMEOUT)
+            self.process.kill()
+            self.process.wait()
+
+
+def run(names: list[str]) -> None:
+    """Запустить сервисы и следить за ними до SIGTERM/SIGINT"""
+    services = [Service(name) for name in names]
+    stopping = False
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    for service in services:
+        service.start()
+
+    while not stopping:
+        for service in services:
+            service.poll()
+        time.sleep(0.5)
+
+    logger.info("⛔ Остановка сервисов...")
+    for service in services:
+        service.terminate()
+    deadline = time.monotonic() + STOP_TIMEOUT
+    for service in services:
+        service.wait(deadline)
+    logger.info("✅ Все сервисы остановлены")
+
+
+def default_services() -> list[str]:
+    """Сервисы по умолчанию с учётом SKIP_BOT и заданных токенов"""
+    names = ["api"]
+    # SKIP_BOT=true - бот уже запущен на сервере, локально не нужен
+    if os.getenv("SKIP_BOT", "false").lower() == "true":
+        logger.info("⏭️  Пропуск запуска ботов (SKIP_BOT=true)")
+        return names
+    # В режиме webhook апдейты основного бота принимает API
+    if settings.BOT_TOKEN and not settings.bot_webhook_enabled:
+        names.append("bot")
+    if settings.ADMIN_BOT_TOKEN:
+        names.append("admin_bot")
+    return names
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Запуск API и ботов в отдельных процессах")
+    parser.add_argument("services", nargs="*", metavar="service",
+                        help=f"Сервисы для запуска: {', '.join(SERVICES)} (по умолчанию все)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.services if name not in SERVICES]
+    if unknown:
+        parser.error(f"неизвестные сервисы: {', '.join(unknown)}")
+
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    names = args.services or default_services()
+    logger.info("=" * 60)
+    logger.info("Beauty School - запуск сервисов: %s", ", ".join(names))
+    logger.info("=" * 60)
+    run(names)
+
+
+if __name__ == "__main__":
+    main()
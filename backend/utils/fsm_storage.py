@@ -0,0 +1,83 @@
+"""
+FSM-хранилище для aiogram-ботов
+
+С MemoryStorage незавершённая регистрация терялась при рестарте бота, а
+несколько экземпляров бота (webhook за балансировщиком, шардирование по
+процессам) видели разные состояния. При заданном REDIS_HOST состояние
+хранится в Redis с TTL, и любой экземпляр продолжает диалог пользователя.
+
+Ключи: fsm:<бот>:<bot_id>:<chat>:<user>:<destiny>:{state|data} -
+основной и админ-бот делят одну БД Redis без пересечений.
+"""
+
+import logging
+
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage, DefaultKeyBuilder
+from aiogram.fsm.storage.memory import DisabledEventIsolation, MemoryStorage
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+FSM_STORAGE_BACKENDS = ("auto", "memory", "redis", "fakeredis")
+
+
+def _storage_backend() -> str:
+    backend = settings.FSM_STORAGE.lower()
+    if backend not in FSM_STORAGE_BACKENDS:
+        raise ValueError(f"FSM_STORAGE={settings.FSM_STORAGE}: ожидается одно из {FSM_STORAGE_BACKENDS}")
+    if backend == "auto":
+        return "redis" if settings.redis_enabled else "memory"
+    return backend
+
+
+def fsm_storage_shared() -> bool:
+    """Видно ли состояние FSM всем процессам (Redis), а не только текущему"""
+    return _storage_backend() == "redis"
+
+
+def create_fsm_storage(bot_name: str) -> BaseStorage:
+    """
+    Создать хранилище FSM для бота
+
+    Args:
+        bot_name: Имя бота в ключах Redis ("bot", "admin_bot")
+    """
+    backend = _storage_backend()
+    if backend == "memory":
+        logger.info("🗂 FSM %s: память процесса", bot_name)
+        return MemoryStorage()
+
+    from aiogram.fsm.storage.redis import RedisStorage
+
+    if backend == "fakeredis":
+        try:
+            from fakeredis.aioredis import FakeRedis
+        except ImportError as e:
+            raise RuntimeError("FSM_STORAGE=fakeredis требует пакет fakeredis (pip install fakeredis)") from e
+        redis = FakeRedis()
+    else:
+        from redis.asyncio import Redis
+
+        # Свой клиент: хранилище закрывает его при остановке диспетчера
+        redis = Redis.from_url(settings.redis_url, socket_connect_timeout=5, health_check_interval=30)
+
+    logger.info("🗂 FSM %s: %s (TTL %s с)", bot_name, backend, settings.FSM_STATE_TTL)
+    return RedisStorage(
+        redis=redis,
+        key_builder=DefaultKeyBuilder(prefix=f"fsm:{bot_name}", with_bot_id=True, with_destiny=True),
+        state_ttl=settings.FSM_STATE_TTL or None,
+        data_ttl=settings.FSM_DATA_TTL or None,
+    )
+
+
+def create_events_isolation(storage: BaseStorage) -> BaseEventIsolation:
+    """
+    Изоляция событий одного чата между экземплярами бота
+
+    С Redis апдейты одного пользователя обрабатываются по очереди даже в разных
+    процессах (блокировка в Redis) - шаги регистрации не перепутаются.
+    """
+    if _storage_backend() == "redis":
+        return storage.create_isolation()
+    return DisabledEventIsolation()
@@ -1,48 +1,165 @@
 """
 Настройка логирования
+
+Все записи проходят через QueueHandler: в event loop только кладём запись
+в очередь, а форматирование и запись в stdout/файл делает QueueListener
+в отдельном потоке.
 """
 
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional
 
 from backend.config import settings
 
 
-def setup_logger(name: str = "beauty_school") -> logging.Logger:
+# ID текущего HTTP-запроса (выставляет RequestIdMiddleware)
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RequestContextFilter(logging.Filter):
     """
-    Настраивает и возвращает logger
-    
-    Args:
-        name: Имя logger'а
-    
-    Returns:
-        logging.Logger
+    Добавляет request_id и сэмплирует DEBUG-записи.
+    Работает в потоке вызова, до постановки записи в очередь
+    """
+
+    def __init__(self, debug_sample_rate: float = 1.0):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.DEBUG and self.debug_sample_rate < 1.0:
+            if random.random() >= self.debug_sample_rate:
+                return False
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-строка на запись"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            payload["request_id"] = request_id
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Человекочитаемый формат для разработки"""
+
+    def __init__(self):
+        super().__init__(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        return f"{text} [req={request_id}]" if request_id else text
+
+
+class _PassThroughQueueHandler(logging.handlers.QueueHandler):
     """
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, settings.LOG_LEVEL))
-    
-    # Формат логов
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    
-    # Console handler
+    QueueHandler, который не применяет форматтер в потоке вызова:
+    в потоке вызова подставляются только аргументы сообщения, JSON/текст
+    собирается уже в потоке QueueListener
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Аргументы подставляем сразу, как QueueHandler.prepare: изменяемый
+        # аргумент может поменяться до того, как запись дойдёт до listener
+        record.msg = record.getMessage()
+        record.args = None
+        # Трейсбек превращаем в текст здесь, пока стек ещё доступен
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging() -> None:
+    """
+    Настраивает корневой logger: QueueHandler -> QueueListener -> stdout (+ файл в production)
+    Повторный вызов ничего не делает
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_format = settings.LOG_FORMAT
+    if log_format == "auto":
+        log_format = "json" if settings.ENVIRONMENT == "production" else "text"
+    formatter = JsonFormatter() if log_format == "json" else TextFormatter()
+
+    handlers = []
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # File handler (опционально)
+    handlers.append(console_handler)
+
     if settings.ENVIRONMENT == "production":
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
-        
         file_handler = logging.FileHandler(log_dir / "app.log")
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-    
-    return logger
+        handlers.append(file_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _PassThroughQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Дописывает очередь и останавливает поток QueueListener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logger(name: str = "beauty_school") -> logging.Logger:
+    """
+    Возвращает logger (обработчики настраиваются один раз в setup_logging)
+
+    Args:
+        name: Имя logger'а
+
+    Returns:
+        logging.Logger
+    """
+    setup_logging()
+    return logging.getLogger(name)
 
 
 # Глобальный logger
@@ -53,7 +170,7 @@ logger = setup_logger()
 # Использование в коде:
 # ========================================
 # from backend.utils.logger import logger
-# 
+#
 # logger.info("Приложение запущено")
-# logger.error("Ошибка подключения к БД")
-
+# logger.debug("Детали запроса: %s", details)  # %-аргументы форматируются только если DEBUG включен
+# logger.error("Ошибка подключения к БД", exc_info=True)
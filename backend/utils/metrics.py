@@ -0,0 +1,238 @@
+"""
+Метрики приложения в формате Prometheus (эндпоинт /metrics)
+
+- Латентность HTTP по шаблону роута (/api/courses/{course_id}, а не по id)
+- Число и время SQL-запросов на HTTP-запрос (события before/after_cursor_execute)
+- Время ожидания соединения из пула
+- Латентность вызовов Telegram Bot API
+
+Без внешних зависимостей: счётчики живут в памяти процесса.
+При нескольких воркерах gunicorn /metrics отдаёт значения того воркера,
+который принял запрос, поэтому у каждой серии есть метка worker (pid):
+без неё последовательные опросы попадали бы в разные воркеры и счётчики
+"сбрасывались" и "прыгали". Суммарные значения - агрегацией в Prometheus:
+sum without (worker) (rate(http_request_duration_seconds_count[5m])).
+Перезапущенный воркер - новый pid, то есть новая серия с нуля.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event
+
+
+# Границы бакетов (секунды) - как в prometheus_client по умолчанию
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Counter:
+    """Монотонный счётчик с метками"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> list:
+        with self._lock:
+            return [(self.name, labels, value) for labels, value in self._values.items()]
+
+
+class Histogram:
+    """Гистограмма с фиксированными бакетами и метками"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [счётчики по бакетам..., sum, count]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self) -> list:
+        samples = []
+        with self._lock:
+            for labels, series in self._values.items():
+                for bound, count in zip(self.buckets, series):
+                    samples.append((f"{self.name}_bucket", labels + (_format_value(bound),), count))
+                samples.append((f"{self.name}_bucket", labels + ("+Inf",), series[-1]))
+                samples.append((f"{self.name}_sum", labels, series[-2]))
+                samples.append((f"{self.name}_count", labels, series[-1]))
+        return samples
+
+
+class Gauge:
+    """Значение, вычисляемое в момент сбора (функция возвращает {labels: value})"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, callback):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.callback = callback
+
+    def collect(self) -> list:
+        return [(self.name, labels, value) for labels, value in self.callback().items()]
+
+
+_registry: list = []
+
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+
+# ========================================
+# Метрики
+# ========================================
+http_request_duration = register(Histogram(
+    "http_request_duration_seconds", "Латентность HTTP-запросов",
+    ("method", "route", "status"),
+))
+http_request_db_queries = register(Histogram(
+    "http_request_db_queries", "Число SQL-запросов на HTTP-запрос",
+    ("method", "route"), buckets=QUERY_COUNT_BUCKETS,
+))
+http_request_db_time = register(Histogram(
+    "http_request_db_seconds", "Суммарное время SQL-запросов на HTTP-запрос",
+    ("method", "route"),
+))
+db_pool_wait = register(Histogram(
+    "db_pool_wait_seconds", "Ожидание соединения из пула",
+    ("database",),
+))
+telegram_api_duration = register(Histogram(
+    "telegram_api_duration_seconds", "Латентность вызовов Telegram Bot API",
+    ("method", "ok"),
+))
+
+
+# ========================================
+# Статистика текущего HTTP-запроса
+# ========================================
+class RequestDbStats:
+    __slots__ = ("queries", "query_time", "pool_wait")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.pool_wait = 0.0
+
+
+# Выставляет MetricsMiddleware; события SQLAlchemy выполняются в том же контексте
+request_db_stats: contextvars.ContextVar[Optional[RequestDbStats]] = contextvars.ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def install_query_metrics(engine) -> None:
+    """Считает SQL-запросы и их время для текущего HTTP-запроса"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_time += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        # after_cursor_execute при ошибке не вызывается - не даём стеку расти
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+
+def observe_pool_wait(database: str, seconds: float) -> None:
+    db_pool_wait.observe(seconds, database)
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats.pool_wait += seconds
+
+
+def observe_telegram_call(method: str, seconds: float, ok: bool) -> None:
+    telegram_api_duration.observe(seconds, method, "true" if ok else "false")
+
+
+# ========================================
+# Экспозиция в текстовом формате Prometheus
+# ========================================
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_metrics() -> str:
+    """Все метрики в формате text/plain; version=0.0.4 (с меткой worker)"""
+    # pid на момент сбора: после fork у воркера gunicorn он свой
+    worker = f'worker="{os.getpid()}"'
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        labelnames = metric.labelnames
+        for name, labels, value in metric.collect():
+            names = labelnames + ("le",) if len(labels) > len(labelnames) else labelnames
+            label_str = ",".join([worker] + [f'{n}="{_escape(v)}"' for n, v in zip(names, labels)])
+            lines.append(f"{name}{{{label_str}}} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ========================================
+# Telegram Bot API
+# ========================================
+def install_telegram_metrics(bot) -> None:
+    """Подключает замер латентности ко всем запросам бота (aiogram request middleware)"""
+
+    async def _telegram_metrics_middleware(make_request, bot, method):
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = await make_request(bot, method)
+            ok = True
+            return response
+        finally:
+            observe_telegram_call(type(method).__name__, time.perf_counter() - start, ok)
+
+    bot.session.middleware(_telegram_metrics_middleware)
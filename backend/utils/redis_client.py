@@ -0,0 +1,41 @@
+"""
+Общий клиент Redis (опционально)
+
+Если REDIS_HOST не задан - get_redis() возвращает None, и состояние,
+которое должно быть общим для воркеров (read-your-writes и т.п.),
+живёт в памяти процесса.
+"""
+
+from typing import Optional, TYPE_CHECKING
+
+from backend.config import settings
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+_client: Optional["Redis"] = None
+
+
+def get_redis() -> Optional["Redis"]:
+    """Клиент Redis (создаётся лениво) или None, если Redis не настроен"""
+    global _client
+    if not settings.redis_enabled:
+        return None
+    if _client is None:
+        from redis import asyncio as aioredis
+
+        _client = aioredis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_timeout=2,
+            socket_connect_timeout=2,
+            health_check_interval=30,
+        )
+    return _client
+
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
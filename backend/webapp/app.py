@@ -3,25 +3,62 @@ FastAPI приложение
 Создание и настройка API
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.config import settings
-from backend.webapp.routes import courses, lessons, profile, progress, communities, payment, access, achievements, leaderboard, favorites, reviews, notifications, challenges, certificates, analytics, support
-from backend.webapp.middleware import TelegramAuthMiddleware
-from backend.database.database import create_engine_and_session, get_engine, get_async_session
-import asyncio
+from backend.webapp.routes import courses, lessons, profile, progress, communities, payment, access, achievements, leaderboard, favorites, reviews, notifications, challenges, certificates, analytics, support, bootstrap, exports
+from backend.webapp.middleware import TelegramAuthMiddleware, RequestIdMiddleware, MetricsMiddleware
+from backend.webapp.encoding import CompressionMiddleware
+from backend.webapp.media import MediaMiddleware
+from backend.bot.webhook import setup_bot_webhook
+from backend.webapp.background import start_background_tasks, stop_background_tasks
+from backend.utils.logger import setup_logging
+from backend.utils.metrics import Gauge, register, render_metrics
+from backend.database.database import (
+    close_db, create_engine_and_session, get_engine, get_async_session, get_replica_engine,
+)
+from backend.database.migrate import ensure_migrations
+from backend.utils.redis_client import close_redis
+from backend.database.pool import get_pool_stats, refresh_schema_version
+import hmac
 import logging
-import subprocess
-import os
+import time
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 
+def _pool_connections() -> dict:
+    """Текущее состояние пулов для gauge-метрики"""
+    values = {}
+    try:
+        engines = {"primary": get_engine(), "replica": get_replica_engine()}
+    except RuntimeError:
+        return values
+    for database, engine in engines.items():
+        if engine is None:
+            continue
+        stats = get_pool_stats(engine)
+        for state in ("size", "checkedin", "checkedout", "overflow"):
+            if state in stats:
+                values[(database, state)] = stats[state]
+    return values
+
+
+register(Gauge(
+    "db_pool_connections", "Соединения в пуле по состоянию",
+    ("database", "state"), _pool_connections,
+))
+
+
 def create_app() -> FastAPI:
     """
     Создаёт и настраивает FastAPI приложение
     """
+    setup_logging()
+    
     app = FastAPI(
         title="Beauty School API",
         description="API для Telegram Mini App бьюти-школы",
@@ -29,6 +66,7 @@ def create_app() -> FastAPI:
         docs_url="/api/docs" if settings.ENVIRONMENT == "development" else None,
         redoc_url="/api/redoc" if settings.ENVIRONMENT == "development" else None,
         redirect_slashes=False,  # Отключаем автоматический редирект со слэшем
+        default_response_class=ORJSONResponse,
     )
     
     # ========================================
@@ -45,16 +83,8 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
-    # Добавляем middleware для логирования всех запросов
-    # Временно отключено для диагностики проблемы с event loop
-    # @app.middleware("http")
-    # async def log_requests(request, call_next):
-    #     print(f"📥 [Request] {request.method} {request.url.path}")
-    #     print(f"   Origin: {request.headers.get('origin', 'N/A')}")
-    #     print(f"   X-Telegram-Init-Data: {'Да' if request.headers.get('X-Telegram-Init-Data') else 'Нет'}")
-    #     response = await call_next(request)
-    #     print(f"📤 [Response] {request.method} {request.url.path} -> {response.status_code}")
-    #     return response
+    # Сжатие ответов (снаружи CORS: сжимается итоговое тело)
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.RESPONSE_COMPRESS_MIN_SIZE)
     
     # ========================================
     # Middleware: Проверка Telegram initData
@@ -63,9 +93,23 @@ def create_app() -> FastAPI:
     # В режиме разработки используем обход через X-Telegram-User-ID
     if settings.ENVIRONMENT == "production":
         app.add_middleware(TelegramAuthMiddleware)
-        print("🔒 [App] TelegramAuthMiddleware включен (production mode)")
+        logger.info("🔒 [App] TelegramAuthMiddleware включен (production mode)")
     else:
-        print("🔧 [App] TelegramAuthMiddleware отключен (development mode - используем X-Telegram-User-ID)")
+        logger.info("🔧 [App] TelegramAuthMiddleware отключен (development mode - используем X-Telegram-User-ID)")
+    
+    # ========================================
+    # Middleware: X-Request-ID (добавляется последним = выполняется первым,
+    # чтобы request_id был в логах всех остальных middleware)
+    # ========================================
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, query_count_threshold=settings.METRICS_QUERY_COUNT_THRESHOLD)
+    app.add_middleware(RequestIdMiddleware)
+    
+    # ========================================
+    # Медиа уроков по подписанным ссылкам (/media/*): снаружи всех middleware,
+    # без initData и БД - подпись проверяется по HMAC
+    # ========================================
+    app.add_middleware(MediaMiddleware, root=settings.LOCAL_STORAGE_PATH)
     
     # ========================================
     # Подключение роутеров
@@ -86,14 +130,12 @@ def create_app() -> FastAPI:
     app.include_router(certificates.router, prefix="/api/certificates", tags=["Certificates"])
     app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
     app.include_router(support.router, prefix="/api/support", tags=["Support"])
+    app.include_router(bootstrap.router, prefix="/api/bootstrap", tags=["Bootstrap"])
+    app.include_router(exports.router, prefix="/api/exports", tags=["Exports"])
     
-    # Логирование зарегистрированных роутов для диагностики
-    print("=" * 60)
-    print("📋 Зарегистрированные роуты:")
-    for route in app.routes:
-        if hasattr(route, 'path') and hasattr(route, 'methods'):
-            print(f"   {list(route.methods)} {route.path}")
-    print("=" * 60)
+    # Webhook основного бота (BOT_MODE=webhook) - вместо отдельного процесса с polling
+    if settings.bot_webhook_enabled:
+        setup_bot_webhook(app)
     
     # ========================================
     # Healthcheck эндпоинт
@@ -102,6 +144,30 @@ def create_app() -> FastAPI:
     async def health():
         return {"status": "ok", "environment": settings.ENVIRONMENT}
     
+    @app.get("/health/db")
+    async def health_db():
+        """Статистика пула соединений (checked-out, overflow, время ожидания)"""
+        stats = {"primary": get_pool_stats(get_engine())}
+        replica_engine = get_replica_engine()
+        if replica_engine is not None:
+            stats["replica"] = get_pool_stats(replica_engine)
+        return stats
+    
+    if settings.METRICS_ENABLED:
+        # Без токена /metrics открыт только в разработке
+        metrics_open = not settings.METRICS_TOKEN and settings.ENVIRONMENT == "development"
+        if not settings.METRICS_TOKEN and not metrics_open:
+            logger.warning("⚠️ [App] METRICS_TOKEN не задан - /metrics отвечает 401")
+        
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics(authorization: Optional[str] = Header(None)):
+            """Метрики в формате Prometheus"""
+            if not metrics_open and not (settings.METRICS_TOKEN and hmac.compare_digest(
+                authorization or "", f"Bearer {settings.METRICS_TOKEN}"
+            )):
+                raise HTTPException(status_code=401, detail="Unauthorized")
+            return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+    
     # ========================================
     # Startup/Shutdown events для правильной инициализации БД
     # ========================================
@@ -111,6 +177,7 @@ def create_app() -> FastAPI:
         Инициализация при запуске приложения
         Создаем engine и session в правильном event loop
         """
+        startup_started = time.perf_counter()
         logger.info("🚀 Application startup event")
         
         # КРИТИЧНО: создаем engine и session в startup_event
@@ -125,101 +192,31 @@ def create_app() -> FastAPI:
         app.state.engine = get_engine()
         app.state.async_session = get_async_session()
         
-        # Применяем миграции базы данных
-        try:
-            await apply_migrations()
-            logger.info("✅ Database migrations applied")
-        except Exception as e:
-            logger.error(f"❌ Error applying migrations: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        # Запускаем фоновую задачу для напоминаний
-        asyncio.create_task(run_periodic_reminders())
-        logger.info("✅ Background task for reminders started")
-    
-    async def apply_migrations():
-        """
-        Применяет миграции Alembic к базе данных
-        Выполняется через subprocess, так как alembic требует синхронного выполнения
-        """
+        # Миграции: в проде их применяет release-шаг, здесь - быстрая проверка
+        # alembic_version и upgrade под advisory lock только если схема отстаёт
         try:
-            logger.info("🔄 Checking database migrations...")
-            
-            # Запускаем alembic upgrade head в отдельном процессе
-            # Это гарантирует правильное применение всех миграций
-            result = subprocess.run(
-                ["alembic", "upgrade", "head"],
-                cwd=os.getcwd(),
-                capture_output=True,
-                text=True,
-                timeout=60  # Таймаут 60 секунд
-            )
-            
-            if result.returncode == 0:
-                logger.info("✅ Database migrations applied successfully")
-                if result.stdout:
-                    logger.info(f"Migration output: {result.stdout}")
-            else:
-                logger.error(f"❌ Migration failed with return code {result.returncode}")
-                logger.error(f"Error output: {result.stderr}")
-                # Не прерываем запуск приложения, но логируем ошибку
-                logger.warning("⚠️ Continuing startup despite migration errors")
-                
-        except subprocess.TimeoutExpired:
-            logger.error("❌ Migration timeout - migrations took too long")
-        except FileNotFoundError:
-            logger.warning("⚠️ Alembic not found in PATH - skipping automatic migrations")
-            logger.warning("💡 Please run 'alembic upgrade head' manually")
-        except Exception as e:
-            logger.error(f"❌ Error applying migrations: {e}")
-            import traceback
-            traceback.print_exc()
-            # Не прерываем запуск приложения
-            logger.warning("⚠️ Continuing startup despite migration errors")
-    
-    async def run_periodic_reminders():
-        """
-        Фоновая задача: отправка напоминаний каждые 24 часа
-        Автоматически запускается при старте API
-        """
-        from backend.services.scheduled_notifications import send_inactive_course_reminders
-        from backend.database.database import get_async_session
+            status = await ensure_migrations(get_engine(), settings.MIGRATIONS_ON_STARTUP)
+            logger.info(f"✅ Database migrations: {status}")
+        except Exception:
+            logger.error("❌ Error checking/applying migrations", exc_info=True)
         
-        # Ждем 1 минуту после старта, чтобы БД точно была готова
-        await asyncio.sleep(60)
+        # Запоминаем версию схемы - от неё зависит валидность кеша prepared statements
+        engine = get_engine()
+        await refresh_schema_version(engine)
         
-        while True:
-            try:
-                logger.info("📱 Запуск отправки напоминаний о незавершенных курсах...")
-                
-                # Используем существующую фабрику сессий
-                session_factory = get_async_session()
-                async with session_factory() as session:
-                    try:
-                        result = await send_inactive_course_reminders(session)
-                        logger.info(f"✅ Напоминания отправлены: {result}")
-                    except Exception as e:
-                        logger.error(f"❌ Ошибка отправки напоминаний: {e}")
-                
-                # Ждем 24 часа до следующего запуска
-                await asyncio.sleep(24 * 60 * 60)  # 24 часа в секундах
-                
-            except asyncio.CancelledError:
-                logger.info("⛔ Background task cancelled")
-                break
-            except Exception as e:
-                logger.error(f"❌ Ошибка в фоновой задаче напоминаний: {e}")
-                # При ошибке ждем 1 час перед повтором
-                await asyncio.sleep(60 * 60)
+        # Напоминания, сверка платежей, рекомендации, webhook бота и т.д.
+        await start_background_tasks(app, engine)
+        logger.info(f"🚀 Startup complete in {(time.perf_counter() - startup_started) * 1000:.0f} ms")
     
     @app.on_event("shutdown")
     async def shutdown_event():
         """
         Закрытие соединений при остановке приложения
         """
-        if hasattr(app.state, 'engine') and app.state.engine:
-            await app.state.engine.dispose()
+        await stop_background_tasks(app)
+        # Основной пул и пул реплики
+        await close_db()
+        await close_redis()
         print("✅ Database connections closed")
     
     return app
@@ -0,0 +1,125 @@
+"""
+Фоновые задачи API-процесса
+
+Запускаются в startup после инициализации БД и миграций, останавливаются
+в shutdown до закрытия пулов соединений (задачи ходят в БД). Ссылки на
+задачи хранятся в app.state (*_task).
+"""
+
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.config import settings
+from backend.bot.webhook import start_bot_webhook, stop_bot_webhook
+from backend.services.support_notifications import admin_notifier
+from backend.services.support_live import listen_ticket_updates
+from backend.services.watch_time import watch_time_buffer
+from backend.services.recommendations import recommender
+from backend.services.payment_reconciliation import PaymentReconciler, close_yookassa_provider, get_yookassa_provider
+from backend.database.database import close_export_engine, get_async_session
+from backend.database.locks import run_as_leader
+from backend.database.pool import watch_schema_version
+from backend.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Задачи, которые достаточно отменить (без ожидания)
+CANCEL_ON_SHUTDOWN = ("reminders_task", "support_live_task", "payment_reconcile_task")
+
+
+async def run_periodic_reminders():
+    """
+    Фоновая задача: отправка напоминаний каждые 24 часа
+    Автоматически запускается при старте API
+    """
+    from backend.services.scheduled_notifications import send_inactive_course_reminders
+
+    # Ждем 1 минуту после старта, чтобы БД точно была готова
+    await asyncio.sleep(60)
+
+    while True:
+        try:
+            # Перезапуск/деплой не должен приводить к повторной рассылке:
+            # отметка о последнем запуске общая для всех процессов (Redis)
+            redis = get_redis()
+            if redis is not None and not await redis.set(
+                "schedule:inactive_course_reminders", int(time.time()), nx=True, ex=23 * 60 * 60
+            ):
+                logger.info("⏭️ Напоминания уже отправлялись за последние сутки")
+            else:
+                logger.info("📱 Запуск отправки напоминаний о незавершенных курсах...")
+
+                # Используем существующую фабрику сессий
+                session_factory = get_async_session()
+                async with session_factory() as session:
+                    try:
+                        result = await send_inactive_course_reminders(session)
+                        logger.info(f"✅ Напоминания отправлены: {result}")
+                    except Exception as e:
+                        logger.error(f"❌ Ошибка отправки напоминаний: {e}")
+
+            # Ждем 24 часа до следующего запуска
+            await asyncio.sleep(24 * 60 * 60)  # 24 часа в секундах
+
+        except asyncio.CancelledError:
+            logger.info("⛔ Background task cancelled")
+            break
+        except Exception as e:
+            logger.error(f"❌ Ошибка в фоновой задаче напоминаний: {e}")
+            # При ошибке ждем 1 час перед повтором
+            await asyncio.sleep(60 * 60)
+
+
+async def start_background_tasks(app: FastAPI, engine: AsyncEngine) -> None:
+    """Запуск фоновых задач и webhook бота (после refresh_schema_version)"""
+    if settings.DB_SCHEMA_CHECK_INTERVAL > 0 and engine.dialect.name == "postgresql":
+        app.state.schema_watch_task = asyncio.create_task(
+            watch_schema_version(engine, settings.DB_SCHEMA_CHECK_INTERVAL)
+        )
+
+    # Фоновая задача напоминаний - одна на все воркеры/инстансы (advisory lock)
+    app.state.reminders_task = asyncio.create_task(
+        run_as_leader(engine, "inactive_course_reminders", run_periodic_reminders)
+    )
+    logger.info("✅ Background task for reminders started")
+
+    # Сверка зависших pending-платежей с ЮKassa - одна на все воркеры
+    provider = get_yookassa_provider()
+    if provider is not None and settings.PAYMENT_RECONCILE_INTERVAL > 0:
+        reconciler = PaymentReconciler(provider)
+        app.state.payment_reconcile_task = asyncio.create_task(run_as_leader(
+            engine, "payment_reconciliation",
+            lambda: reconciler.run_forever(settings.PAYMENT_RECONCILE_INTERVAL),
+        ))
+
+    # Модель рекомендаций курсов: строится сейчас, дальше раз в сутки
+    recommender.start()
+
+    # Сигналы о новых сообщениях поддержки из других процессов (админ-бот)
+    if settings.redis_enabled:
+        app.state.support_live_task = asyncio.create_task(listen_ticket_updates())
+
+    if settings.bot_webhook_enabled:
+        await start_bot_webhook()
+
+
+async def stop_background_tasks(app: FastAPI) -> None:
+    """Остановка фоновых задач; пулы БД и Redis закрываются после неё"""
+    await stop_bot_webhook()
+    await admin_notifier.stop()
+    for name in CANCEL_ON_SHUTDOWN:
+        if hasattr(app.state, name):
+            getattr(app.state, name).cancel()
+    await close_yookassa_provider()
+    # Буфер просмотров уроков - до закрытия пула соединений
+    await watch_time_buffer.stop()
+    await recommender.stop()
+    await close_export_engine()
+    # Проверка версии схемы ходит в БД - останавливаем до закрытия пула
+    if hasattr(app.state, 'schema_watch_task'):
+        app.state.schema_watch_task.cancel()
+        await asyncio.gather(app.state.schema_watch_task, return_exceptions=True)
@@ -0,0 +1,257 @@
+"""
+Кодирование ответов API: orjson, готовые TypeAdapter, сжатие
+
+- ORJSONResponse - класс ответа по умолчанию (create_app)
+- json_response(adapter, value) - список моделей сериализуется одним вызовом
+  pydantic-core (TypeAdapter.dump_json), без jsonable_encoder и повторной
+  валидации по response_model
+- CompressionMiddleware - gzip/brotli для ответов больше
+  RESPONSE_COMPRESS_MIN_SIZE байт (brotli - если установлен пакет brotli)
+- EncodedJSON / response_cache - готовые байты ответа и их сжатые варианты
+  для кешируемых эндпоинтов: повторный ответ не сериализуется и не сжимается
+
+Сильный ETag описывает конкретные байты, поэтому у сжатого ответа он свой:
+"<tag>-gzip" / "<tag>-br" (etag_for_coding). http_cache сравнивает
+If-None-Match без этого суффикса - версия данных одна на все кодировки.
+"""
+
+import zlib
+from collections import OrderedDict
+from typing import Any, Mapping, Optional
+
+import orjson
+from pydantic import TypeAdapter
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli опционален - без него только gzip
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Что имеет смысл сжимать (видео, картинки и PDF уже сжаты)
+_COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+CONTENT_CODINGS = ("gzip", "br")
+
+
+def etag_for_coding(etag: str, encoding: str) -> str:
+    """ETag сжатого варианта: '"abc"' -> '"abc-gzip"'"""
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_coding(etag: str) -> str:
+    """ETag без суффикса кодировки (для сравнения с If-None-Match)"""
+    for encoding in CONTENT_CODINGS:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def json_response(
+    adapter: TypeAdapter,
+    value: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """JSON-ответ через готовый TypeAdapter (заголовки из параметра response не переносятся сами)"""
+    return Response(adapter.dump_json(value), status_code, dict(headers or {}), media_type=JSON_MEDIA_TYPE)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Лучшее поддерживаемое сжатие из Accept-Encoding"""
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in accept_encoding.split(",")
+        if not part.strip().endswith(";q=0")
+    }
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Потоковый компрессор с единым интерфейсом для gzip и brotli"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.RESPONSE_BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(settings.RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 = gzip-обёртка
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    compressor = _Compressor(encoding)
+    return compressor.compress(data) + compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    gzip/brotli для ответов от minimum_size байт
+
+    Пропускает ответы, у которых уже есть Content-Encoding (EncodedJSON),
+    и несжимаемые типы. Потоковые ответы сжимаются по частям.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.started = False
+        self.compressor: Optional[_Compressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Заголовки отправим вместе с первым телом: от него зависит, сжимать ли
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or not content_type.startswith(_COMPRESSIBLE_TYPES)
+            )
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if self.passthrough or (len(body) < self.minimum_size and not more_body):
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers:
+                headers["ETag"] = etag_for_coding(headers["etag"], self.encoding)
+            self.compressor = _Compressor(self.encoding)
+            data = self.compressor.compress(body)
+            if not more_body:
+                data += self.compressor.flush()
+                headers["Content-Length"] = str(len(data))
+            elif "content-length" in headers:
+                del headers["Content-Length"]
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.flush()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+
+class EncodedJSON:
+    """Готовое тело JSON-ответа; сжатые варианты считаются один раз по требованию"""
+
+    __slots__ = ("body", "_compressed")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._compressed: dict[str, bytes] = {}
+
+    @classmethod
+    def dump(cls, value: Any, adapter: Optional[TypeAdapter] = None) -> "EncodedJSON":
+        if adapter is not None:
+            return cls(adapter.dump_json(value))
+        return cls(orjson.dumps(value))
+
+    def response(
+        self,
+        request: Request,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Response:
+        response_headers = {name.lower(): value for name, value in (headers or {}).items()}
+        response_headers["vary"] = "Accept-Encoding"
+        body = self.body
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is not None and len(body) >= settings.RESPONSE_COMPRESS_MIN_SIZE:
+            compressed = self._compressed.get(encoding)
+            if compressed is None:
+                compressed = self._compressed[encoding] = compress(body, encoding)
+            body = compressed
+            response_headers["content-encoding"] = encoding
+            if "etag" in response_headers:
+                response_headers["etag"] = etag_for_coding(response_headers["etag"], encoding)
+        return Response(body, status_code, response_headers, media_type=JSON_MEDIA_TYPE)
+
+
+class EncodedCache:
+    """LRU готовых ответов по ключу (обычно ETag из http_cache)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key) -> Optional[EncodedJSON]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, value: EncodedJSON) -> EncodedJSON:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+
+response_cache = EncodedCache(max_entries=settings.RESPONSE_CACHE_ENTRIES)
@@ -0,0 +1,198 @@
+"""
+Условные GET-запросы (ETag / If-None-Match) для редко меняющихся данных
+
+Каталог курсов, сообщества, достижения и челленджи меняются редко, а
+Mini App запрашивает их при каждом открытии. Для них:
+- версия данных - отпечаток строк, из которых строится ответ; каждый
+  воркер перечитывает его не чаще HTTP_CACHE_VERSION_INTERVAL секунд
+- ETag = хеш(версия данных, параметры запроса[, версия данных пользователя])
+- совпал If-None-Match - сразу 304 без основного запроса к БД и сериализации
+
+Персональные ответы (отметки "получено", прогресс челленджа) добавляют
+к ETag маленький агрегат по пользователю и кешируются только клиентом
+(Cache-Control: private).
+"""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.database import read_session
+from backend.database.models import (
+    Achievement, Challenge, Community, Course, Lesson, User, UserAchievement, UserChallenge,
+)
+from backend.utils.metrics import Counter, register
+from backend.webapp.encoding import strip_coding
+
+conditional_requests = register(Counter(
+    "http_conditional_requests_total", "GET-запросы с проверкой ETag",
+    ("route", "result"),
+))
+
+# Cache-Control по типам ответов
+PUBLIC_CACHE_CONTROL = (
+    f"public, max-age={settings.HTTP_CACHE_MAX_AGE}, "
+    f"stale-while-revalidate={settings.HTTP_CACHE_MAX_AGE * 5}"
+)
+# Клиент хранит ответ, но перед использованием сверяет ETag
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+@dataclass(frozen=True)
+class VersionSnapshot:
+    tag: str
+    rows: tuple
+
+
+class DataVersion:
+    """Версия набора данных в памяти процесса (отпечаток строк)"""
+
+    def __init__(self, name: str, loader: Callable[[AsyncSession], Awaitable[list]]):
+        self.name = name
+        self.loader = loader
+        self._snapshot: Optional[VersionSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and time.monotonic() - self._checked_at < settings.HTTP_CACHE_VERSION_INTERVAL
+        )
+
+    async def get(self) -> VersionSnapshot:
+        if self._fresh():
+            return self._snapshot
+        async with self._lock:
+            if self._fresh():
+                return self._snapshot
+            async with read_session() as session:
+                rows = tuple(tuple(row) for row in await self.loader(session))
+            tag = hashlib.sha1(repr(rows).encode()).hexdigest()[:16]
+            self._snapshot = VersionSnapshot(tag=tag, rows=rows)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """Перечитать версию при следующем запросе (после изменений в этом процессе)"""
+        self._checked_at = 0.0
+
+
+async def _execute(session: AsyncSession, query) -> list:
+    return (await session.execute(query)).all()
+
+
+# Только колонки, попадающие в ответы
+courses_version = DataVersion("courses", lambda session: _execute(session, select(
+    Course.id, Course.title, Course.description, Course.full_description, Course.category,
+    Course.cover_image_url, Course.is_top, Course.price, Course.duration_hours,
+    Course.is_active, Course.updated_at,
+).order_by(Course.id)))
+
+lessons_version = DataVersion("lessons", lambda session: _execute(session, select(
+    Lesson.id, Lesson.course_id, Lesson.title, Lesson.order, Lesson.video_duration, Lesson.is_free,
+).order_by(Lesson.id)))
+
+communities_version = DataVersion("communities", lambda session: _execute(session, select(
+    Community.id, Community.title, Community.description, Community.type,
+    Community.city, Community.category, Community.telegram_link,
+).order_by(Community.id)))
+
+achievements_version = DataVersion("achievements", lambda session: _execute(session, select(
+    Achievement.id, Achievement.title, Achievement.description, Achievement.icon_url,
+    Achievement.points, Achievement.condition_type, Achievement.condition_value,
+).order_by(Achievement.id)))
+
+challenges_version = DataVersion("challenges", lambda session: _execute(session, select(
+    Challenge.id, Challenge.is_active, Challenge.start_date, Challenge.end_date,
+    Challenge.title, Challenge.description, Challenge.icon_url, Challenge.points_reward,
+    Challenge.condition_type, Challenge.condition_value,
+).order_by(Challenge.id)))
+
+
+def active_course_categories(snapshot: VersionSnapshot) -> dict[int, str]:
+    """id активного курса -> категория (для рекомендаций)"""
+    return {row[0]: row[4] for row in snapshot.rows if row[9]}
+
+
+def visible_challenge_ids(snapshot: VersionSnapshot, now: Optional[datetime] = None) -> tuple:
+    """Активные сейчас челленджи: список меняется и без изменения строк (start/end_date)"""
+    now = now or datetime.now()
+    return tuple(
+        row[0] for row in snapshot.rows
+        if row[1] and (row[2] is None or row[2] <= now) and (row[3] is None or row[3] >= now)
+    )
+
+
+async def user_achievements_version(session: AsyncSession, telegram_id: int) -> tuple:
+    result = await session.execute(
+        select(func.count(UserAchievement.id), func.max(UserAchievement.earned_at))
+        .join(User, UserAchievement.user_id == User.id)
+        .where(User.telegram_id == telegram_id)
+    )
+    return tuple(result.one())
+
+
+async def user_challenges_version(session: AsyncSession, telegram_id: int) -> tuple:
+    result = await session.execute(
+        select(
+            func.count(UserChallenge.id),
+            func.coalesce(func.sum(UserChallenge.progress), 0),
+            func.count(UserChallenge.id).filter(UserChallenge.is_completed == True),
+        )
+        .join(User, UserChallenge.user_id == User.id)
+        .where(User.telegram_id == telegram_id)
+    )
+    return tuple(result.one())
+
+
+def make_etag(*parts: Any) -> str:
+    """Сильный ETag из версий данных и параметров запроса"""
+    return '"' + hashlib.sha1(repr(parts).encode()).hexdigest()[:20] + '"'
+
+
+def _matches(if_none_match: str, etag: str) -> Optional[str]:
+    """ETag клиента, совпавший с etag (с точностью до суффикса кодировки), или None"""
+    if if_none_match.strip() == "*":
+        return etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        tag = candidate[2:] if candidate.startswith("W/") else candidate
+        if strip_coding(tag) == etag:
+            return candidate
+    return None
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    route: str,
+    etag: str,
+    cache_control: str,
+) -> Optional[Response]:
+    """
+    Ответ 304, если у клиента актуальная версия; иначе None и заголовки ETag/Cache-Control в response
+
+    Использование в эндпоинте (до запросов к БД):
+        not_modified = check_not_modified(request, response, "courses", etag, PUBLIC_CACHE_CONTROL)
+        if not_modified:
+            return not_modified
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    matched = _matches(if_none_match, etag) if if_none_match else None
+    if matched:
+        conditional_requests.inc(1, route, "not_modified")
+        # 304 подтверждает тот вариант (кодировку), который есть у клиента
+        return Response(status_code=304, headers={**headers, "ETag": matched})
+    conditional_requests.inc(1, route, "modified" if if_none_match else "unconditional")
+    response.headers.update(headers)
+    return None
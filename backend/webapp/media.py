@@ -0,0 +1,246 @@
+"""
+Медиа уроков: подписанные ссылки с ограниченным сроком и их отдача
+
+video_url / pdf_url урока без схемы (lessons/1/intro.mp4) - это файл из
+LOCAL_STORAGE_PATH. get_lesson вместо него отдаёт подписанную ссылку:
+    {MEDIA_BASE_URL}/media/lessons/1/intro.mp4?exp=<unix time>&sig=<HMAC>
+Внешние ссылки (YouTube, публичный S3) отдаются как есть.
+
+MediaMiddleware обслуживает /media/* до остальных middleware:
+- подпись и срок проверяются без БД и без initData - тег <video>
+  заголовков Telegram не передаёт
+- Range-запросы (перемотка видео): 206 / 416
+- файл уходит через расширение ASGI http.response.zerocopysend (sendfile),
+  если сервер его поддерживает, иначе частями из потока
+- с MEDIA_ACCEL_REDIRECT файл отдаёт nginx (sendfile, Range) по
+  X-Accel-Redirect, а API только проверяет подпись
+
+exp округляется вверх до MEDIA_URL_STEP: повторные get_lesson выдают ту же
+ссылку, и браузер/CDN берут файл из кеша.
+"""
+
+import base64
+import hashlib
+import hmac
+import logging
+import math
+import mimetypes
+import os
+import time
+from email.utils import formatdate
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, quote
+
+import anyio
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.config import settings
+from backend.utils.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+MEDIA_PREFIX = "/media/"
+MEDIA_URL_STEP = 5 * 60
+CHUNK_SIZE = 256 * 1024
+
+media_requests = register(Counter(
+    "media_requests_total", "Запросы к подписанным медиа",
+    ("result",),
+))
+
+
+def _signing_key() -> bytes:
+    if settings.MEDIA_SIGNING_KEY:
+        return settings.MEDIA_SIGNING_KEY.encode()
+    return hashlib.sha256(f"media:{settings.SECRET_KEY}".encode()).digest()
+
+
+def _signature(path: str, expires: int) -> str:
+    digest = hmac.new(_signing_key(), f"{path}\n{expires}".encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def is_local_media(url: Optional[str]) -> bool:
+    """Файл из LOCAL_STORAGE_PATH, а не внешняя ссылка"""
+    return bool(url) and "://" not in url and not url.startswith("//")
+
+
+def sign_media_url(url: Optional[str], ttl: Optional[int] = None) -> Optional[str]:
+    """Подписанная ссылка на локальный файл; внешние ссылки и None - без изменений"""
+    if not is_local_media(url):
+        return url
+    path = url.lstrip("/")
+    ttl = settings.MEDIA_URL_TTL if ttl is None else ttl
+    expires = math.ceil((time.time() + ttl) / MEDIA_URL_STEP) * MEDIA_URL_STEP
+    base = (settings.MEDIA_BASE_URL or settings.BACKEND_URL).rstrip("/")
+    return f"{base}{MEDIA_PREFIX}{quote(path)}?exp={expires}&sig={_signature(path, expires)}"
+
+
+def verify_media_signature(path: str, expires: str, signature: str, now: Optional[float] = None) -> Optional[str]:
+    """None - подпись верна и не истекла, иначе причина отказа"""
+    try:
+        expires_at = int(expires)
+    except ValueError:
+        return "bad_signature"
+    if not hmac.compare_digest(_signature(path, expires_at), signature):
+        return "bad_signature"
+    if expires_at < (now or time.time()):
+        return "expired"
+    return None
+
+
+def parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    (start, end) включительно для 'bytes=a-b', 'bytes=a-', 'bytes=-n'
+
+    None - заголовок не разобран или несколько диапазонов (отдаём файл целиком),
+    ValueError - диапазон за пределами файла (416).
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    start_text, dash, end_text = (part.strip() for part in ranges.partition("-"))
+    if not dash or not (start_text or end_text):
+        return None
+    if (start_text and not start_text.isdigit()) or (end_text and not end_text.isdigit()):
+        return None
+    if not start_text:
+        suffix = int(end_text)
+        if suffix == 0:
+            raise ValueError("empty suffix range")
+        return max(size - suffix, 0), size - 1
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if end_text and end < start:
+        return None
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    return start, min(end, size - 1)
+
+
+class MediaMiddleware:
+    """
+    /media/* - проверка подписи и отдача файла; остальное - дальше в приложение
+
+    Подключается последним (снаружи): медиа не проходят через
+    BaseHTTPMiddleware, метрики запросов и сжатие.
+    """
+
+    def __init__(self, app: ASGIApp, root: str):
+        self.app = app
+        self.root = Path(root).resolve()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(MEDIA_PREFIX):
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            await _send_status(send, 405, [(b"allow", b"GET, HEAD")])
+            return
+
+        # scope["path"] уже раскодирован - это тот же путь, что подписывался
+        path = scope["path"][len(MEDIA_PREFIX):]
+        query = parse_qs(scope.get("query_string", b"").decode())
+        error = verify_media_signature(path, query.get("exp", [""])[0], query.get("sig", [""])[0])
+        if error:
+            media_requests.inc(1, error)
+            await _send_status(send, 403)
+            return
+
+        # Ссылка подписана на время: дольше exp кешировать нельзя
+        max_age = max(int(query["exp"][0]) - int(time.time()), 0)
+        if settings.MEDIA_ACCEL_REDIRECT:
+            # Файлы лежат у nginx, API их может и не видеть
+            if ".." in path.split("/"):
+                media_requests.inc(1, "not_found")
+                await _send_status(send, 404)
+                return
+            media_requests.inc(1, "accel_redirect")
+            target = settings.MEDIA_ACCEL_REDIRECT.rstrip("/") + "/" + quote(path)
+            await _send_status(send, 200, [
+                (b"x-accel-redirect", target.encode()),
+                (b"cache-control", f"private, max-age={max_age}".encode()),
+            ])
+            return
+
+        file_path = self._resolve(path)
+        if file_path is None:
+            media_requests.inc(1, "not_found")
+            await _send_status(send, 404)
+            return
+        await self._send_file(scope, send, file_path, max_age)
+
+    def _resolve(self, path: str) -> Optional[Path]:
+        candidate = (self.root / path).resolve()
+        if self.root not in candidate.parents or not candidate.is_file():
+            return None
+        return candidate
+
+    async def _send_file(self, scope: Scope, send: Send, file_path: Path, max_age: int) -> None:
+        stat = file_path.stat()
+        size = stat.st_size
+        content_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+        headers = [
+            (b"content-type", content_type.encode()),
+            (b"accept-ranges", b"bytes"),
+            (b"last-modified", formatdate(stat.st_mtime, usegmt=True).encode()),
+            (b"etag", f'"{stat.st_mtime_ns:x}-{size:x}"'.encode()),
+            (b"cache-control", f"private, max-age={max_age}".encode()),
+        ]
+
+        status, start, end = 200, 0, size - 1
+        range_header = _header(scope, b"range")
+        if range_header and size:
+            try:
+                requested = parse_range(range_header, size)
+            except ValueError:
+                media_requests.inc(1, "range_not_satisfiable")
+                await _send_status(send, 416, [(b"content-range", f"bytes */{size}".encode())])
+                return
+            if requested is not None:
+                status, (start, end) = 206, requested
+                headers.append((b"content-range", f"bytes {start}-{end}/{size}".encode()))
+        length = end - start + 1 if size else 0
+        headers.append((b"content-length", str(length).encode()))
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        media_requests.inc(1, "partial" if status == 206 else "served")
+        if scope["method"] == "HEAD" or length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        with open(file_path, "rb") as file:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                # sendfile: файл уходит в сокет без копирования через Python
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": start,
+                    "count": length,
+                })
+                return
+            remaining = length
+            offset = start
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(os.pread, file.fileno(), min(CHUNK_SIZE, remaining), offset)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # Файл укоротили во время отдачи - закрываем ответ
+                await send({"type": "http.response.body", "body": b""})
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _send_status(send: Send, status: int, headers: Optional[list] = None) -> None:
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-length", b"0"), *(headers or [])]})
+    await send({"type": "http.response.body", "body": b""})
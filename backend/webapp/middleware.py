@@ -5,6 +5,10 @@ Middleware для FastAPI
 
 import hmac
 import hashlib
+import json
+import logging
+import time
+import uuid
 from urllib.parse import parse_qsl
 from typing import Optional
 
@@ -12,6 +16,93 @@ from fastapi import Request, HTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from backend.config import settings
+from backend.utils.logger import request_id_var
+from backend.utils.metrics import (
+    RequestDbStats, request_db_stats,
+    http_request_duration, http_request_db_queries, http_request_db_time,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware: присваивает каждому запросу request_id
+    (из заголовка X-Request-ID или новый) для логов и возвращает его в ответе
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex[:16]
+        
+        token = request_id_var.set(request_id)
+        
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append((b"x-request-id", request_id.encode("latin-1")))
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: латентность, число и время SQL-запросов на HTTP-запрос.
+    Метка route - шаблон пути FastAPI, чтобы id не раздували число серий
+    """
+    
+    def __init__(self, app, query_count_threshold: int = 0):
+        self.app = app
+        self.query_count_threshold = query_count_threshold
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        stats = RequestDbStats()
+        token = request_db_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_db_stats.reset(token)
+            
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_request_duration.observe(elapsed, method, route_path, str(status_code))
+            http_request_db_queries.observe(stats.queries, method, route_path)
+            http_request_db_time.observe(stats.query_time, method, route_path)
+            
+            if self.query_count_threshold and stats.queries > self.query_count_threshold:
+                logger.warning(
+                    "%s %s: %d SQL-запросов (порог %d), SQL %.1f ms, ожидание пула %.1f ms, всего %.1f ms",
+                    method, route_path, stats.queries, self.query_count_threshold,
+                    stats.query_time * 1000, stats.pool_wait * 1000, elapsed * 1000,
+                )
 
 
 class TelegramAuthMiddleware(BaseHTTPMiddleware):
@@ -28,25 +119,28 @@ class TelegramAuthMiddleware(BaseHTTPMiddleware):
     
     async def dispatch(self, request: Request, call_next):
         # Пропускаем некоторые пути без авторизации
-        if request.url.path in ["/health", "/api/docs", "/api/redoc", "/openapi.json"]:
+        if request.url.path in ["/health", "/health/db", "/metrics", "/api/docs", "/api/redoc", "/openapi.json"]:
+            return await call_next(request)
+        
+        # Webhook бота проверяет свой секрет сам
+        if request.url.path == settings.WEBHOOK_PATH:
             return await call_next(request)
         
         # Получаем initData из заголовка
         init_data = request.headers.get("X-Telegram-Init-Data")
         
         if not init_data:
-            print(f"⚠️ [Middleware] Отсутствует X-Telegram-Init-Data для {request.url.path}")
+            logger.warning("Отсутствует X-Telegram-Init-Data для %s", request.url.path)
             raise HTTPException(status_code=401, detail="Missing Telegram initData")
         
         # Проверяем подпись
         user = self.validate_init_data(init_data)
         
         if not user:
-            print(f"⚠️ [Middleware] Невалидный initData для {request.url.path}")
-            print(f"   initData (первые 100 символов): {init_data[:100]}")
+            logger.warning("Невалидный initData для %s (длина %d)", request.url.path, len(init_data))
             raise HTTPException(status_code=401, detail="Invalid Telegram initData")
         
-        print(f"✅ [Middleware] Пользователь авторизован: telegram_id={user.get('id')}, path={request.url.path}")
+        logger.debug("Пользователь авторизован: telegram_id=%s, path=%s", user.get("id"), request.url.path)
         
         # Добавляем user в request.state для использования в эндпоинтах
         request.state.telegram_user = user
@@ -64,70 +158,12 @@ class TelegramAuthMiddleware(BaseHTTPMiddleware):
         Returns:
             dict с данными пользователя или None, если подпись невалидна
         """
-        try:
-            # Парсим initData
-            data = dict(parse_qsl(init_data))
-            
-            # Извлекаем hash
-            received_hash = data.pop("hash", None)
-            if not received_hash:
-                print(f"⚠️ [Middleware] Нет hash в initData")
-                return None
-            
-            # Сортируем остальные параметры
-            data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(data.items()))
-            
-            # Генерируем секретный ключ
-            secret_key = hmac.new(
-                key=b"WebAppData",
-                msg=settings.BOT_TOKEN.encode(),
-                digestmod=hashlib.sha256
-            ).digest()
-            
-            # Вычисляем hash
-            calculated_hash = hmac.new(
-                key=secret_key,
-                msg=data_check_string.encode(),
-                digestmod=hashlib.sha256
-            ).hexdigest()
-            
-            # Сравниваем hash
-            if calculated_hash != received_hash:
-                print(f"⚠️ [Middleware] Hash не совпадает: received={received_hash[:20]}..., calculated={calculated_hash[:20]}...")
-                return None
-            
-            # Проверяем auth_date (не старше 5 минут) - но не блокируем если старше
-            import time
-            auth_date = int(data.get("auth_date", 0))
-            time_diff = time.time() - auth_date
-            if time_diff > 300:  # 5 минут
-                print(f"⚠️ [Middleware] auth_date устарел: {time_diff:.0f} секунд назад")
-                # Не блокируем - просто предупреждаем
-                # return None
-            
-            # Извлекаем данные пользователя
-            import json
-            user_data = json.loads(data.get("user", "{}"))
-            
-            # Явно конвертируем telegram_id в int (из JSON может прийти как число или строка)
-            if "id" in user_data:
-                user_data["id"] = int(user_data["id"])
-            
-            print(f"✅ [Middleware] initData валиден: telegram_id={user_data.get('id')} (type: {type(user_data.get('id'))})")
-            return user_data
-        
-        except Exception as e:
-            print(f"❌ [Middleware] Ошибка валидации initData: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+        return validate_init_data_direct(init_data)
 
 
 # ========================================
 # Dependency для получения user в эндпоинтах
 # ========================================
-from fastapi import Depends
-
 def get_telegram_user(request: Request) -> dict:
     """
     Dependency для FastAPI эндпоинтов
@@ -146,17 +182,32 @@ def get_telegram_user(request: Request) -> dict:
     if hasattr(request.state, "telegram_user"):
         return request.state.telegram_user
     
+    user_data = _resolve_telegram_user(request)
+    # Запоминаем на запрос: повторные Depends и маршрутизация чтения не валидируют заново
+    request.state.telegram_user = user_data
+    return user_data
+
+
+def get_optional_telegram_user(request: Request) -> Optional[dict]:
+    """
+    Как get_telegram_user, но без 401: None для анонимных запросов
+    (публичные эндпоинты с персональными отметками, например каталог)
+    """
+    try:
+        return get_telegram_user(request)
+    except HTTPException:
+        return None
+
+
+def _resolve_telegram_user(request: Request) -> dict:
     # ВАЖНО: Сначала проверяем initData (даже в development)
     # Если есть реальный initData от Telegram - используем его
     init_data = request.headers.get("X-Telegram-Init-Data")
     if init_data and init_data.strip():
-        print(f"🔍 [get_telegram_user] Найден initData, валидирую...")
         user_data = validate_init_data_direct(init_data)
         if user_data:
-            print(f"✅ [get_telegram_user] initData валиден, используем данные из Telegram: telegram_id={user_data.get('id')}")
             return user_data
-        else:
-            print(f"⚠️ [get_telegram_user] initData невалиден, переходим к режиму разработки")
+        logger.debug("initData невалиден, переходим к режиму разработки")
     
     # РЕЖИМ РАЗРАБОТКИ: Если включен DEV_MODE, позволяем работать без initData
     # Используется ТОЛЬКО если initData отсутствует или невалиден
@@ -170,27 +221,21 @@ def get_telegram_user(request: Request) -> dict:
         if dev_telegram_id:
             try:
                 telegram_id_to_use = int(dev_telegram_id)
-                print(f"🔧 [DEV MODE] Используется telegram_id из заголовка X-Telegram-User-ID: {telegram_id_to_use}")
             except ValueError:
-                print(f"⚠️ [DEV MODE] Невалидный X-Telegram-User-ID: {dev_telegram_id}")
+                logger.warning("[DEV MODE] Невалидный X-Telegram-User-ID: %r", dev_telegram_id)
         
         # ТОЛЬКО если заголовок не был передан - используем DEV_TELEGRAM_ID из настроек
         if not telegram_id_to_use and settings.DEV_TELEGRAM_ID > 0:
             telegram_id_to_use = settings.DEV_TELEGRAM_ID
-            print(f"🔧 [DEV MODE] Заголовок X-Telegram-User-ID не передан, используем DEV_TELEGRAM_ID из настроек: {telegram_id_to_use}")
         
         # Если ничего не указано - используем дефолтный ID для разработки (админ)
         # Это fallback только если НИ заголовок, НИ настройка не указаны
         if not telegram_id_to_use:
             telegram_id_to_use = 310836227
-            print(f"🔧 [DEV MODE] Используется дефолтный telegram_id для разработки (fallback): {telegram_id_to_use}")
-            print(f"💡 [DEV MODE] Чтобы указать другой ID, добавьте заголовок X-Telegram-User-ID или установите DEV_TELEGRAM_ID в .env")
         
-        # Пытаемся получить реальные данные пользователя из БД
-        # ВАЖНО: В режиме разработки profile.py сам проверит БД и создаст пользователя если нужно
-        # Здесь просто возвращаем telegram_id, а реальные данные будут получены в profile.py
-        # Это упрощает код и избегает проблем с async в синхронной функции
-        print(f"🔧 [DEV MODE] Возвращаем telegram_id для дальнейшей обработки в profile.py")
+        logger.debug("[DEV MODE] telegram_id=%s", telegram_id_to_use)
+        
+        # Реальные данные пользователя будут получены из БД в profile.py
         return {
             "id": telegram_id_to_use,
             "first_name": "",  # Будет заполнено из БД в profile.py
@@ -203,71 +248,64 @@ def get_telegram_user(request: Request) -> dict:
     raise HTTPException(status_code=401, detail="Unauthorized. Please register via Telegram bot.")
 
 
+def _webapp_secret_key() -> bytes:
+    """Секретный ключ для проверки initData (HMAC-SHA256 от BOT_TOKEN)"""
+    return hmac.new(
+        key=b"WebAppData",
+        msg=settings.BOT_TOKEN.encode(),
+        digestmod=hashlib.sha256
+    ).digest()
+
+
 def validate_init_data_direct(init_data: str) -> Optional[dict]:
     """
-    Прямая валидация initData без создания middleware
-    Используется в режиме разработки
+    Проверяет подпись Telegram initData
+    
+    Returns:
+        dict с данными пользователя или None, если подпись невалидна
     """
     try:
-        print(f"🔍 [validate_init_data_direct] Начало валидации initData")
-        print(f"   initData (первые 100 символов): {init_data[:100] if len(init_data) > 100 else init_data}")
-        
         # Парсим initData
         data = dict(parse_qsl(init_data))
         
         # Извлекаем hash
         received_hash = data.pop("hash", None)
         if not received_hash:
-            print(f"⚠️ [validate_init_data_direct] Нет hash в initData")
+            logger.debug("Нет hash в initData")
             return None
         
         # Сортируем остальные параметры
         data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(data.items()))
         
-        # Генерируем секретный ключ
-        secret_key = hmac.new(
-            key=b"WebAppData",
-            msg=settings.BOT_TOKEN.encode(),
-            digestmod=hashlib.sha256
-        ).digest()
-        
         # Вычисляем hash
         calculated_hash = hmac.new(
-            key=secret_key,
+            key=_webapp_secret_key(),
             msg=data_check_string.encode(),
             digestmod=hashlib.sha256
         ).hexdigest()
         
-        # Сравниваем hash
-        if calculated_hash != received_hash:
-            print(f"⚠️ [validate_init_data_direct] Hash не совпадает")
-            print(f"   received={received_hash[:20]}...")
-            print(f"   calculated={calculated_hash[:20]}...")
+        # Сравниваем hash (за постоянное время)
+        if not hmac.compare_digest(calculated_hash, received_hash):
+            logger.debug("Hash initData не совпадает")
             return None
         
         # Проверяем auth_date (не старше 5 минут) - но не блокируем если старше
-        import time
         auth_date = int(data.get("auth_date", 0))
         time_diff = time.time() - auth_date
         if time_diff > 300:  # 5 минут
-            print(f"⚠️ [validate_init_data_direct] auth_date устарел: {time_diff:.0f} секунд назад")
-            # Не блокируем - просто предупреждаем
+            logger.debug("auth_date устарел: %.0f секунд назад", time_diff)
         
         # Извлекаем данные пользователя
-        import json
         user_data = json.loads(data.get("user", "{}"))
         
         # Явно конвертируем telegram_id в int (из JSON может прийти как число или строка)
         if "id" in user_data:
             user_data["id"] = int(user_data["id"])
         
-        print(f"✅ [validate_init_data_direct] initData валиден: telegram_id={user_data.get('id')} (type: {type(user_data.get('id'))})")
         return user_data
     
-    except Exception as e:
-        print(f"❌ [validate_init_data_direct] Ошибка валидации: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.warning("Ошибка валидации initData", exc_info=True)
         return None
 
 
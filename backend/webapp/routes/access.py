@@ -10,6 +10,9 @@ from backend.database import get_session, User, UserCourse, Payment, Course
 from backend.webapp.middleware import get_telegram_user
 from backend.config import settings
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -35,21 +38,11 @@ async def check_access(
     if telegram_id == 0:
         raise HTTPException(status_code=401, detail="Telegram user ID not found in initData")
     
-    # Детальное логирование для диагностики
-    print(f"🔍 [Access] Проверка доступа для telegram_id={telegram_id} (type: {type(telegram_id)})")
-    print(f"🔍 [Access] ADMIN_IDS из настроек: {settings.ADMIN_IDS}")
-    print(f"🔍 [Access] admin_ids_list: {settings.admin_ids_list} (type: {type(settings.admin_ids_list)})")
-    
-    # Проверяем каждый ID отдельно для диагностики
-    for admin_id in settings.admin_ids_list:
-        print(f"🔍 [Access] Сравнение: {telegram_id} == {admin_id} (type: {type(admin_id)})? {telegram_id == admin_id}")
-    
     is_admin = telegram_id in settings.admin_ids_list
-    print(f"🔍 [Access] Итоговый результат: is_admin={is_admin}")
     
     # АДМИНЫ ВСЕГДА ИМЕЮТ ДОСТУП
     if is_admin:
-        print(f"👑 [Access] Админ - предоставляем полный доступ")
+        logger.debug("[Access] telegram_id=%s - админ, полный доступ", telegram_id)
         return {
             "has_access": True,
             "purchased_courses_count": 999,  # Специальное значение для админов
@@ -63,32 +56,15 @@ async def check_access(
     db_user = result.scalar_one_or_none()
     
     if not db_user:
-        print(f"❌ [Access] Пользователь не найден: telegram_id={telegram_id}")
+        logger.debug("[Access] Пользователь не найден: telegram_id=%s", telegram_id)
         raise HTTPException(status_code=404, detail="User not found")
     
-    print(f"✅ [Access] Пользователь найден: {db_user.full_name} (id={db_user.id}, telegram_id={db_user.telegram_id})")
-    
     # Проверяем количество оплаченных курсов
     result = await session.execute(
         select(func.count(UserCourse.id)).where(UserCourse.user_id == db_user.id)
     )
     purchased_courses_count = result.scalar() or 0
     
-    # Детальное логирование для диагностики
-    print(f"🔍 [Access] Количество курсов у пользователя: {purchased_courses_count}")
-    
-    # Если курсов нет, выводим список всех курсов для отладки
-    if purchased_courses_count == 0:
-        result = await session.execute(select(UserCourse).where(UserCourse.user_id == db_user.id))
-        user_courses = result.scalars().all()
-        print(f"🔍 [Access] Записи UserCourse для пользователя: {[uc.course_id for uc in user_courses]}")
-        
-        # Проверяем все курсы в системе
-        from backend.database.models import Course
-        result = await session.execute(select(Course))
-        all_courses = result.scalars().all()
-        print(f"🔍 [Access] Всего курсов в системе: {len(all_courses)}")
-    
     # Проверяем количество успешных платежей
     result = await session.execute(
         select(func.count(Payment.id)).where(
@@ -98,12 +74,13 @@ async def check_access(
     )
     total_payments = result.scalar() or 0
     
-    print(f"🔍 [Access] Успешных платежей: {total_payments}")
-    
     # Доступ есть если есть хотя бы один оплаченный курс
     has_access = purchased_courses_count > 0
     
-    print(f"🔍 [Access] Итоговый результат: has_access={has_access}, purchased_courses_count={purchased_courses_count}")
+    logger.debug(
+        "[Access] telegram_id=%s user_id=%s has_access=%s courses=%s payments=%s",
+        telegram_id, db_user.id, has_access, purchased_courses_count, total_payments
+    )
     
     return {
         "has_access": has_access,
@@ -224,7 +201,7 @@ async def grant_dev_access(
     
     if granted_count > 0:
         await session.commit()
-        print(f"✅ [Access] Выдан доступ к {granted_count} курсам для пользователя {db_user.full_name} (telegram_id={telegram_id})")
+        logger.info("[Access] Выдан доступ к %s курсам для telegram_id=%s", granted_count, telegram_id)
     
     return {
         "message": f"Access granted to {granted_count} courses",
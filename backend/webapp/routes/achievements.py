@@ -3,13 +3,16 @@ API эндпоинты для достижений (ачивок)
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from backend.database import get_session, Achievement, UserAchievement, User
 from backend.webapp.middleware import get_telegram_user
+from backend.webapp.http_cache import (
+    PRIVATE_CACHE_CONTROL, achievements_version, check_not_modified, make_etag, user_achievements_version,
+)
 
 router = APIRouter()
 
@@ -42,6 +45,8 @@ class AchievementDetailResponse(AchievementResponse):
 # ========================================
 @router.get("/", response_model=List[AchievementResponse])
 async def get_achievements(
+    request: Request,
+    response: Response,
     user: Optional[dict] = Depends(get_telegram_user),
     session: AsyncSession = Depends(get_session)
 ):
@@ -49,7 +54,16 @@ async def get_achievements(
     Получить список всех достижений
     
     Если пользователь авторизован - показывает, какие достижения он получил
+    Поддерживает If-None-Match (304 после одного агрегата по пользователю)
     """
+    telegram_id = int(user["id"]) if user and user.get("id") else None
+    version = await achievements_version.get()
+    user_version = await user_achievements_version(session, telegram_id) if telegram_id else None
+    etag = make_etag("achievements", version.tag, telegram_id, user_version)
+    not_modified = check_not_modified(request, response, "achievements", etag, PRIVATE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    
     # Получаем все достижения
     result = await session.execute(select(Achievement).order_by(Achievement.points.desc()))
     all_achievements = result.scalars().all()
@@ -0,0 +1,260 @@
+"""
+API эндпоинт первого экрана Mini App
+
+При открытии Mini App раньше делала шесть запросов (доступ, профиль,
+каталог, мои курсы, избранное, место в лидборде), и каждый заново
+проверял initData и загружал User. /api/bootstrap отдаёт всё одним
+ответом:
+- User и счётчики для доступа/лидборда - один запрос
+- мои курсы и избранное - на той же сессии (primary)
+- место в лидборде - параллельно, в отдельной read-сессии: одно
+  соединение asyncpg не выполняет запросы одновременно
+- каталог - из версии каталога в памяти (http_cache), без запроса к БД,
+  с отметками is_favorite по секции избранного
+
+У каждой секции есть версия (хеш содержимого). Клиент передаёт известные
+ему версии: ?known=courses:ab12...,profile:cd34..., и совпавшие секции
+возвращаются без данных ({"version": ..., "unchanged": true}).
+"""
+
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.database import (
+    get_session, read_session, Course, Favorite, Payment, User, UserCourse, UserProgress,
+)
+from backend.webapp.http_cache import PRIVATE_CACHE_CONTROL, courses_version
+from backend.webapp.middleware import get_telegram_user
+from backend.webapp.routes.courses import course_from_row, load_my_courses
+from backend.webapp.routes.leaderboard import count_position
+from backend.webapp.schemas import CourseResponse, ProfileResponse
+from backend.utils.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+SECTIONS = ("access", "profile", "courses", "my_courses", "favorites", "leaderboard")
+
+bootstrap_sections = register(Counter(
+    "bootstrap_sections_total", "Секции /api/bootstrap",
+    ("section", "result"),
+))
+
+
+# ========================================
+# Схемы ответов
+# ========================================
+class BootstrapSection(BaseModel):
+    version: str
+    unchanged: bool = False
+    data: Optional[Any] = None
+
+
+class BootstrapResponse(BaseModel):
+    sections: dict[str, BootstrapSection]
+
+
+# ========================================
+# Секции
+# ========================================
+def parse_known(known: Optional[str]) -> dict[str, str]:
+    """'courses:ab12,profile:cd34' -> {'courses': 'ab12', 'profile': 'cd34'}"""
+    versions = {}
+    for part in (known or "").split(","):
+        name, _, version = part.strip().partition(":")
+        if name in SECTIONS and version:
+            versions[name] = version
+    return versions
+
+
+def section_version(data: Any) -> str:
+    return hashlib.sha1(orjson.dumps(data)).hexdigest()[:16]
+
+
+async def _load_user(session: AsyncSession, user: dict) -> tuple:
+    """User и счётчики (купленные курсы, успешные платежи, пройденные курсы и уроки) одним запросом"""
+    telegram_id = int(user["id"])
+    purchased_courses = (
+        select(func.count(UserCourse.id))
+        .where(UserCourse.user_id == User.id)
+        .scalar_subquery()
+    )
+    total_payments = (
+        select(func.count(Payment.id))
+        .where(Payment.user_id == User.id, Payment.status == "succeeded")
+        .scalar_subquery()
+    )
+    completed_courses = (
+        select(func.count(UserCourse.id))
+        .where(UserCourse.user_id == User.id, UserCourse.is_completed == True)
+        .scalar_subquery()
+    )
+    completed_lessons = (
+        select(func.count(UserProgress.id))
+        .where(UserProgress.user_id == User.id, UserProgress.completed == True)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        select(User, purchased_courses, total_payments, completed_courses, completed_lessons)
+        .where(User.telegram_id == telegram_id)
+    )
+    row = result.one_or_none()
+    if row is not None:
+        return tuple(row)
+
+    # Как /api/profile: профиль создаётся при первом открытии Mini App
+    first_name = user.get("first_name", "")
+    last_name = user.get("last_name", "")
+    is_admin = telegram_id in settings.admin_ids_list
+    db_user = User(
+        telegram_id=telegram_id,
+        username=user.get("username"),
+        full_name=f"{first_name} {last_name}".strip() or ("Администратор" if is_admin else "Пользователь"),
+        phone="не указан",
+        consent_personal_data=True,
+        is_active=True,
+        created_at=datetime.now()
+    )
+    session.add(db_user)
+    await session.commit()
+    await session.refresh(db_user)
+    logger.info("👤 [Bootstrap] Профиль создан: telegram_id=%s, id=%s", telegram_id, db_user.id)
+    return db_user, 0, 0, 0, 0
+
+
+def _profile(db_user: User) -> dict:
+    return ProfileResponse(
+        id=db_user.id,
+        telegram_id=db_user.telegram_id,
+        username=db_user.username,
+        full_name=db_user.full_name,
+        phone=db_user.phone,
+        city=db_user.city,
+        points=db_user.points or 0,
+        created_at=db_user.created_at.isoformat() if db_user.created_at else ""
+    ).model_dump()
+
+
+def _access(is_admin: bool, purchased_courses: int, total_payments: int) -> dict:
+    # Те же значения, что у /api/access/check
+    if is_admin:
+        return {"has_access": True, "purchased_courses_count": 999, "total_payments": 0}
+    return {
+        "has_access": purchased_courses > 0,
+        "purchased_courses_count": purchased_courses,
+        "total_payments": total_payments,
+    }
+
+
+def _catalog(rows: tuple, favorite_ids: frozenset) -> list:
+    # row[9] - is_active
+    return [course_from_row(row, row[0] in favorite_ids).model_dump() for row in rows if row[9]]
+
+
+async def _load_favorites(session: AsyncSession, user_id: int) -> list:
+    result = await session.execute(
+        select(Course)
+        .join(Favorite, Favorite.course_id == Course.id)
+        .where(Favorite.user_id == user_id)
+        .order_by(Favorite.created_at.desc())
+    )
+    return [
+        CourseResponse.model_validate(course).model_copy(update={"is_favorite": True}).model_dump()
+        for course in result.scalars()
+    ]
+
+
+async def _load_leaderboard(points: int, completed_courses: int, completed_lessons: int) -> dict:
+    # Отдельная сессия (реплика, если есть) - выполняется параллельно с primary
+    async with read_session() as session:
+        position, total_users = await count_position(session, points, completed_courses, completed_lessons)
+    return {
+        "position": position,
+        "points": points,
+        "completed_courses": completed_courses,
+        "completed_lessons": completed_lessons,
+        "total_users": total_users,
+    }
+
+
+async def _load_primary(session: AsyncSession, user_id: int, is_admin: bool) -> tuple[list, list]:
+    my_courses = await load_my_courses(session, user_id, is_admin)
+    favorites = await _load_favorites(session, user_id)
+    return my_courses, favorites
+
+
+# ========================================
+# Эндпоинт
+# ========================================
+@router.get("", response_model=BootstrapResponse)
+@router.get("/", response_model=BootstrapResponse)
+async def get_bootstrap(
+    known: Optional[str] = Query(default=None, description="Известные клиенту версии: section:version,..."),
+    user: dict = Depends(get_telegram_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Данные первого экрана одним запросом
+
+    Секции: access, profile, courses, my_courses, favorites, leaderboard -
+    те же данные, что у отдельных эндпоинтов. Секции с версией из known
+    возвращаются без data.
+    """
+    telegram_id = int(user.get("id") or 0)
+    if not telegram_id:
+        raise HTTPException(status_code=401, detail="Telegram user ID not found in initData")
+    is_admin = telegram_id in settings.admin_ids_list
+    known_versions = parse_known(known)
+
+    db_user, purchased_courses, total_payments, completed_courses, completed_lessons = await _load_user(session, user)
+    points = db_user.points or 0
+
+    (my_courses, favorites), leaderboard, catalog = await asyncio.gather(
+        _load_primary(session, db_user.id, is_admin),
+        _load_leaderboard(points, completed_courses, completed_lessons),
+        courses_version.get(),
+    )
+
+    data = {
+        "access": _access(is_admin, purchased_courses, total_payments),
+        "profile": _profile(db_user),
+        "my_courses": my_courses,
+        "favorites": favorites,
+        "leaderboard": leaderboard,
+    }
+    versions = {name: section_version(value) for name, value in data.items()}
+    # Версия каталога уже посчитана: при совпадении список даже не строится
+    favorite_ids = frozenset(course["id"] for course in favorites)
+    versions["courses"] = section_version([catalog.tag, sorted(favorite_ids)])
+
+    sections = {}
+    for name in SECTIONS:
+        version = versions[name]
+        if known_versions.get(name) == version:
+            bootstrap_sections.inc(1, name, "unchanged")
+            sections[name] = {"version": version, "unchanged": True}
+            continue
+        bootstrap_sections.inc(1, name, "sent")
+        value = _catalog(catalog.rows, favorite_ids) if name == "courses" else data[name]
+        sections[name] = {"version": version, "data": value}
+
+    return ORJSONResponse({"sections": sections}, headers={"Cache-Control": PRIVATE_CACHE_CONTROL})
+
+
+# ========================================
+# Пример запроса:
+# ========================================
+# GET /api/bootstrap
+# GET /api/bootstrap?known=courses:3f2a9c...,profile:91be04...
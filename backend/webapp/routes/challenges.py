@@ -3,7 +3,7 @@ API эндпоинты для челленджей
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
@@ -11,6 +11,10 @@ from datetime import datetime
 
 from backend.database import get_session, Challenge, UserChallenge, User, UserProgress, UserCourse
 from backend.webapp.middleware import get_telegram_user
+from backend.webapp.http_cache import (
+    PRIVATE_CACHE_CONTROL, challenges_version, check_not_modified, make_etag,
+    user_challenges_version, visible_challenge_ids,
+)
 from backend.services.gamification import add_points_to_user
 from backend.services.notifications import send_notification
 
@@ -50,6 +54,8 @@ class ChallengeDetailResponse(ChallengeResponse):
 @router.get("", response_model=List[ChallengeResponse])
 @router.get("/", response_model=List[ChallengeResponse])
 async def get_challenges(
+    request: Request,
+    response: Response,
     user: Optional[dict] = Depends(get_telegram_user),
     session: AsyncSession = Depends(get_session)
 ):
@@ -57,7 +63,18 @@ async def get_challenges(
     Получить список активных челленджей
     
     Если пользователь авторизован - показывает прогресс участия
+    Поддерживает If-None-Match (304 после одного агрегата по пользователю)
     """
+    telegram_id = int(user["id"]) if user and user.get("id") else None
+    version = await challenges_version.get()
+    user_version = await user_challenges_version(session, telegram_id) if telegram_id else None
+    etag = make_etag(
+        "challenges", version.tag, visible_challenge_ids(version), telegram_id, user_version
+    )
+    not_modified = check_not_modified(request, response, "challenges", etag, PRIVATE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    
     # Получаем активные челленджи
     query = select(Challenge).where(Challenge.is_active == True)
     
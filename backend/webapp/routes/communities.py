@@ -3,12 +3,14 @@ API эндпоинты для сообществ/чатов
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from backend.database import get_session, Community
+from backend.webapp.http_cache import PUBLIC_CACHE_CONTROL, check_not_modified, communities_version, make_etag
+from backend.webapp.encoding import EncodedJSON, response_cache
 
 router = APIRouter()
 
@@ -29,12 +31,17 @@ class CommunityResponse(BaseModel):
         from_attributes = True
 
 
+_communities_adapter = TypeAdapter(List[CommunityResponse])
+
+
 # ========================================
 # Эндпоинты
 # ========================================
 @router.get("", response_model=List[CommunityResponse])
 @router.get("/", response_model=List[CommunityResponse])
 async def get_communities(
+    request: Request,
+    response: Response,
     type: Optional[str] = None,  # Фильтр: city или profession
     city: Optional[str] = None,  # Фильтр по городу (если type=city)
     category: Optional[str] = None,  # Фильтр по категории (если type=profession)
@@ -47,7 +54,18 @@ async def get_communities(
     - type: Фильтр по типу (city или profession)
     - city: Фильтр по городу
     - category: Фильтр по категории профессии
+    
+    Поддерживает If-None-Match (304 без запроса к БД)
     """
+    version = await communities_version.get()
+    etag = make_etag("communities", version.tag, type, city, category)
+    not_modified = check_not_modified(request, response, "communities", etag, PUBLIC_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    cached = response_cache.get(etag)
+    if cached:
+        return cached.response(request, headers=response.headers)
+    
     query = select(Community)
     
     if type:
@@ -62,7 +80,10 @@ async def get_communities(
     result = await session.execute(query)
     communities = result.scalars().all()
     
-    return communities
+    payload = EncodedJSON.dump(
+        _communities_adapter.validate_python(communities, from_attributes=True), _communities_adapter
+    )
+    return response_cache.put(etag, payload).response(request, headers=response.headers)
 
 
 @router.get("/{community_id}", response_model=CommunityResponse)
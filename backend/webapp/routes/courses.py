@@ -3,24 +3,51 @@ API эндпоинты для курсов
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
 
-from backend.database import get_session, Course, Lesson, UserCourse, User, UserProgress
+from backend.database import get_session, get_read_session, Course, Lesson, UserCourse, User, UserProgress
 from backend.webapp.schemas import CourseResponse, CourseDetailResponse
-from backend.webapp.middleware import get_telegram_user
+from backend.webapp.middleware import get_optional_telegram_user, get_telegram_user
+from backend.webapp.http_cache import (
+    PRIVATE_CACHE_CONTROL, PUBLIC_CACHE_CONTROL, active_course_categories, check_not_modified,
+    courses_version, lessons_version, make_etag,
+)
+from backend.webapp.encoding import EncodedJSON, json_response, response_cache
+from backend.services.favorites import get_favorite_ids
+from backend.services.user_cache import resolve_user_id
+from backend.services.recommendations import owned_course_ids, recommender
 
 router = APIRouter()
 
+_courses_adapter = TypeAdapter(List[CourseResponse])
+_course_detail_adapter = TypeAdapter(CourseDetailResponse)
+
+
+def course_from_row(row: tuple, is_favorite: bool = False) -> CourseResponse:
+    """CourseResponse из строки courses_version (без запроса к БД)"""
+    # Колонки courses_version: id, title, description, full_description, category,
+    # cover_image_url, is_top, price, duration_hours, is_active, updated_at
+    return CourseResponse(
+        id=row[0], title=row[1], description=row[2], category=row[4],
+        cover_image_url=row[5], is_top=row[6], price=float(row[7]), duration_hours=row[8],
+        is_favorite=is_favorite,
+    )
+
 
 @router.get("", response_model=List[CourseResponse])
 @router.get("/", response_model=List[CourseResponse])
 async def get_courses(
+    request: Request,
+    response: Response,
     category: Optional[str] = None,
     is_top: Optional[bool] = None,
     search: Optional[str] = None,
-    session: AsyncSession = Depends(get_session)
+    user: Optional[dict] = Depends(get_optional_telegram_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Получить список всех курсов
@@ -29,7 +56,23 @@ async def get_courses(
     - category: Фильтр по категории (manicure, eyelashes и т.д.)
     - is_top: Показать только топовые курсы
     - search: Поиск по названию и описанию курса
+    
+    Для пользователя курсы отмечены is_favorite (ответ становится private,
+    избранное входит в ETag). Поддерживает If-None-Match (304 без запроса к БД)
     """
+    version = await courses_version.get()
+    favorite_ids = await get_favorite_ids(int(user["id"])) if user else frozenset()
+    etag = make_etag("courses", version.tag, category, is_top, search, sorted(favorite_ids))
+    cache_control = PRIVATE_CACHE_CONTROL if user else PUBLIC_CACHE_CONTROL
+    not_modified = check_not_modified(request, response, "courses", etag, cache_control)
+    if not_modified:
+        return not_modified
+    # Тот же ETag - те же байты: отдаём готовый (и уже сжатый) ответ.
+    # Ключ - каталог + набор избранного, у многих пользователей он совпадает (пустой)
+    cached = response_cache.get(etag)
+    if cached:
+        return cached.response(request, headers=response.headers)
+    
     query = select(Course).where(Course.is_active == True)
     
     # Фильтры
@@ -52,17 +95,62 @@ async def get_courses(
     result = await session.execute(query)
     courses = result.scalars().all()
     
-    return courses
+    items = _courses_adapter.validate_python(courses, from_attributes=True)
+    for item in items:
+        item.is_favorite = item.id in favorite_ids
+    payload = EncodedJSON.dump(items, _courses_adapter)
+    return response_cache.put(etag, payload).response(request, headers=response.headers)
+
+
+@router.get("/recommended", response_model=List[CourseResponse])
+async def get_recommended_courses(
+    limit: int = Query(default=3, ge=1, le=20),
+    user: dict = Depends(get_telegram_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Рекомендованные пользователю курсы (кроме уже купленных)
+
+    Из модели совместных записей в памяти (services/recommendations):
+    запрос к БД - только курсы пользователя.
+    """
+    telegram_id = int(user["id"])
+    user_id = await resolve_user_id(telegram_id)
+    owned = await owned_course_ids(session, user_id) if user_id is not None else frozenset()
+    snapshot = await courses_version.get()
+    course_ids = recommender.recommend(owned, active_course_categories(snapshot), limit=limit)
+
+    favorite_ids = await get_favorite_ids(telegram_id)
+    rows = {row[0]: row for row in snapshot.rows}
+    items = [course_from_row(rows[course_id], course_id in favorite_ids) for course_id in course_ids]
+    return json_response(_courses_adapter, items, headers={"Cache-Control": PRIVATE_CACHE_CONTROL})
 
 
 @router.get("/{course_id}", response_model=CourseDetailResponse)
 async def get_course(
     course_id: int,
-    session: AsyncSession = Depends(get_session)
+    request: Request,
+    response: Response,
+    user: Optional[dict] = Depends(get_optional_telegram_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Получить детали курса + список уроков
+    
+    is_favorite - для пользователя (в ETag входит только эта отметка, поэтому
+    готовых вариантов ответа на курс два). Поддерживает If-None-Match (304 без запроса к БД)
     """
+    courses, lessons = await courses_version.get(), await lessons_version.get()
+    is_favorite = course_id in await get_favorite_ids(int(user["id"])) if user else False
+    etag = make_etag("course", courses.tag, lessons.tag, course_id, is_favorite)
+    cache_control = PRIVATE_CACHE_CONTROL if user else PUBLIC_CACHE_CONTROL
+    not_modified = check_not_modified(request, response, "course", etag, cache_control)
+    if not_modified:
+        return not_modified
+    cached = response_cache.get(etag)
+    if cached:
+        return cached.response(request, headers=response.headers)
+    
     # Получаем курс
     result = await session.execute(
         select(Course).where(Course.id == course_id)
@@ -81,7 +169,7 @@ async def get_course(
     lessons = result.scalars().all()
     
     # Формируем ответ
-    response = CourseDetailResponse(
+    detail = CourseDetailResponse(
         id=course.id,
         title=course.title,
         description=course.description,
@@ -91,6 +179,7 @@ async def get_course(
         is_top=course.is_top,
         price=float(course.price),
         duration_hours=course.duration_hours,
+        is_favorite=is_favorite,
         lessons=[
             {
                 "id": lesson.id,
@@ -103,122 +192,62 @@ async def get_course(
         ]
     )
     
-    return response
+    payload = EncodedJSON.dump(detail, _course_detail_adapter)
+    return response_cache.put(etag, payload).response(request, headers=response.headers)
 
 
-@router.get("/my/courses", response_model=List[dict])
-async def get_my_courses(
-    user: dict = Depends(get_telegram_user),
-    session: AsyncSession = Depends(get_session)
-):
+async def load_my_courses(session: AsyncSession, user_id: int, is_admin: bool) -> list:
     """
-    Получить курсы текущего пользователя с прогрессом
+    Курсы пользователя с прогрессом (админу - все активные курсы)
+    
+    Три запроса на любое число курсов: курсы, число уроков и число
+    пройденных уроков по курсам (GROUP BY).
     """
     from sqlalchemy import func
-    from backend.config import settings
     
-    telegram_id = user["id"]
-    
-    # Проверяем, является ли пользователь админом
-    is_admin = telegram_id in settings.admin_ids_list
-    
-    # Получаем пользователя
-    result = await session.execute(
-        select(User).where(User.telegram_id == telegram_id)
-    )
-    db_user = result.scalar_one_or_none()
-    
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Для админов показываем все курсы, даже если нет записей в UserCourse
     if is_admin:
-        # Получаем все активные курсы
+        # Для админов показываем все курсы, даже если нет записей в UserCourse
         result = await session.execute(
-            select(Course)
+            select(Course, UserCourse)
+            .outerjoin(UserCourse, (UserCourse.course_id == Course.id) & (UserCourse.user_id == user_id))
             .where(Course.is_active == True)
             .order_by(Course.id.desc())
         )
-        all_courses = result.scalars().all()
-        
-        # Получаем записи UserCourse для админа (если есть)
+    else:
         result = await session.execute(
-            select(UserCourse).where(UserCourse.user_id == db_user.id)
+            select(Course, UserCourse)
+            .join(UserCourse, UserCourse.course_id == Course.id)
+            .where(UserCourse.user_id == user_id)
+            .order_by(UserCourse.purchased_at.desc())
         )
-        user_courses_map = {uc.course_id: uc for uc in result.scalars().all()}
-        
-        # Формируем список курсов с прогрессом
-        courses_with_progress = []
-        for course in all_courses:
-            uc = user_courses_map.get(course.id)
-            
-            # Подсчитываем прогресс по курсу
-            result = await session.execute(
-                select(func.count(Lesson.id)).where(Lesson.course_id == course.id)
-            )
-            total_lessons = result.scalar() or 0
-            
-            result = await session.execute(
-                select(func.count(UserProgress.id))
-                .join(Lesson, UserProgress.lesson_id == Lesson.id)
-                .where(
-                    UserProgress.user_id == db_user.id,
-                    UserProgress.completed == True,
-                    Lesson.course_id == course.id
-                )
-            )
-            completed_lessons = result.scalar() or 0
-            progress_percent = int((completed_lessons / total_lessons * 100)) if total_lessons > 0 else 0
-            
-            courses_with_progress.append({
-                "id": course.id,
-                "title": course.title,
-                "description": course.description,
-                "category": course.category,
-                "cover_image_url": course.cover_image_url,
-                "is_top": course.is_top,
-                "price": float(course.price),
-                "duration_hours": course.duration_hours,
-                "progress": {
-                    "total_lessons": total_lessons,
-                    "completed_lessons": completed_lessons,
-                    "progress_percent": progress_percent,
-                    "purchased_at": uc.purchased_at.isoformat() if uc and uc.purchased_at else None,
-                    "is_completed": uc.is_completed if uc else False
-                }
-            })
-        
-        return courses_with_progress
+    rows = result.all()
+    if not rows:
+        return []
+    course_ids = [course.id for course, _ in rows]
     
-    # Для обычных пользователей - только курсы из UserCourse
-    # Получаем курсы пользователя
     result = await session.execute(
-        select(UserCourse, Course)
-        .join(Course, UserCourse.course_id == Course.id)
-        .where(UserCourse.user_id == db_user.id)
-        .order_by(UserCourse.purchased_at.desc())
+        select(Lesson.course_id, func.count(Lesson.id))
+        .where(Lesson.course_id.in_(course_ids))
+        .group_by(Lesson.course_id)
     )
-    user_courses = result.all()
+    total_by_course = dict(result.all())
     
-    courses_with_progress = []
-    
-    for uc, course in user_courses:
-        # Подсчитываем прогресс по курсу
-        result = await session.execute(
-            select(func.count(Lesson.id)).where(Lesson.course_id == course.id)
-        )
-        total_lessons = result.scalar() or 0
-        
-        result = await session.execute(
-            select(func.count(UserProgress.id))
-            .join(Lesson, UserProgress.lesson_id == Lesson.id)
-            .where(
-                UserProgress.user_id == db_user.id,
-                UserProgress.completed == True,
-                Lesson.course_id == course.id
-            )
+    result = await session.execute(
+        select(Lesson.course_id, func.count(UserProgress.id))
+        .join(Lesson, UserProgress.lesson_id == Lesson.id)
+        .where(
+            UserProgress.user_id == user_id,
+            UserProgress.completed == True,
+            Lesson.course_id.in_(course_ids)
         )
-        completed_lessons = result.scalar() or 0
+        .group_by(Lesson.course_id)
+    )
+    completed_by_course = dict(result.all())
+    
+    courses_with_progress = []
+    for course, uc in rows:
+        total_lessons = total_by_course.get(course.id, 0)
+        completed_lessons = completed_by_course.get(course.id, 0)
         progress_percent = int((completed_lessons / total_lessons * 100)) if total_lessons > 0 else 0
         
         courses_with_progress.append({
@@ -234,14 +263,42 @@ async def get_my_courses(
                 "total_lessons": total_lessons,
                 "completed_lessons": completed_lessons,
                 "progress_percent": progress_percent,
-                "purchased_at": uc.purchased_at.isoformat() if uc.purchased_at else None,
-                "is_completed": uc.is_completed
+                "purchased_at": uc.purchased_at.isoformat() if uc and uc.purchased_at else None,
+                "is_completed": uc.is_completed if uc else False
             }
         })
-    
     return courses_with_progress
 
 
+@router.get("/my/courses", response_model=List[dict])
+async def get_my_courses(
+    user: dict = Depends(get_telegram_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Получить курсы текущего пользователя с прогрессом
+    
+    Словари из простых типов отдаются orjson напрямую, без jsonable_encoder
+    """
+    from backend.config import settings
+    
+    telegram_id = user["id"]
+    
+    # Проверяем, является ли пользователь админом
+    is_admin = telegram_id in settings.admin_ids_list
+    
+    # Получаем пользователя
+    result = await session.execute(
+        select(User).where(User.telegram_id == telegram_id)
+    )
+    db_user = result.scalar_one_or_none()
+    
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return ORJSONResponse(await load_my_courses(session, db_user.id, is_admin))
+
+
 # ========================================
 # Пример запроса:
 # ========================================
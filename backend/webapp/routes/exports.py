@@ -0,0 +1,281 @@
+"""
+API эндпоинты потоковых выгрузок для админов
+
+GET /api/exports/{dataset}?format=csv|parquet&date_from=...&date_to=...
+    dataset: payments, enrollments, progress, reviews
+
+Строки читаются курсором (stream_results + yield_per по
+ADMIN_EXPORT_BATCH_SIZE) и сразу уходят клиенту через StreamingResponse:
+память воркера не зависит от размера таблицы. Выгрузки идут через свой
+пул (database.get_export_engine, к реплике, если она есть) - API и бот
+не ждут соединений, пока выгружается таблица. Больше
+ADMIN_EXPORT_CONCURRENCY выгрузок одновременно - 429.
+
+Parquet - если установлен pyarrow: каждая пачка строк - отдельная
+row group. pyarrow импортируется при первой parquet-выгрузке, а не при
+импорте приложения.
+"""
+
+import asyncio
+import csv
+import importlib.util
+import io
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator, Callable, Literal, Optional
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, DateTime, Integer, Numeric, select
+
+from backend.config import settings
+from backend.database import Course, Lesson, Payment, Review, User, UserCourse, UserProgress
+from backend.database.database import get_export_engine
+from backend.webapp.middleware import get_telegram_user
+from backend.webapp.routes.analytics import check_admin
+from backend.utils.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+exported_rows = register(Counter(
+    "admin_export_rows_total", "Строк в выгрузках админа",
+    ("dataset", "format"),
+))
+
+_export_slots = asyncio.Semaphore(max(settings.ADMIN_EXPORT_CONCURRENCY, 1))
+# pyarrow опционален - без него только CSV
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+
+# ========================================
+# Наборы данных
+# ========================================
+@dataclass(frozen=True)
+class ExportDataset:
+    # Колонки выгрузки (с подписями), соединения и сортировка
+    query: Callable[[], object]
+    # Колонка, по которой фильтруют date_from / date_to
+    date_column: object
+
+
+def _payments_query():
+    return (
+        select(
+            Payment.id, Payment.user_id, User.telegram_id, Payment.course_id,
+            Course.title.label("course_title"), Payment.amount, Payment.status,
+            Payment.payment_method, Payment.yookassa_payment_id, Payment.created_at, Payment.paid_at,
+        )
+        .join(User, User.id == Payment.user_id)
+        .join(Course, Course.id == Payment.course_id)
+        .order_by(Payment.id)
+    )
+
+
+def _enrollments_query():
+    return (
+        select(
+            UserCourse.id, UserCourse.user_id, User.telegram_id, UserCourse.course_id,
+            Course.title.label("course_title"), UserCourse.purchased_at,
+            UserCourse.is_completed, UserCourse.completed_at,
+        )
+        .join(User, User.id == UserCourse.user_id)
+        .join(Course, Course.id == UserCourse.course_id)
+        .order_by(UserCourse.id)
+    )
+
+
+def _progress_query():
+    return (
+        select(
+            UserProgress.id, UserProgress.user_id, User.telegram_id, Lesson.course_id,
+            UserProgress.lesson_id, Lesson.title.label("lesson_title"),
+            UserProgress.completed, UserProgress.completed_at, UserProgress.watch_time,
+        )
+        .join(User, User.id == UserProgress.user_id)
+        .join(Lesson, Lesson.id == UserProgress.lesson_id)
+        .order_by(UserProgress.id)
+    )
+
+
+def _reviews_query():
+    return (
+        select(
+            Review.id, Review.user_id, User.telegram_id, Review.course_id,
+            Course.title.label("course_title"), Review.rating, Review.comment,
+            Review.created_at, Review.updated_at,
+        )
+        .join(User, User.id == Review.user_id)
+        .join(Course, Course.id == Review.course_id)
+        .order_by(Review.id)
+    )
+
+
+DATASETS = {
+    "payments": ExportDataset(_payments_query, Payment.created_at),
+    "enrollments": ExportDataset(_enrollments_query, UserCourse.purchased_at),
+    # События прогресса - завершения уроков
+    "progress": ExportDataset(_progress_query, UserProgress.completed_at),
+    "reviews": ExportDataset(_reviews_query, Review.created_at),
+}
+
+
+# ========================================
+# Форматы
+# ========================================
+class _ChunkSink(io.RawIOBase):
+    """Файл для ParquetWriter: записанное забирается кусками через drain()"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _arrow_type(pyarrow, column):
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return pyarrow.bool_()
+    if isinstance(column_type, DateTime):
+        return pyarrow.timestamp("us")
+    if isinstance(column_type, Numeric):
+        return pyarrow.decimal128(column_type.precision or 18, column_type.scale or 0)
+    if isinstance(column_type, Integer):
+        return pyarrow.int64()
+    return pyarrow.string()
+
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+async def _stream_rows(query, batch_size: int) -> AsyncIterator[list]:
+    # Server-side cursor на соединении пула выгрузок
+    async with get_export_engine().connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+
+
+async def _export_csv(name: str, query) -> AsyncIterator[bytes]:
+    yield _csv_chunk([[column.name for column in query.selected_columns]])
+    async for partition in _stream_rows(query, settings.ADMIN_EXPORT_BATCH_SIZE):
+        exported_rows.inc(len(partition), name, "csv")
+        yield _csv_chunk(partition)
+
+
+async def _export_parquet(name: str, query) -> AsyncIterator[bytes]:
+    import pyarrow
+    import pyarrow.parquet
+
+    schema = pyarrow.schema([(column.name, _arrow_type(pyarrow, column)) for column in query.selected_columns])
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for partition in _stream_rows(query, settings.ADMIN_EXPORT_BATCH_SIZE):
+            columns = list(zip(*partition))
+            # Кодирование пачки - CPU: в потоке, чтобы не держать event loop
+            await anyio.to_thread.run_sync(
+                writer.write_table, pyarrow.Table.from_arrays(
+                    [pyarrow.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema,
+                ),
+            )
+            exported_rows.inc(len(partition), name, "parquet")
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+async def _guarded(name: str, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    async with _export_slots:
+        try:
+            async for chunk in body:
+                yield chunk
+        except Exception:
+            # Заголовки уже отправлены - остаётся оборвать ответ
+            logger.error("❌ [Exports] Ошибка выгрузки %s", name, exc_info=True)
+            raise
+
+
+# ========================================
+# Эндпоинт
+# ========================================
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: Literal["payments", "enrollments", "progress", "reviews"],
+    format: Literal["csv", "parquet"] = Query(default="csv"),
+    date_from: Optional[date] = Query(default=None, description="С даты (включительно)"),
+    date_to: Optional[date] = Query(default=None, description="По дату (включительно)"),
+    user: dict = Depends(get_telegram_user),
+):
+    """
+    Потоковая выгрузка таблицы (только для админов)
+
+    Фильтр по дате: payments - created_at, enrollments - purchased_at,
+    progress - completed_at (только завершённые уроки), reviews - created_at.
+    """
+    if not check_admin(user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if format == "parquet" and not PARQUET_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from is after date_to")
+    # Слот занимает сам поток; здесь - быстрый отказ, если все заняты
+    if _export_slots.locked():
+        raise HTTPException(status_code=429, detail="Too many exports in progress")
+
+    spec = DATASETS[dataset]
+    query = spec.query()
+    if date_from:
+        query = query.where(spec.date_column >= datetime.combine(date_from, time.min))
+    if date_to:
+        query = query.where(spec.date_column < datetime.combine(date_to + timedelta(days=1), time.min))
+
+    suffix = "_".join(str(day) for day in (date_from, date_to) if day)
+    filename = f"{dataset}{'_' + suffix if suffix else ''}.{format}"
+    logger.info("📤 [Exports] %s: %s (%s - %s), admin %s", dataset, format, date_from, date_to, user.get("id"))
+
+    if format == "parquet":
+        body, media_type = _export_parquet(dataset, query), "application/vnd.apache.parquet"
+    else:
+        body, media_type = _export_csv(dataset, query), "text/csv; charset=utf-8"
+    return StreamingResponse(
+        _guarded(dataset, body),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+# ========================================
+# Пример запроса:
+# ========================================
+# GET /api/exports/payments?date_from=2024-01-01&date_to=2024-01-31
+# GET /api/exports/progress?format=parquet
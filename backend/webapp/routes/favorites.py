@@ -12,6 +12,9 @@ from pydantic import BaseModel
 from backend.database import get_session, Favorite, Course, User
 from backend.webapp.middleware import get_telegram_user
 from backend.webapp.schemas import CourseResponse
+from backend.webapp.http_cache import courses_version
+from backend.services.favorites import add_favorite, get_favorite_ids, invalidate_favorites, remove_favorite
+from backend.services.user_cache import resolve_user_id
 
 router = APIRouter()
 
@@ -19,6 +22,10 @@ router = APIRouter()
 # ========================================
 # Схемы ответов
 # ========================================
+class FavoriteIdsResponse(BaseModel):
+    course_ids: List[int]
+
+
 class FavoriteResponse(BaseModel):
     course_id: int
     course: CourseResponse
@@ -66,19 +73,13 @@ async def get_favorites(
     favorites = result.all()
     
     # Извлекаем курсы из кортежей (Favorite, Course)
-    courses = [course for _, course in favorites]
-    return courses
+    return [
+        CourseResponse.model_validate(course).model_copy(update={"is_favorite": True})
+        for _, course in favorites
+    ]
 
 
-@router.post("/{course_id}")
-async def add_to_favorites(
-    course_id: int,
-    user: dict = Depends(get_telegram_user),
-    session: AsyncSession = Depends(get_session)
-):
-    """
-    Добавить курс в избранное
-    """
+async def _current_user_id(user: dict) -> int:
     # Преобразуем telegram_id в int
     telegram_id_raw = user["id"]
     telegram_id = int(telegram_id_raw) if telegram_id_raw else None
@@ -86,77 +87,60 @@ async def add_to_favorites(
     if not telegram_id:
         raise HTTPException(status_code=400, detail="Invalid telegram_id")
     
-    # Получаем пользователя
-    result = await session.execute(
-        select(User).where(User.telegram_id == telegram_id)
-    )
-    db_user = result.scalar_one_or_none()
-    
-    if not db_user:
+    user_id = await resolve_user_id(telegram_id)
+    if user_id is None:
         raise HTTPException(status_code=404, detail="User not found")
+    return user_id
+
+
+async def _course_exists(session: AsyncSession, course_id: int) -> bool:
+    # Обычно курс есть в версии каталога в памяти; в БД - только новые курсы
+    snapshot = await courses_version.get()
+    if any(row[0] == course_id for row in snapshot.rows):
+        return True
+    result = await session.execute(select(Course.id).where(Course.id == course_id))
+    return result.scalar_one_or_none() is not None
+
+
+@router.get("/ids", response_model=FavoriteIdsResponse)
+async def get_favorite_course_ids(
+    user: dict = Depends(get_telegram_user)
+):
+    """
+    id всех избранных курсов пользователя (из кеша, без запроса к БД)
+    """
+    course_ids = await get_favorite_ids(int(user["id"]))
+    return FavoriteIdsResponse(course_ids=sorted(course_ids))
+
+
+
+
+@router.post("/{course_id}")
+async def add_to_favorites(
+    course_id: int,
+    user: dict = Depends(get_telegram_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Добавить курс в избранное (INSERT ... ON CONFLICT DO NOTHING)
+    """
+    user_id = await _current_user_id(user)
     
-    # Проверяем существование курса
-    result = await session.execute(
-        select(Course).where(Course.id == course_id)
-    )
-    course = result.scalar_one_or_none()
-    
-    if not course:
+    if not await _course_exists(session, course_id):
         raise HTTPException(status_code=404, detail="Course not found")
     
-    # Проверяем, не добавлен ли уже в избранное
-    result = await session.execute(
-        select(Favorite).where(
-            Favorite.user_id == db_user.id,
-            Favorite.course_id == course_id
-        )
-    )
-    existing = result.scalar_one_or_none()
-    
-    if existing:
-        # Курс уже в избранном - возвращаем успешный ответ
-        print(f"ℹ️ [Favorites] Курс {course_id} уже в избранном для пользователя {db_user.id}")
-        return {"message": "Курс уже в избранном", "is_favorite": True}
-    
-    # Добавляем в избранное
     try:
-        favorite = Favorite(
-            user_id=db_user.id,
-            course_id=course_id
-        )
-        session.add(favorite)
+        added = await add_favorite(session, user_id, course_id)
         await session.commit()
-        await session.refresh(favorite)
-        
-        print(f"✅ [Favorites] Курс {course_id} добавлен в избранное для пользователя {db_user.id}")
-        return {"message": "Курс добавлен в избранное", "is_favorite": True}
-    except IntegrityError as e:
+    except IntegrityError:
+        # Курс удалили между проверкой и вставкой
         await session.rollback()
-        # Ошибка unique constraint - курс уже в избранном (race condition)
-        # Проверяем еще раз
-        result = await session.execute(
-            select(Favorite).where(
-                Favorite.user_id == db_user.id,
-                Favorite.course_id == course_id
-            )
-        )
-        existing = result.scalar_one_or_none()
-        if existing:
-            print(f"⚠️ [Favorites] IntegrityError - курс уже в избранном (race condition)")
-            return {"message": "Курс уже в избранном", "is_favorite": True}
-        else:
-            # Неожиданная ошибка IntegrityError
-            print(f"⚠️ [Favorites] Неожиданная IntegrityError: {e}")
-            import traceback
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail="Ошибка при добавлении в избранное")
-    except Exception as e:
-        await session.rollback()
-        print(f"❌ [Favorites] Ошибка при добавлении в избранное: {e}")
-        import traceback
-        traceback.print_exc()
-        # Пробрасываем ошибку дальше с понятным сообщением
-        raise HTTPException(status_code=500, detail=f"Ошибка при добавлении в избранное: {str(e)}")
+        raise HTTPException(status_code=404, detail="Course not found")
+    await invalidate_favorites(int(user["id"]))
+    
+    if not added:
+        return {"message": "Курс уже в избранном", "is_favorite": True}
+    return {"message": "Курс добавлен в избранное", "is_favorite": True}
 
 
 @router.delete("/{course_id}")
@@ -168,76 +152,26 @@ async def remove_from_favorites(
     """
     Удалить курс из избранного
     """
-    # Преобразуем telegram_id в int
-    telegram_id_raw = user["id"]
-    telegram_id = int(telegram_id_raw) if telegram_id_raw else None
-    
-    if not telegram_id:
-        raise HTTPException(status_code=400, detail="Invalid telegram_id")
+    user_id = await _current_user_id(user)
     
-    # Получаем пользователя
-    result = await session.execute(
-        select(User).where(User.telegram_id == telegram_id)
-    )
-    db_user = result.scalar_one_or_none()
-    
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Находим запись в избранном
-    result = await session.execute(
-        select(Favorite).where(
-            Favorite.user_id == db_user.id,
-            Favorite.course_id == course_id
-        )
-    )
-    favorite = result.scalar_one_or_none()
-    
-    if not favorite:
-        print(f"ℹ️ [Favorites] Курс {course_id} не в избранном для пользователя {db_user.id}")
-        return {"message": "Курс не в избранном", "is_favorite": False}
-    
-    # Удаляем из избранного
-    await session.delete(favorite)
+    removed = await remove_favorite(session, user_id, course_id)
     await session.commit()
+    await invalidate_favorites(int(user["id"]))
     
-    print(f"✅ [Favorites] Курс {course_id} удален из избранного для пользователя {db_user.id}")
+    if not removed:
+        return {"message": "Курс не в избранном", "is_favorite": False}
     return {"message": "Курс удален из избранного", "is_favorite": False}
 
 
 @router.get("/check/{course_id}")
 async def check_favorite(
     course_id: int,
-    user: dict = Depends(get_telegram_user),
-    session: AsyncSession = Depends(get_session)
+    user: dict = Depends(get_telegram_user)
 ):
     """
     Проверить, находится ли курс в избранном
-    """
-    # Преобразуем telegram_id в int
-    telegram_id_raw = user["id"]
-    telegram_id = int(telegram_id_raw) if telegram_id_raw else None
     
-    if not telegram_id:
-        raise HTTPException(status_code=400, detail="Invalid telegram_id")
-    
-    # Получаем пользователя
-    result = await session.execute(
-        select(User).where(User.telegram_id == telegram_id)
-    )
-    db_user = result.scalar_one_or_none()
-    
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Проверяем наличие в избранном
-    result = await session.execute(
-        select(Favorite).where(
-            Favorite.user_id == db_user.id,
-            Favorite.course_id == course_id
-        )
-    )
-    favorite = result.scalar_one_or_none()
-    
-    return {"is_favorite": favorite is not None}
-
+    Каталог и карточка курса уже содержат is_favorite; все id - /api/favorites/ids
+    """
+    course_ids = await get_favorite_ids(int(user["id"]))
+    return {"is_favorite": course_id in course_ids}
@@ -6,10 +6,11 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
-from backend.database import get_session, User, UserCourse, UserProgress
+from backend.database import get_read_session, User, UserCourse, UserProgress
 from backend.webapp.middleware import get_telegram_user
+from backend.webapp.encoding import json_response
 
 router = APIRouter()
 
@@ -37,6 +38,9 @@ class MyPositionResponse(BaseModel):
     total_users: int
 
 
+_leaderboard_adapter = TypeAdapter(List[LeaderboardEntry])
+
+
 # ========================================
 # Эндпоинты
 # ========================================
@@ -44,7 +48,7 @@ class MyPositionResponse(BaseModel):
 @router.get("/", response_model=List[LeaderboardEntry])
 async def get_leaderboard(
     limit: int = Query(default=10, ge=1, le=100),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Получить топ пользователей по баллам
@@ -104,13 +108,13 @@ async def get_leaderboard(
             completed_lessons=data['completed_lessons']
         ))
     
-    return leaderboard
+    return json_response(_leaderboard_adapter, leaderboard)
 
 
 @router.get("/courses", response_model=List[LeaderboardEntry])
 async def get_leaderboard_by_courses(
     limit: int = Query(default=10, ge=1, le=100),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Получить топ пользователей по завершенным курсам
@@ -174,50 +178,18 @@ async def get_leaderboard_by_courses(
             completed_lessons=data['completed_lessons']
         ))
     
-    return leaderboard
+    return json_response(_leaderboard_adapter, leaderboard)
 
 
-@router.get("/my-position", response_model=MyPositionResponse)
-async def get_my_position(
-    user: dict = Depends(get_telegram_user),
-    session: AsyncSession = Depends(get_session)
-):
+async def count_position(
+    session: AsyncSession,
+    points: int,
+    completed_courses: int,
+    completed_lessons: int
+) -> tuple[int, int]:
     """
-    Получить позицию текущего пользователя в лидборде
+    Место пользователя с такими показателями и число активных пользователей
     """
-    # Преобразуем telegram_id в int
-    telegram_id_raw = user["id"]
-    telegram_id = int(telegram_id_raw) if telegram_id_raw else None
-    
-    if not telegram_id:
-        raise HTTPException(status_code=400, detail="Invalid telegram_id")
-    
-    # Получаем пользователя
-    result = await session.execute(
-        select(User).where(User.telegram_id == telegram_id)
-    )
-    db_user = result.scalar_one_or_none()
-    
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Получаем статистику пользователя
-    result = await session.execute(
-        select(
-            func.count(UserCourse.id.distinct()).label('completed_courses')
-        )
-        .where((UserCourse.user_id == db_user.id) & (UserCourse.is_completed == True))
-    )
-    completed_courses = result.scalar() or 0
-    
-    result = await session.execute(
-        select(
-            func.count(UserProgress.id.distinct()).label('completed_lessons')
-        )
-        .where((UserProgress.user_id == db_user.id) & (UserProgress.completed == True))
-    )
-    completed_lessons = result.scalar() or 0
-    
     # Подсчитываем позицию пользователя
     # Считаем сколько пользователей имеют больше баллов или равные баллы но больше курсов/уроков
     query = (
@@ -225,9 +197,9 @@ async def get_my_position(
         .where(
             (User.is_active == True) &
             (
-                (User.points > db_user.points) |
+                (User.points > points) |
                 (
-                    (User.points == db_user.points) &
+                    (User.points == points) &
                     (
                         (select(func.count(UserCourse.id.distinct()))
                          .where((UserCourse.user_id == User.id) & (UserCourse.is_completed == True))
@@ -235,7 +207,7 @@ async def get_my_position(
                     )
                 ) |
                 (
-                    (User.points == db_user.points) &
+                    (User.points == points) &
                     (
                         (select(func.count(UserCourse.id.distinct()))
                          .where((UserCourse.user_id == User.id) & (UserCourse.is_completed == True))
@@ -260,6 +232,52 @@ async def get_my_position(
     )
     total_users = result.scalar() or 0
     
+    return position, total_users
+
+
+@router.get("/my-position", response_model=MyPositionResponse)
+async def get_my_position(
+    user: dict = Depends(get_telegram_user),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Получить позицию текущего пользователя в лидборде
+    """
+    # Преобразуем telegram_id в int
+    telegram_id_raw = user["id"]
+    telegram_id = int(telegram_id_raw) if telegram_id_raw else None
+    
+    if not telegram_id:
+        raise HTTPException(status_code=400, detail="Invalid telegram_id")
+    
+    # Получаем пользователя
+    result = await session.execute(
+        select(User).where(User.telegram_id == telegram_id)
+    )
+    db_user = result.scalar_one_or_none()
+    
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Получаем статистику пользователя
+    result = await session.execute(
+        select(
+            func.count(UserCourse.id.distinct()).label('completed_courses')
+        )
+        .where((UserCourse.user_id == db_user.id) & (UserCourse.is_completed == True))
+    )
+    completed_courses = result.scalar() or 0
+    
+    result = await session.execute(
+        select(
+            func.count(UserProgress.id.distinct()).label('completed_lessons')
+        )
+        .where((UserProgress.user_id == db_user.id) & (UserProgress.completed == True))
+    )
+    completed_lessons = result.scalar() or 0
+    
+    position, total_users = await count_position(session, db_user.points, completed_courses, completed_lessons)
+    
     return MyPositionResponse(
         position=position,
         points=db_user.points or 0,
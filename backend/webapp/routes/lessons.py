@@ -2,15 +2,20 @@
 API эндпоинты для уроков
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from typing import Optional
+import logging
 
 from backend.database import get_session, Lesson, UserProgress, User, UserCourse, Course, Certificate, Community
-from backend.webapp.schemas import LessonDetailResponse
+from backend.webapp.schemas import LessonDetailResponse, LessonHeartbeatRequest
 from backend.webapp.middleware import get_telegram_user
+from backend.webapp.http_cache import active_course_categories, courses_version, lessons_version
+from backend.webapp.media import sign_media_url
 from backend.config import settings
+from backend.database.upsert import session_insert
 from backend.services.gamification import (
     award_points_for_lesson_completion,
     check_course_completion
@@ -27,9 +32,26 @@ from backend.services.notifications import (
     send_community_recommendation
 )
 from backend.services.challenges import check_all_user_challenges
+from backend.services.user_cache import resolve_user_id, user_owns_course
+from backend.services.recommendations import owned_course_ids, recommender
+from backend.services.watch_time import watch_time_buffer
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Урок -> (курс, открыт без покупки) для текущей версии lessons_version
+# (heartbeat проверяет урок без БД)
+_lessons: tuple = (None, {})
+
+
+def _lesson_access(snapshot, lesson_id: int) -> Optional[tuple[int, bool]]:
+    global _lessons
+    if _lessons[0] != snapshot.tag:
+        # id, course_id, title, order, video_duration, is_free; первый урок - превью, как в get_lesson
+        _lessons = (snapshot.tag, {row[0]: (row[1], bool(row[5]) or row[3] == 1) for row in snapshot.rows})
+    return _lessons[1].get(lesson_id)
+
 
 @router.get("/{lesson_id}", response_model=LessonDetailResponse)
 async def get_lesson(
@@ -40,6 +62,8 @@ async def get_lesson(
     """
     Получить детали урока (видео, PDF и т.д.)
     Доступ только если курс оплачен (или урок бесплатный)
+    
+    Локальные видео и PDF отдаются подписанными ссылками на /media (webapp/media.py)
     """
     telegram_id = user["id"]
     
@@ -76,9 +100,9 @@ async def get_lesson(
             title=lesson.title,
             description=lesson.description,
             order=lesson.order,
-            video_url=lesson.video_url,
+            video_url=sign_media_url(lesson.video_url),
             video_duration=lesson.video_duration,
-            pdf_url=lesson.pdf_url,
+            pdf_url=sign_media_url(lesson.pdf_url),
             is_free=lesson.is_free or is_first_lesson  # Первый урок помечаем как бесплатный
         )
     
@@ -103,9 +127,9 @@ async def get_lesson(
         title=lesson.title,
         description=lesson.description,
         order=lesson.order,
-        video_url=lesson.video_url,
+        video_url=sign_media_url(lesson.video_url),
         video_duration=lesson.video_duration,
-        pdf_url=lesson.pdf_url,
+        pdf_url=sign_media_url(lesson.pdf_url),
         is_free=lesson.is_free
     )
 
@@ -162,36 +186,23 @@ async def complete_lesson(
                 detail="Access denied. You need to purchase this course to complete lessons."
             )
     
-    # Проверяем, есть ли уже запись о прогрессе
-    result = await session.execute(
-        select(UserProgress).where(
-            UserProgress.user_id == db_user.id,
-            UserProgress.lesson_id == lesson_id
-        )
+    # Отмечаем урок одним upsert: буфер просмотров (heartbeat) может вставить
+    # ту же строку (user_id, lesson_id) между SELECT и INSERT
+    completed_at = datetime.now()
+    statement = session_insert(session)(UserProgress).values(
+        user_id=db_user.id, lesson_id=lesson_id, completed=True, completed_at=completed_at,
     )
-    progress = result.scalar_one_or_none()
-    
-    if progress:
-        # Обновляем существующую запись
-        progress.completed = True
-        progress.completed_at = datetime.now()
-    else:
-        # Создаём новую запись
-        progress = UserProgress(
-            user_id=db_user.id,
-            lesson_id=lesson_id,
-            completed=True,
-            completed_at=datetime.now()
-        )
-        session.add(progress)
-    
+    await session.execute(statement.on_conflict_do_update(
+        index_elements=[UserProgress.user_id, UserProgress.lesson_id],
+        set_={"completed": True, "completed_at": completed_at},
+    ))
     await session.commit()
     
     # Начисляем баллы за завершение урока
     points_earned = 0
     try:
         points_earned = await award_points_for_lesson_completion(session, db_user.id, lesson_id)
-        print(f"✅ [Lessons] Начислены баллы за урок {lesson_id} пользователю {db_user.full_name}")
+        logger.debug("[Lessons] Начислены баллы за урок %s пользователю %s", lesson_id, db_user.id)
         
         # Отправляем уведомление о завершении урока
         try:
@@ -207,9 +218,9 @@ async def complete_lesson(
                     points_earned
                 )
         except Exception as e:
-            print(f"⚠️ [Lessons] Ошибка отправки уведомления о завершении урока: {e}")
-    except Exception as e:
-        print(f"⚠️ [Lessons] Ошибка начисления баллов за урок: {e}")
+            logger.warning("[Lessons] Ошибка отправки уведомления о завершении урока: %s", e)
+    except Exception:
+        logger.warning("[Lessons] Ошибка начисления баллов за урок", exc_info=True)
     
     # Проверяем, завершен ли курс (все уроки пройдены)
     # Это автоматически начислит баллы за курс и проверит достижения
@@ -218,7 +229,7 @@ async def complete_lesson(
     try:
         course_completed = await check_course_completion(session, db_user.id, lesson.course_id)
         if course_completed:
-            print(f"🎉 [Lessons] Курс {lesson.course_id} завершен пользователем {db_user.full_name}")
+            logger.info("[Lessons] Курс %s завершен пользователем %s", lesson.course_id, db_user.id)
             
             # Получаем информацию о завершенном курсе
             result = await session.execute(
@@ -236,56 +247,25 @@ async def complete_lesson(
                         100  # POINTS_PER_COURSE
                     )
                 except Exception as e:
-                    print(f"⚠️ [Lessons] Ошибка отправки уведомления о завершении курса: {e}")
+                    logger.warning("[Lessons] Ошибка отправки уведомления о завершении курса: %s", e)
                 
-                # Рекомендуем следующий курс
+                # Рекомендуем следующий курс (модель совместных записей в памяти)
                 try:
-                    # Ищем следующий курс (по той же категории или просто другой активный курс)
-                    # Сначала ищем по категории
-                    result = await session.execute(
-                        select(Course)
-                        .where(
-                            Course.id != completed_course.id,
-                            Course.is_active == True,
-                            Course.category == completed_course.category
-                        )
-                        .where(
-                            ~select(UserCourse.id).where(
-                                UserCourse.user_id == db_user.id,
-                                UserCourse.course_id == Course.id
-                            ).exists()
-                        )
-                        .limit(1)
+                    owned = await owned_course_ids(session, db_user.id)
+                    snapshot = await courses_version.get()
+                    recommended = recommender.recommend(
+                        owned, active_course_categories(snapshot), seed=completed_course.id
                     )
-                    recommended_course = result.scalar_one_or_none()
-                    
-                    # Если не нашли по категории - ищем любой другой активный курс
-                    if not recommended_course:
-                        result = await session.execute(
-                            select(Course)
-                            .where(
-                                Course.id != completed_course.id,
-                                Course.is_active == True
-                            )
-                            .where(
-                                ~select(UserCourse.id).where(
-                                    UserCourse.user_id == db_user.id,
-                                    UserCourse.course_id == Course.id
-                                ).exists()
-                            )
-                            .limit(1)
-                        )
-                        recommended_course = result.scalar_one_or_none()
-                    
-                    if recommended_course:
+                    if recommended:
+                        titles = {row[0]: row[1] for row in snapshot.rows}
                         await send_next_course_recommendation(
                             db_user.telegram_id,
-                            recommended_course.title,
-                            recommended_course.id
+                            titles[recommended[0]],
+                            recommended[0]
                         )
-                        print(f"📚 [Lessons] Рекомендован следующий курс: {recommended_course.title}")
+                        logger.debug("[Lessons] Рекомендован следующий курс: %s", recommended[0])
                 except Exception as e:
-                    print(f"⚠️ [Lessons] Ошибка рекомендации следующего курса: {e}")
+                    logger.warning("[Lessons] Ошибка рекомендации следующего курса: %s", e)
                 
                 # Рекомендуем сообщество (чат)
                 try:
@@ -332,17 +312,17 @@ async def complete_lesson(
                             community.telegram_link,
                             reason
                         )
-                        print(f"💬 [Lessons] Рекомендовано сообщество: {community.title}")
+                        logger.debug("[Lessons] Рекомендовано сообщество: %s", community.id)
                 except Exception as e:
-                    print(f"⚠️ [Lessons] Ошибка рекомендации сообщества: {e}")
-    except Exception as e:
-        print(f"⚠️ [Lessons] Ошибка проверки завершения курса: {e}")
+                    logger.warning("[Lessons] Ошибка рекомендации сообщества: %s", e)
+    except Exception:
+        logger.warning("[Lessons] Ошибка проверки завершения курса", exc_info=True)
     
     # Проверяем прогресс в челленджах
     try:
         await check_all_user_challenges(session, db_user.id)
-    except Exception as e:
-        print(f"⚠️ [Lessons] Ошибка проверки челленджей: {e}")
+    except Exception:
+        logger.warning("[Lessons] Ошибка проверки челленджей", exc_info=True)
     
     # Если курс завершен - генерируем сертификат
     certificate_data = None
@@ -394,7 +374,7 @@ async def complete_lesson(
                         "issued_at": certificate.issued_at.isoformat() if hasattr(certificate.issued_at, 'isoformat') else str(certificate.issued_at)
                     }
                     
-                    print(f"🏆 [Lessons] Сертификат создан для пользователя {db_user.full_name}, курс: {course.title}")
+                    logger.info("[Lessons] Сертификат создан: user_id=%s, course_id=%s", db_user.id, course.id)
             else:
                 # Если сертификат уже существует - возвращаем его данные
                 result = await session.execute(
@@ -411,11 +391,9 @@ async def complete_lesson(
                         "certificate_number": existing_cert.certificate_number,
                         "issued_at": existing_cert.issued_at.isoformat() if hasattr(existing_cert.issued_at, 'isoformat') else str(existing_cert.issued_at)
                     }
-                print(f"ℹ️ [Lessons] Сертификат для курса {lesson.course_id} уже существует")
-        except Exception as e:
-            import traceback
-            print(f"⚠️ [Lessons] Ошибка генерации сертификата: {e}")
-            print(f"   Traceback: {traceback.format_exc()}")
+                logger.debug("[Lessons] Сертификат для курса %s уже существует", lesson.course_id)
+        except Exception:
+            logger.warning("[Lessons] Ошибка генерации сертификата", exc_info=True)
     
     return {
         "status": "success", 
@@ -425,9 +403,44 @@ async def complete_lesson(
     }
 
 
+@router.post("/{lesson_id}/heartbeat", status_code=204)
+async def lesson_heartbeat(
+    lesson_id: int,
+    heartbeat: LessonHeartbeatRequest,
+    user: dict = Depends(get_telegram_user)
+):
+    """
+    Heartbeat плеера урока: секунды просмотра копятся в памяти воркера
+    и пишутся в UserProgress.watch_time пачкой (services/watch_time.py)
+    
+    Обычно без запросов к БД: урок проверяется по версии уроков в памяти,
+    users.id и курсы пользователя берутся из кеша (user_cache). Доступ -
+    как в get_lesson: бесплатный или первый урок, админ или купленный курс.
+    """
+    lesson = _lesson_access(await lessons_version.get(), lesson_id)
+    if lesson is None:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    
+    telegram_id = int(user["id"])
+    user_id = await resolve_user_id(telegram_id)
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    course_id, is_open = lesson
+    if not (is_open or telegram_id in settings.admin_ids_list or await user_owns_course(user_id, course_id)):
+        raise HTTPException(
+            status_code=403,
+            detail="Access denied. You need to purchase this course to access lessons."
+        )
+    
+    watch_time_buffer.add(user_id, lesson_id, heartbeat.seconds)
+    return Response(status_code=204)
+
+
 # ========================================
 # Пример запроса:
 # ========================================
 # GET /api/lessons/1
 # POST /api/lessons/1/complete
+# POST /api/lessons/1/heartbeat {"seconds": 15}
 
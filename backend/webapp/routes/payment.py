@@ -2,6 +2,7 @@
 API эндпоинты для оплаты через ЮKassa
 """
 
+import logging
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
@@ -11,6 +12,9 @@ from pydantic import BaseModel
 from backend.database import get_session, User, Course, Payment, UserCourse
 from backend.webapp.middleware import get_telegram_user
 from backend.config import settings
+from backend.services.payment_reconciliation import apply_provider_statuses, get_yookassa_provider
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -169,11 +173,9 @@ async def get_payment_status(
     """
     Получить статус платежа
     
-    TODO: Когда появятся данные ЮKassa:
-    1. Раскомментировать импорт: from yookassa import Payment as YooPayment
-    2. Получить статус через YooPayment.find_one(yookassa_payment_id)
-    3. Обновить статус в БД
-    4. Если оплачено - создать запись UserCourse
+    Платёж в pending сверяется с ЮKassa (async-клиент, без блокировки
+    event loop); оплаченный - переводится в succeeded с выдачей курса,
+    как при фоновой сверке (services/payment_reconciliation).
     """
     telegram_id = user["id"]
     
@@ -198,53 +200,21 @@ async def get_payment_status(
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
     
-    # Проверка статуса в ЮKassa
-    if payment.yookassa_payment_id and settings.YUKASSA_SHOP_ID and settings.YUKASSA_SECRET_KEY:
+    # Проверка статуса в ЮKassa для всех неоплаченных: если отменённый у нас
+    # платёж на самом деле оплачен (потерянный webhook), курс выдаётся сейчас
+    provider = get_yookassa_provider()
+    if payment.yookassa_payment_id and payment.status != "succeeded" and provider is not None:
         try:
-            from yookassa import Configuration, Payment as YooPayment
-            from datetime import datetime
-            
-            # Настройка ЮKassa
-            Configuration.account_id = settings.YUKASSA_SHOP_ID
-            Configuration.secret_key = settings.YUKASSA_SECRET_KEY
-            
-            # Получаем актуальный статус платежа
-            yoo_payment = YooPayment.find_one(payment.yookassa_payment_id)
-            
-            # Обновляем статус если изменился
-            if yoo_payment.status == "succeeded" and payment.status != "succeeded":
-                payment.status = "succeeded"
-                payment.paid_at = datetime.now()
-                payment.payment_method = yoo_payment.payment_method.type if yoo_payment.payment_method else None
-                
-                # Проверяем, не создана ли уже запись UserCourse
-                result = await session.execute(
-                    select(UserCourse).where(
-                        UserCourse.user_id == db_user.id,
-                        UserCourse.course_id == payment.course_id
-                    )
-                )
-                existing_user_course = result.scalar_one_or_none()
-                
-                # Создаём запись о покупке курса, если её ещё нет
-                if not existing_user_course:
-                    user_course = UserCourse(
-                        user_id=db_user.id,
-                        course_id=payment.course_id
-                    )
-                    session.add(user_course)
-                    print(f"✅ [Payment] Создана запись UserCourse для пользователя {db_user.id} и курса {payment.course_id}")
-                
+            remote = await provider.get_payment(payment.yookassa_payment_id)
+            applied = await apply_provider_statuses(
+                session, [(payment.id, remote)], succeeded_from=("pending", "canceled"),
+            )
+            if applied.succeeded or applied.canceled:
                 await session.commit()
-                print(f"✅ [Payment] Платеж {payment.id} обновлен: статус = succeeded")
-                
-            elif yoo_payment.status == "canceled" and payment.status != "canceled":
-                payment.status = "canceled"
-                await session.commit()
-                print(f"⚠️ [Payment] Платеж {payment.id} отменен")
-                
+                await session.refresh(payment)
+                logger.info("✅ [Payment] Платеж %s обновлен: статус = %s", payment.id, payment.status)
         except Exception as e:
-            print(f"⚠️ [Payment] Ошибка проверки статуса в ЮKassa: {e}")
+            logger.warning("⚠️ [Payment] Ошибка проверки статуса в ЮKassa: %s", e)
             # Продолжаем с текущим статусом из БД
     
     return PaymentStatusResponse(
@@ -6,10 +6,11 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
-from backend.database import get_session, Review, Course, User
+from backend.database import get_session, get_read_session, Review, Course, User
 from backend.webapp.middleware import get_telegram_user
+from backend.webapp.encoding import json_response
 
 router = APIRouter()
 
@@ -43,6 +44,9 @@ class CourseRatingResponse(BaseModel):
     rating_distribution: dict  # {1: count, 2: count, ...}
 
 
+_reviews_adapter = TypeAdapter(List[ReviewResponse])
+
+
 # ========================================
 # Эндпоинты
 # ========================================
@@ -51,7 +55,7 @@ async def get_course_reviews(
     course_id: int,
     limit: int = 50,
     offset: int = 0,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Получить отзывы по курсу
@@ -89,13 +93,13 @@ async def get_course_reviews(
             updated_at=review.updated_at.isoformat() if review.updated_at else None
         ))
     
-    return reviews_list
+    return json_response(_reviews_adapter, reviews_list)
 
 
 @router.get("/course/{course_id}/rating", response_model=CourseRatingResponse)
 async def get_course_rating(
     course_id: int,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Получить рейтинг курса (средний рейтинг, количество отзывов, распределение)
@@ -318,6 +322,6 @@ async def get_my_reviews(
             updated_at=review.updated_at.isoformat() if review.updated_at else None
         ))
     
-    return reviews_list
+    return json_response(_reviews_adapter, reviews_list)
 
 
@@ -2,17 +2,20 @@
 API эндпоинты для поддержки
 """
 
+import asyncio
+import time
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from datetime import datetime
 
-from backend.database import get_session, SupportTicket, SupportMessage, User
+from backend.database import get_session, async_session, SupportTicket, SupportMessage, User
 from backend.webapp.middleware import get_telegram_user
 from backend.config import settings
-from backend.services.notifications import send_notification
+from backend.services import support_live
+from backend.services.support_inbox import post_message
+from backend.services.support_notifications import SupportEvent, admin_notifier
 
 router = APIRouter()
 
@@ -43,6 +46,13 @@ class SupportTicketResponse(BaseModel):
         from_attributes = True
 
 
+class SupportUpdatesResponse(BaseModel):
+    ticket_id: int
+    status: str
+    last_id: int  # since_id для следующего запроса
+    messages: List[SupportMessageResponse]
+
+
 class CreateTicketRequest(BaseModel):
     subject: Optional[str] = None
     message: str
@@ -157,21 +167,12 @@ async def create_ticket(
     
     # Добавляем первое сообщение
     if request.message:
-        message = SupportMessage(
-            ticket_id=ticket.id,
-            user_id=db_user.id,
-            message=request.message,
-            is_from_admin=False
-        )
-        session.add(message)
+        await post_message(session, ticket.id, db_user.id, request.message, is_from_admin=False)
         await session.commit()
+        await support_live.publish_ticket_update(ticket.id)
         
-        # Отправляем уведомление админам (не блокируем ответ, если уведомление не отправилось)
-        try:
-            await notify_admins_new_ticket(db_user, ticket, request.message)
-        except Exception as e:
-            print(f"⚠️ [Support] Ошибка отправки уведомления админам о новом тикете (не критично): {e}")
-            # Не пробрасываем ошибку - тикет уже создан
+        # Уведомление админам уходит в фоне - ответ не ждёт Telegram
+        notify_admins_new_ticket(db_user, ticket, request.message)
     
     return SupportTicketResponse(
         id=ticket.id,
@@ -226,27 +227,14 @@ async def send_message(
         await session.commit()
         await session.refresh(ticket)
     
-    # Создаем сообщение
-    message = SupportMessage(
-        ticket_id=ticket.id,
-        user_id=db_user.id,
-        message=request.message,
-        is_from_admin=False
-    )
-    session.add(message)
-    
-    # Обновляем updated_at тикета
-    ticket.updated_at = datetime.now()
-    
+    # Создаем сообщение (счётчик непрочитанных и последнее сообщение - в тикете)
+    message = await post_message(session, ticket.id, db_user.id, request.message, is_from_admin=False)
     await session.commit()
-    await session.refresh(message)
+    # Другие открытые окна чата пользователя получат сообщение сразу
+    await support_live.publish_ticket_update(ticket.id)
     
-    # Отправляем уведомление админам (не блокируем ответ, если уведомление не отправилось)
-    try:
-        await notify_admins_new_message(db_user, ticket, request.message)
-    except Exception as e:
-        print(f"⚠️ [Support] Ошибка отправки уведомления админам (не критично): {e}")
-        # Не пробрасываем ошибку - сообщение уже сохранено
+    # Уведомление админам уходит в фоне - ответ не ждёт Telegram
+    notify_admins_new_message(db_user, ticket, request.message)
     
     return SupportMessageResponse(
         id=message.id,
@@ -257,61 +245,86 @@ async def send_message(
     )
 
 
-async def notify_admins_new_ticket(user: User, ticket: SupportTicket, first_message: str):
+@router.get("/ticket/updates", response_model=SupportUpdatesResponse)
+async def get_ticket_updates(
+    ticket_id: int,
+    since_id: int = Query(0, ge=0),
+    timeout: int = Query(settings.SUPPORT_LIVE_TIMEOUT, ge=0, le=settings.SUPPORT_LIVE_TIMEOUT),
+    user: dict = Depends(get_telegram_user)
+):
     """
-    Уведомить админов о новом тикете
+    Новые сообщения тикета после since_id (long-poll)
+    
+    Если новых сообщений нет, запрос ждёт их до timeout секунд и возвращает
+    пустой список - клиент сразу повторяет запрос с last_id. Соединение
+    с БД на время ожидания не занимается.
     """
-    try:
-        if not settings.admin_ids_list:
-            print("⚠️ [Support] Список админов пуст, уведомления не отправляются")
-            return
-        
-        for admin_id in settings.admin_ids_list:
-            try:
-                message_text = (
-                    f"🆕 <b>Новый тикет поддержки</b>\n\n"
-                    f"👤 Пользователь: {user.full_name}\n"
-                    f"🆔 Telegram ID: <code>{user.telegram_id}</code>\n"
-                    f"📋 Тикет: #{ticket.id}\n\n"
-                    f"💬 Сообщение:\n{first_message}\n\n"
-                    f"💡 Ответьте пользователю через админ-бота"
+    telegram_id = int(user["id"])
+    deadline = time.monotonic() + timeout
+    
+    with support_live.subscribe(ticket_id) as changed:
+        while True:
+            changed.clear()
+            async with async_session() as session:
+                status = await session.scalar(
+                    select(SupportTicket.status)
+                    .join(User, SupportTicket.user_id == User.id)
+                    .where(SupportTicket.id == ticket_id, User.telegram_id == telegram_id)
                 )
-                await send_notification(admin_id, message_text)
-            except Exception as e:
-                print(f"⚠️ [Support] Ошибка отправки уведомления админу {admin_id}: {e}")
-                # Продолжаем отправку другим админам
-                continue
-    except Exception as e:
-        print(f"⚠️ [Support] Критическая ошибка отправки уведомления админам: {e}")
-        import traceback
-        traceback.print_exc()
+                if status is None:
+                    raise HTTPException(status_code=404, detail="Ticket not found")
+                result = await session.execute(
+                    select(SupportMessage)
+                    .where(SupportMessage.ticket_id == ticket_id, SupportMessage.id > since_id)
+                    .order_by(SupportMessage.id)
+                )
+                messages = result.scalars().all()
+            
+            remaining = deadline - time.monotonic()
+            if messages or status != "open" or remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(changed.wait(), min(remaining, support_live.recheck_interval()))
+            except asyncio.TimeoutError:
+                pass
+    
+    return SupportUpdatesResponse(
+        ticket_id=ticket_id,
+        status=status,
+        last_id=messages[-1].id if messages else since_id,
+        messages=[
+            SupportMessageResponse(
+                id=msg.id,
+                ticket_id=msg.ticket_id,
+                message=msg.message,
+                is_from_admin=msg.is_from_admin,
+                created_at=msg.created_at.isoformat() if hasattr(msg.created_at, 'isoformat') else str(msg.created_at)
+            )
+            for msg in messages
+        ]
+    )
 
 
-async def notify_admins_new_message(user: User, ticket: SupportTicket, message_text: str):
+def notify_admins_new_ticket(user: User, ticket: SupportTicket, first_message: str):
     """
-    Уведомить админов о новом сообщении в тикете
+    Уведомить админов о новом тикете (в фоне, см. backend/services/support_notifications.py)
     """
-    try:
-        if not settings.admin_ids_list:
-            print("⚠️ [Support] Список админов пуст, уведомления не отправляются")
-            return
-        
-        for admin_id in settings.admin_ids_list:
-            try:
-                notification = (
-                    f"💬 <b>Новое сообщение в тикете #{ticket.id}</b>\n\n"
-                    f"👤 Пользователь: {user.full_name}\n"
-                    f"🆔 Telegram ID: <code>{user.telegram_id}</code>\n\n"
-                    f"💬 Сообщение:\n{message_text}\n\n"
-                    f"💡 Ответьте пользователю через админ-бота"
-                )
-                await send_notification(admin_id, notification)
-            except Exception as e:
-                print(f"⚠️ [Support] Ошибка отправки уведомления админу {admin_id}: {e}")
-                # Продолжаем отправку другим админам
-                continue
-    except Exception as e:
-        print(f"⚠️ [Support] Критическая ошибка отправки уведомления админам: {e}")
-        import traceback
-        traceback.print_exc()
+    admin_notifier.submit(SupportEvent(
+        ticket_id=ticket.id,
+        user_full_name=user.full_name,
+        user_telegram_id=user.telegram_id,
+        text=first_message,
+        is_new_ticket=True,
+    ))
+
 
+def notify_admins_new_message(user: User, ticket: SupportTicket, message_text: str):
+    """
+    Уведомить админов о новом сообщении в тикете (в фоне, сообщения склеиваются в дайджест)
+    """
+    admin_notifier.submit(SupportEvent(
+        ticket_id=ticket.id,
+        user_full_name=user.full_name,
+        user_telegram_id=user.telegram_id,
+        text=message_text,
+    ))
@@ -3,7 +3,7 @@ Pydantic схемы для FastAPI
 Request и Response модели
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -24,6 +24,7 @@ class CourseResponse(BaseModel):
     is_top: bool
     price: float
     duration_hours: Optional[int] = None
+    is_favorite: bool = False
     
     class Config:
         from_attributes = True
@@ -53,6 +54,7 @@ class CourseDetailResponse(BaseModel):
     is_top: bool
     price: float
     duration_hours: Optional[int] = None
+    is_favorite: bool = False
     lessons: List[LessonShortResponse]
 
 
@@ -78,6 +80,14 @@ class LessonDetailResponse(BaseModel):
         from_attributes = True
 
 
+class LessonHeartbeatRequest(BaseModel):
+    """
+    Heartbeat плеера: сколько секунд видео просмотрено с прошлого heartbeat
+    """
+    seconds: float = Field(ge=0, le=3600)
+    position: Optional[float] = Field(default=None, ge=0)  # Текущая позиция в видео (сек), для отладки
+
+
 # ========================================
 # Profile
 # ========================================
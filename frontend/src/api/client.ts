@@ -96,6 +96,7 @@ export interface Course {
   is_top: boolean
   price: number
   duration_hours?: number
+  is_favorite?: boolean  // Есть в каталоге и карточке курса для авторизованного пользователя
 }
 
 export interface CourseDetail extends Course {
@@ -130,6 +131,10 @@ export const coursesApi = {
   // Получить курсы пользователя
   getMy: () =>
     api.get<Course[]>('/courses/my/courses'),
+
+  // Рекомендованные курсы (кроме уже купленных)
+  getRecommended: (limit = 3) =>
+    api.get<Course[]>('/courses/recommended', { params: { limit } }),
 }
 
 // ========================================
@@ -394,6 +399,10 @@ export const favoritesApi = {
   // Проверить, в избранном ли курс
   check: (courseId: number) =>
     api.get<{ is_favorite: boolean }>(`/favorites/check/${courseId}`),
+
+  // id всех избранных курсов
+  getIds: () =>
+    api.get<{ course_ids: number[] }>('/favorites/ids'),
 }
 
 // ========================================
@@ -504,6 +513,13 @@ export interface SupportTicket {
   messages: SupportMessage[]
 }
 
+export interface SupportUpdates {
+  ticket_id: number
+  status: string
+  last_id: number
+  messages: SupportMessage[]
+}
+
 export const supportApi = {
   // Получить мой тикет (или создать новый)
   getMyTicket: () =>
@@ -516,6 +532,74 @@ export const supportApi = {
   // Отправить сообщение в тикет
   sendMessage: (data: { message: string }) =>
     api.post<SupportMessage>('/support/ticket/message', data),
+
+  // Новые сообщения после sinceId (long-poll: сервер отвечает при появлении сообщений или по таймауту)
+  getUpdates: (ticketId: number, sinceId: number, signal?: AbortSignal) =>
+    api.get<SupportUpdates>('/support/ticket/updates', {
+      params: { ticket_id: ticketId, since_id: sinceId },
+      signal,
+    }),
+}
+
+
+// ========================================
+// Bootstrap API (первый экран одним запросом)
+// ========================================
+
+export interface MyCourse extends Course {
+  progress: {
+    total_lessons: number
+    completed_lessons: number
+    progress_percent: number
+    purchased_at?: string
+    is_completed: boolean
+  }
+}
+
+export interface BootstrapData {
+  access: AccessStatus
+  profile: Profile
+  courses: Course[]
+  my_courses: MyCourse[]
+  favorites: Course[]
+  leaderboard: MyPosition
+}
+
+type BootstrapSection<T> = { version: string; unchanged?: boolean; data?: T }
+
+const BOOTSTRAP_STORAGE_KEY = 'bootstrap_sections'
+
+export const bootstrapApi = {
+  // Данные первого экрана; неизменившиеся секции берутся из localStorage
+  load: async (): Promise<BootstrapData> => {
+    let stored: Record<string, BootstrapSection<unknown>> = {}
+    try {
+      stored = JSON.parse(localStorage.getItem(BOOTSTRAP_STORAGE_KEY) || '{}')
+    } catch {
+      stored = {}
+    }
+    const known = Object.entries(stored)
+      .map(([name, section]) => `${name}:${section.version}`)
+      .join(',')
+
+    const response = await api.get<{ sections: Record<string, BootstrapSection<unknown>> }>(
+      '/bootstrap',
+      { params: known ? { known } : {} },
+    )
+
+    const sections: Record<string, BootstrapSection<unknown>> = {}
+    for (const [name, section] of Object.entries(response.data.sections)) {
+      sections[name] = section.unchanged && stored[name] ? stored[name] : section
+    }
+    try {
+      localStorage.setItem(BOOTSTRAP_STORAGE_KEY, JSON.stringify(sections))
+    } catch {
+      // Переполненный localStorage - в следующий раз придут все секции
+    }
+    return Object.fromEntries(
+      Object.entries(sections).map(([name, section]) => [name, section.data]),
+    ) as unknown as BootstrapData
+  },
 }
 
 export default api
@@ -11,12 +11,17 @@ interface CourseCardProps {
 }
 
 const CourseCard = ({ course }: CourseCardProps) => {
-  const [isFavorite, setIsFavorite] = useState(false)
+  const [isFavorite, setIsFavorite] = useState(course.is_favorite ?? false)
   const [loadingFavorite, setLoadingFavorite] = useState(false)
 
   useEffect(() => {
-    checkFavorite()
-  }, [course.id])
+    // Каталог уже отмечает избранное - отдельный запрос только для старых ответов
+    if (course.is_favorite === undefined) {
+      checkFavorite()
+    } else {
+      setIsFavorite(course.is_favorite)
+    }
+  }, [course.id, course.is_favorite])
 
   const checkFavorite = async () => {
     try {
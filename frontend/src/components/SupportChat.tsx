@@ -9,17 +9,58 @@ interface SupportChatProps {
   onClose: () => void
 }
 
+// Добавить сообщения с сервера, пропуская уже показанные (по id)
+const mergeMessages = (current: SupportMessage[], incoming: SupportMessage[]) => {
+  const known = new Set(current.map(msg => msg.id))
+  const fresh = incoming.filter(msg => !known.has(msg.id))
+  return fresh.length > 0 ? [...current, ...fresh] : current
+}
+
 const SupportChat = ({ onClose }: SupportChatProps) => {
   const [ticket, setTicket] = useState<SupportTicket | null>(null)
   const [message, setMessage] = useState('')
   const [loading, setLoading] = useState(true)
   const [sending, setSending] = useState(false)
   const messagesEndRef = useRef<HTMLDivElement>(null)
+  // id последнего сообщения с сервера - since_id для long-poll
+  const lastIdRef = useRef(0)
 
   useEffect(() => {
     loadTicket()
   }, [])
 
+  // Живые обновления: ответы поддержки приходят без перезагрузки всего тикета
+  useEffect(() => {
+    const ticketId = ticket?.id
+    if (!ticketId || ticket?.status !== 'open') return
+
+    const controller = new AbortController()
+    const poll = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          const response = await supportApi.getUpdates(ticketId, lastIdRef.current, controller.signal)
+          const updates = response.data
+          lastIdRef.current = Math.max(lastIdRef.current, updates.last_id)
+          if (updates.messages.length > 0 || updates.status !== 'open') {
+            setTicket(prev => prev && prev.id === ticketId ? {
+              ...prev,
+              status: updates.status,
+              messages: mergeMessages(prev.messages, updates.messages)
+            } : prev)
+          }
+          if (updates.status !== 'open') return
+        } catch (error: any) {
+          if (controller.signal.aborted) return
+          console.warn('⚠️ [SupportChat] Ошибка получения обновлений, повтор через 3 с:', error.message)
+          await new Promise(resolve => setTimeout(resolve, 3000))
+        }
+      }
+    }
+    poll()
+
+    return () => controller.abort()
+  }, [ticket?.id, ticket?.status])
+
   useEffect(() => {
     // Прокрутка вниз при новых сообщениях
     scrollToBottom()
@@ -35,6 +76,7 @@ const SupportChat = ({ onClose }: SupportChatProps) => {
       console.log('💬 [SupportChat] Загрузка тикета...', retryCount > 0 ? `(попытка ${retryCount + 1})` : '')
       const response = await supportApi.getMyTicket()
       console.log('✅ [SupportChat] Тикет загружен:', response.data)
+      lastIdRef.current = response.data.messages.reduce((max, msg) => Math.max(max, msg.id), 0)
       setTicket(response.data)
     } catch (error: any) {
       console.error('❌ [SupportChat] Ошибка загрузки тикета:', error)
@@ -118,15 +160,14 @@ const SupportChat = ({ onClose }: SupportChatProps) => {
       
       // Обновляем тикет с реальными данными с сервера
       if (ticket) {
-        // Заменяем временное сообщение на реальное
-        const updatedMessages = ticket.messages.map(msg => 
-          msg.id === tempMessage.id ? response.data : msg
-        )
-        setTicket({
-          ...ticket,
-          messages: updatedMessages,
+        // Заменяем временное сообщение на реальное (если long-poll его ещё не принёс)
+        setTicket(prev => prev ? {
+          ...prev,
+          messages: prev.messages.some(msg => msg.id === response.data.id)
+            ? prev.messages.filter(msg => msg.id !== tempMessage.id)
+            : prev.messages.map(msg => msg.id === tempMessage.id ? response.data : msg),
           updated_at: new Date().toISOString()
-        })
+        } : prev)
       } else {
         // Если тикета не было - перезагружаем его
         await loadTicket()
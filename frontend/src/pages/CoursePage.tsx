@@ -25,7 +25,6 @@ const CoursePage = () => {
       loadCourse(parseInt(id))
       loadProgress(parseInt(id))
       checkPurchaseStatus(parseInt(id))
-      checkFavoriteStatus(parseInt(id))
     }
   }, [id])
 
@@ -160,6 +159,12 @@ const CoursePage = () => {
           })) : []
         }
         setCourse(normalizedCourse)
+        // Отметка избранного приходит вместе с курсом; отдельный запрос - для старого API
+        if (typeof rawCourse.is_favorite === 'boolean') {
+          setIsFavorite(rawCourse.is_favorite)
+        } else {
+          checkFavoriteStatus(courseId)
+        }
       }
     } catch (error) {
       console.error('Ошибка загрузки курса:', error)
@@ -0,0 +1,47 @@
+"""
+Конфигурация gunicorn для API (несколько процессов uvicorn)
+
+Запуск:
+    gunicorn -c gunicorn.conf.py backend.webapp.app:app
+
+Боты в этих процессах не запускаются - для них отдельные процессы
+(см. backend/supervisor.py).
+"""
+
+import os
+
+from backend.config import settings
+
+bind = f"0.0.0.0:{os.getenv('PORT', settings.API_PORT)}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# WEB_CONCURRENCY - стандартная переменная PaaS (Railway/Heroku)
+workers = settings.api_workers
+
+# Долгие запросы (PDF, аналитика) не должны убивать воркер раньше времени
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+# Периодический перезапуск воркеров против роста памяти
+max_requests = 10000
+max_requests_jitter = 1000
+
+# Heartbeat-файлы в памяти, а не на диске контейнера
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# Каждый воркер сам создаёт engine и пул соединений в startup -
+# при preload соединения разделялись бы между процессами после fork
+preload_app = False
+
+
+
+def post_fork(server, worker):
+    # Фактическое число воркеров (с учётом -w в командной строке) - до загрузки
+    # приложения в воркере, см. settings.api_processes
+    os.environ["API_PROCESSES"] = str(server.num_workers)
+
+
+accesslog = None
+errorlog = "-"
+loglevel = settings.LOG_LEVEL.lower()
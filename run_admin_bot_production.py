@@ -6,10 +6,10 @@
 import asyncio
 import logging
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 from dotenv import load_dotenv
 
 from backend.config import settings
+from backend.utils.fsm_storage import create_fsm_storage, create_events_isolation
 from backend.admin_bot.bot import setup_admin_bot_handlers
 from backend.database.database import create_engine_and_session, init_db
 
@@ -59,8 +59,8 @@ async def main():
     # Создаём админ-бота и диспетчер
     logger.info("Создание админ-бота...")
     bot = Bot(token=settings.ADMIN_BOT_TOKEN)
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
+    storage = create_fsm_storage("admin_bot")
+    dp = Dispatcher(storage=storage, events_isolation=create_events_isolation(storage))
     
     # Регистрируем обработчики
     logger.info("Регистрация обработчиков админ-бота...")
@@ -5,8 +5,9 @@
 
 import asyncio
 import uvicorn
-from backend.webapp.app import create_app
-from backend.database.database import init_db
+from backend.config import settings
+from backend.webapp.app import app
+from backend.database.database import create_engine_and_session, init_db, close_db
 
 async def setup_database():
     """
@@ -14,11 +15,14 @@ async def setup_database():
     """
     try:
         print("🔧 Инициализация базы данных...")
+        create_engine_and_session()
         await init_db()
         print("✅ База данных готова")
     except Exception as e:
         print(f"⚠️ Ошибка инициализации БД: {e}")
         print("💡 Продолжаем запуск приложения...")
+    finally:
+        await close_db()
 
 if __name__ == "__main__":
     """
@@ -28,10 +32,10 @@ if __name__ == "__main__":
     Health: http://localhost:8000/health
     """
     
-    # Инициализируем БД перед запуском (fallback если миграции не выполнены)
-    asyncio.run(setup_database())
-    
-    app = create_app()
+    # Инициализируем БД перед запуском (fallback если миграции не выполнены).
+    # В production схему ведут миграции (release-шаг) - не тратим время старта
+    if settings.ENVIRONMENT != "production":
+        asyncio.run(setup_database())
     
     print("=" * 60)
     print("Beauty School API Server")
@@ -6,10 +6,10 @@
 import asyncio
 import logging
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 from dotenv import load_dotenv
 
 from backend.config import settings
+from backend.utils.fsm_storage import create_fsm_storage, create_events_isolation
 from backend.bot.bot import setup_bot_handlers
 from backend.database.database import init_db
 
@@ -40,8 +40,8 @@ async def main():
     # Создаём бота и диспетчер
     logger.info("Создание бота...")
     bot = Bot(token=settings.BOT_TOKEN)
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
+    storage = create_fsm_storage("bot")
+    dp = Dispatcher(storage=storage, events_isolation=create_events_isolation(storage))
     
     # Регистрируем обработчики
     logger.info("Регистрация обработчиков...")
@@ -6,10 +6,10 @@
 import asyncio
 import logging
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 from dotenv import load_dotenv
 
 from backend.config import settings
+from backend.utils.fsm_storage import create_fsm_storage, create_events_isolation
 from backend.bot.bot import setup_bot_handlers
 from backend.database.database import create_engine_and_session, init_db
 
@@ -45,6 +45,11 @@ async def main():
         logger.error("=" * 60)
         raise ValueError("BOT_TOKEN is required but not set")
     
+    # Polling удалил бы webhook, через который апдейты получает API
+    if settings.bot_webhook_enabled:
+        logger.error("❌ BOT_MODE=webhook: апдейты принимает API (%s), polling не запускаем", settings.WEBHOOK_PATH)
+        raise ValueError("BOT_MODE=webhook - use the API service instead of run_bot_production.py")
+    
     # Инициализация базы данных
     logger.info("Инициализация базы данных...")
     try:
@@ -59,8 +64,8 @@ async def main():
     # Создаём бота и диспетчер
     logger.info("Создание бота...")
     bot = Bot(token=settings.BOT_TOKEN)
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
+    storage = create_fsm_storage("bot")
+    dp = Dispatcher(storage=storage, events_isolation=create_events_isolation(storage))
     
     # Регистрируем обработчики
     logger.info("Регистрация обработчиков...")
@@ -0,0 +1,101 @@
+"""
+Бенчмарк кодирования ответов API: стандартный путь FastAPI против orjson/TypeAdapter
+
+Сравнивает на синтетических данных (БД не нужна):
+- лидерборд на 100 строк (LeaderboardEntry)
+- аналитику курсов на 1000 строк (CourseAnalyticsResponse)
+
+Варианты:
+- fastapi-default: jsonable_encoder + json.dumps (JSONResponse)
+- orjson-response: jsonable_encoder + orjson (ORJSONResponse по умолчанию)
+- type-adapter:    TypeAdapter(List[Model]).dump_json (json_response)
+- pre-encoded:     готовые байты из EncodedJSON (кешируемые эндпоинты)
+и стоимость сжатия gzip/brotli для готового тела.
+
+Использование:
+    python scripts/benchmark_encoding.py
+    python scripts/benchmark_encoding.py --repeat 500
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from backend.webapp.encoding import EncodedJSON, brotli, compress
+from backend.webapp.routes.analytics import CourseAnalyticsResponse
+from backend.webapp.routes.leaderboard import LeaderboardEntry
+
+
+def leaderboard_rows(count: int) -> list:
+    return [
+        LeaderboardEntry(
+            position=i + 1,
+            user_id=1000 + i,
+            full_name=f"Пользователь {i}",
+            points=10_000 - i * 7,
+            completed_courses=i % 12,
+            completed_lessons=i * 3 % 150,
+        )
+        for i in range(count)
+    ]
+
+
+def analytics_rows(count: int) -> list:
+    return [
+        CourseAnalyticsResponse(
+            course_id=i,
+            course_title=f"Курс маникюра №{i}",
+            enrollments=i * 13 % 900,
+            completions=i * 7 % 300,
+            completion_rate=round(i % 100 / 3, 2),
+            average_progress=round(i % 100 / 1.7, 2),
+            revenue=float(i * 1490 % 250_000),
+        )
+        for i in range(count)
+    ]
+
+
+def bench(name: str, rows: list, model, repeat: int) -> None:
+    adapter = TypeAdapter(List[model])
+    encoded = EncodedJSON.dump(rows, adapter)
+
+    variants = {
+        "fastapi-default": lambda: json.dumps(
+            jsonable_encoder(rows), ensure_ascii=False, separators=(",", ":")
+        ).encode(),
+        "orjson-response": lambda: orjson.dumps(jsonable_encoder(rows)),
+        "type-adapter": lambda: adapter.dump_json(rows),
+        "pre-encoded": lambda: encoded.body,
+    }
+
+    print(f"\n{name}: {len(rows)} строк, {len(encoded.body)} байт JSON")
+    baseline = None
+    for variant, func in variants.items():
+        seconds = min(timeit.repeat(func, number=repeat, repeat=3)) / repeat
+        baseline = baseline or seconds
+        print(f"  {variant:<16} {seconds * 1e6:>10.1f} мкс  x{baseline / seconds:>7.1f}")
+
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    for encoding in encodings:
+        body = compress(encoded.body, encoding)
+        seconds = min(timeit.repeat(lambda: compress(encoded.body, encoding), number=repeat, repeat=3)) / repeat
+        print(f"  {encoding:<16} {seconds * 1e6:>10.1f} мкс  {len(body)} байт ({len(body) / len(encoded.body):.0%})")
+    if brotli is None:
+        print("  br               пропущено: пакет brotli не установлен")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк кодирования ответов API")
+    parser.add_argument("--repeat", type=int, default=200, help="Повторов на замер")
+    args = parser.parse_args()
+
+    bench("Лидерборд", leaderboard_rows(100), LeaderboardEntry, args.repeat)
+    bench("Аналитика курсов", analytics_rows(1000), CourseAnalyticsResponse, max(args.repeat // 10, 1))
@@ -0,0 +1,148 @@
+"""
+Index advisor: прогоняет EXPLAIN (ANALYZE, BUFFERS) для всех SQL-запросов,
+которые выполняет каждый роут, и ищет Seq Scan по "горячим" таблицам.
+
+Работает против засеянной PostgreSQL БД в режиме разработки
+(ENVIRONMENT=development, DEV_MODE=true - авторизация через X-Telegram-User-ID).
+
+Использование:
+    python -m backend.database.seed_data
+    python scripts/explain_routes.py                      # Стандартный набор роутов
+    python scripts/explain_routes.py /api/leaderboard     # Конкретные роуты
+    python scripts/explain_routes.py --allow-seqscan      # Без запрета seq scan
+
+По умолчанию в транзакции EXPLAIN выставляется enable_seqscan=off:
+на маленьком seed-наборе планировщик и так выберет Seq Scan,
+а с запретом он останется только там, где подходящего индекса нет.
+Код возврата 1, если найден Seq Scan по таблице из HOT_TABLES.
+"""
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+from sqlalchemy import event, select
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database.database import create_engine_and_session, get_engine, async_session
+from backend.database.models import User, Course, Lesson
+from backend.webapp.app import create_app
+
+# Таблицы, по которым полный скан недопустим
+HOT_TABLES = {
+    "users", "lessons", "user_courses", "user_progress", "payments",
+    "reviews", "favorites", "certificates", "support_tickets", "support_messages",
+}
+
+DEFAULT_ROUTES = [
+    "/api/access/check",
+    "/api/courses",
+    "/api/courses/{course_id}",
+    "/api/courses/my/courses",
+    "/api/lessons/{lesson_id}",
+    "/api/leaderboard",
+    "/api/leaderboard/my-position",
+    "/api/favorites",
+    "/api/reviews/course/{course_id}",
+    "/api/reviews/course/{course_id}/rating",
+    "/api/progress/{course_id}",
+]
+
+
+def find_seq_scans(plan: dict) -> list:
+    """Рекурсивно собирает таблицы, по которым план делает Seq Scan"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child))
+    return found
+
+
+async def explain(statement: str, parameters, allow_seqscan: bool) -> dict:
+    """EXPLAIN ANALYZE в транзакции с откатом (безопасно и для INSERT/UPDATE)"""
+    async with get_engine().connect() as conn:
+        trans = await conn.begin()
+        try:
+            if not allow_seqscan:
+                await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            result = await conn.exec_driver_sql(
+                "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+            )
+            raw = result.scalar()
+        finally:
+            await trans.rollback()
+    data = json.loads(raw) if isinstance(raw, str) else raw
+    return data[0]
+
+
+async def resolve_placeholders() -> tuple[dict, int]:
+    """Берёт реальные id из засеянной БД для подстановки в пути"""
+    async with async_session() as session:
+        user = (await session.execute(
+            select(User).where(User.is_active == True).order_by(User.id).limit(1)
+        )).scalar_one_or_none()
+        lesson = (await session.execute(
+            select(Lesson).join(Course).where(Course.is_active == True).order_by(Lesson.id).limit(1)
+        )).scalar_one_or_none()
+    if not user or not lesson:
+        raise SystemExit("БД пустая - сначала засейте данные (python -m backend.database.seed_data)")
+    return {"course_id": lesson.course_id, "lesson_id": lesson.id}, user.telegram_id
+
+
+async def main(routes: list, allow_seqscan: bool) -> int:
+    create_engine_and_session()
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("EXPLAIN (ANALYZE, BUFFERS) поддерживается только для PostgreSQL")
+
+    placeholders, telegram_id = await resolve_placeholders()
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    headers = {"X-Telegram-User-ID": str(telegram_id)}
+    violations = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://advisor") as client:
+        for route in routes:
+            path = route.format(**placeholders)
+            captured.clear()
+            response = await client.get(path, headers=headers)
+            statements = list(captured)
+
+            print(f"\n=== GET {path} -> {response.status_code}, SQL-запросов: {len(statements)}")
+            for statement, parameters in statements:
+                if not statement.lstrip().upper().startswith("SELECT"):
+                    continue
+                plan = await explain(statement, parameters, allow_seqscan)
+                root = plan["Plan"]
+                hot = [t for t in find_seq_scans(root) if t in HOT_TABLES]
+                marker = "❌ SEQ SCAN " + ", ".join(hot) if hot else "✅"
+                print(
+                    f"  {marker} {plan.get('Execution Time', 0):.2f} ms, "
+                    f"shared hit={root.get('Shared Hit Blocks', 0)} read={root.get('Shared Read Blocks', 0)}"
+                )
+                print(f"     {' '.join(statement.split())[:160]}")
+                violations += len(hot)
+
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    await engine.dispose()
+
+    print(f"\nИтого Seq Scan по горячим таблицам: {violations}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    allow = "--allow-seqscan" in sys.argv
+    sys.exit(asyncio.run(main(args or DEFAULT_ROUTES, allow)))
@@ -0,0 +1,233 @@
+"""
+Нагрузочный тест API: воспроизводит сессии Mini App и считает p50/p95/p99 по эндпоинтам.
+
+Сессия виртуального пользователя:
+    проверка доступа -> каталог -> мои курсы -> курс -> урок -> завершение урока -> лидерборд
+
+Запросы подписываются настоящим initData (HMAC от BOT_TOKEN, как это делает Telegram),
+поэтому тест работает и с включённым TelegramAuthMiddleware (ENVIRONMENT=production).
+
+Использование:
+    python -m backend.database.seed_data --synthetic --users 10000 --courses 50 --seed 42
+    uvicorn backend.webapp.app:app --port 8000 --workers 1
+    python scripts/load_test.py --users 10000 --sessions 2000 --concurrency 50
+    python scripts/load_test.py ... --json baseline.json              # Сохранить результат
+    python scripts/load_test.py ... --compare baseline.json           # Сравнить с базовой линией
+
+--users должен совпадать с числом синтетических пользователей в seed_data:
+их telegram_id = SYNTHETIC_TELEGRAM_ID_BASE + номер.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from urllib.parse import urlencode
+
+import httpx
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import settings
+from backend.database.seed_data import SYNTHETIC_TELEGRAM_ID_BASE
+
+
+def sign_init_data(user: dict, bot_token: str) -> str:
+    """Собирает initData так же, как Telegram WebApp (см. validate_init_data_direct)"""
+    fields = {
+        "auth_date": str(int(time.time())),
+        "query_id": f"load-{random.getrandbits(48):x}",
+        "user": json.dumps(user, separators=(",", ":"), ensure_ascii=False),
+    }
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    secret_key = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(fields)
+
+
+class Recorder:
+    """Латентности по имени эндпоинта (шаблон пути, а не конкретный id)"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, headers: dict):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, headers=headers)
+        except httpx.HTTPError as e:
+            self.latencies[name].append(time.perf_counter() - start)
+            self.errors[name] += 1
+            self.statuses[name][type(e).__name__] += 1
+            return None
+        self.latencies[name].append(time.perf_counter() - start)
+        self.statuses[name][response.status_code] += 1
+        if response.status_code >= 500:
+            self.errors[name] += 1
+        return response
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Перцентиль по ближайшему рангу"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+async def run_session(client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, args):
+    n = rng.randrange(args.users)
+    user = {
+        "id": SYNTHETIC_TELEGRAM_ID_BASE + n,
+        "first_name": "Пользователь",
+        "last_name": str(n),
+        "username": f"bench_user_{n}",
+        "language_code": "ru",
+    }
+    headers = {"X-Telegram-Init-Data": sign_init_data(user, args.bot_token)}
+
+    async def think():
+        if args.think_time:
+            await asyncio.sleep(rng.uniform(0, args.think_time))
+
+    await recorder.request(client, "GET /api/access/check", "GET", "/api/access/check", headers)
+    await think()
+
+    catalog = await recorder.request(client, "GET /api/courses", "GET", "/api/courses", headers)
+    await think()
+
+    my_courses = await recorder.request(client, "GET /api/courses/my/courses", "GET", "/api/courses/my/courses", headers)
+    await think()
+
+    # Сначала свои курсы (там есть доступ к урокам), иначе - любой из каталога
+    candidates = []
+    if my_courses is not None and my_courses.status_code == 200:
+        candidates = [c["id"] for c in my_courses.json()]
+    if not candidates and catalog is not None and catalog.status_code == 200:
+        candidates = [c["id"] for c in catalog.json()]
+    if not candidates:
+        return
+    course_id = rng.choice(candidates)
+
+    course = await recorder.request(client, "GET /api/courses/{course_id}", "GET", f"/api/courses/{course_id}", headers)
+    await think()
+    if course is None or course.status_code != 200 or not course.json()["lessons"]:
+        return
+    lesson_id = rng.choice(course.json()["lessons"])["id"]
+
+    lesson = await recorder.request(client, "GET /api/lessons/{lesson_id}", "GET", f"/api/lessons/{lesson_id}", headers)
+    await think()
+    if lesson is not None and lesson.status_code == 200:
+        await recorder.request(
+            client, "POST /api/lessons/{lesson_id}/complete", "POST", f"/api/lessons/{lesson_id}/complete", headers
+        )
+        await think()
+
+    await recorder.request(client, "GET /api/leaderboard", "GET", "/api/leaderboard", headers)
+
+
+async def run(args) -> dict:
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    remaining = args.sessions
+    deadline = time.monotonic() + args.duration if args.duration else None
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        async def worker(worker_rng: random.Random):
+            nonlocal remaining
+            while True:
+                if deadline is not None:
+                    if time.monotonic() >= deadline:
+                        return
+                else:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                await run_session(client, recorder, worker_rng, args)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            worker(random.Random(rng.getrandbits(64))) for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    report = {"elapsed_seconds": round(elapsed, 3), "concurrency": args.concurrency, "endpoints": {}}
+    for name, values in recorder.latencies.items():
+        values.sort()
+        report["endpoints"][name] = {
+            "count": len(values),
+            "errors": recorder.errors[name],
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+            "statuses": {str(k): v for k, v in recorder.statuses[name].items()},
+        }
+    return report
+
+
+def print_report(report: dict, baseline: dict = None):
+    print(f"\nВремя: {report['elapsed_seconds']} с, параллельных сессий: {report['concurrency']}")
+    header = f"{'Эндпоинт':<42} {'N':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in sorted(report["endpoints"].items()):
+        line = (
+            f"{name:<42} {stats['count']:>7} {stats['errors']:>5} {stats['rps']:>8} "
+            f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['max_ms']:>9}"
+        )
+        print(line)
+        base = (baseline or {}).get("endpoints", {}).get(name)
+        if base:
+            diffs = []
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                if base[key]:
+                    diffs.append(f"{key[:3]} {(stats[key] - base[key]) / base[key] * 100:+.0f}%")
+            print(f"{'  vs baseline':<42} {', '.join(diffs)}")
+        statuses = ", ".join(f"{k}: {v}" for k, v in sorted(stats["statuses"].items()))
+        print(f"{'  статусы':<42} {statuses}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест сессий Mini App")
+    parser.add_argument("--base-url", default=f"http://127.0.0.1:{settings.API_PORT}")
+    parser.add_argument("--users", type=int, default=1000, help="Число синтетических пользователей (как в seed_data)")
+    parser.add_argument("--sessions", type=int, default=500, help="Сколько сессий прогнать")
+    parser.add_argument("--duration", type=float, default=0, help="Длительность в секундах (вместо --sessions)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Параллельных виртуальных пользователей")
+    parser.add_argument("--think-time", type=float, default=0, help="Пауза между шагами сессии, до N секунд")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--bot-token", default=settings.BOT_TOKEN, help="Токен для подписи initData")
+    parser.add_argument("--json", help="Сохранить отчёт в JSON")
+    parser.add_argument("--compare", help="JSON-отчёт базовой линии для сравнения")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not args.bot_token:
+        raise SystemExit("BOT_TOKEN не задан - initData нечем подписать (--bot-token)")
+
+    report = asyncio.run(run(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Отчёт сохранён: {args.json}")
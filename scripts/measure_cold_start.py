@@ -0,0 +1,64 @@
+"""
+Замер холодного старта API: от запуска процесса uvicorn до первого 200 на /health.
+
+Для автоскейлинга Railway новый инстанс должен начинать отвечать быстро -
+целевое время задаётся --target (по умолчанию 3 секунды), при превышении код возврата 1.
+
+Использование:
+    python scripts/measure_cold_start.py
+    python scripts/measure_cold_start.py --runs 5 --target 2.5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_once(port: int, timeout: float) -> float:
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.webapp.app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise SystemExit(f"❌ uvicorn завершился с кодом {process.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.05)
+        raise SystemExit(f"❌ API не ответил за {timeout} с")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Замер холодного старта API")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--target", type=float, default=3.0, help="Целевое время старта, секунд")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    results = []
+    for run in range(1, args.runs + 1):
+        seconds = measure_once(args.port, args.timeout)
+        results.append(seconds)
+        print(f"Запуск {run}: {seconds:.2f} с")
+
+    median = statistics.median(results)
+    status = "✅" if median <= args.target else "❌"
+    print(f"{status} Медиана: {median:.2f} с (цель: {args.target:.2f} с)")
+    sys.exit(0 if median <= args.target else 1)
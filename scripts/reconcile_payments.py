@@ -0,0 +1,239 @@
+"""
+Сверка зависших pending-платежей с ЮKassa вручную и проверка на фейковом провайдере
+
+Использование:
+    python scripts/reconcile_payments.py                 # Один проход по БД из .env и настоящей ЮKassa
+    python scripts/reconcile_payments.py --fake 5000     # 5000 платежей во временной SQLite и фейковый провайдер
+    python scripts/reconcile_payments.py --fake 5000 --concurrency 16 --rate 200 --latency 0.05
+
+С --fake настоящие БД и ЮKassa не используются. Фейковый провайдер отвечает
+с задержкой, считает одновременные запросы и запросы в секунду и случайно
+возвращает ошибки. После прохода проверяется, что:
+- статусы в БД совпадают с финальными статусами провайдера
+- неизвестные провайдеру (404) платежи отменены только после второго прохода
+- платежи старше PAYMENT_RECONCILE_MAX_AGE не запрашивались и остались pending
+- у каждого оплаченного платежа есть запись user_courses, лишних нет
+- лимиты одновременности и частоты запросов не превышены
+Код возврата 1, если проверка не прошла.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeProvider:
+    """Провайдер в памяти: статусы по id, задержка, счётчики нагрузки"""
+
+    def __init__(self, statuses: dict, latency: float, error_rate: float, seed: int = 1):
+        self.statuses = statuses
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self._recent = deque()
+        self.max_per_second = 0
+
+    async def get_payment(self, payment_id: str):
+        from backend.services.payment_reconciliation import ProviderError, ProviderPayment
+
+        now = time.monotonic()
+        self._recent.append(now)
+        while self._recent and self._recent[0] <= now - 1.0:
+            self._recent.popleft()
+        self.max_per_second = max(self.max_per_second, len(self._recent))
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency * self.random.uniform(0.5, 1.5))
+            if self.random.random() < self.error_rate:
+                self.errors += 1
+                raise ProviderError(f"{payment_id}: HTTP 500")
+            status = self.statuses[payment_id]
+            if status == "missing":
+                raise ProviderError(f"{payment_id}: HTTP 404", permanent=True)
+            return ProviderPayment(
+                id=payment_id,
+                status=status,
+                payment_method="bank_card" if status == "succeeded" else None,
+            )
+        finally:
+            self.in_flight -= 1
+
+
+async def _seed(count: int, seed: int) -> dict:
+    from backend.database import async_session, Base, Course, Payment, User
+    from backend.database.database import get_engine
+
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(seed)
+    statuses = {}
+    old = datetime.now() - timedelta(hours=2)
+    async with async_session() as session:
+        session.add_all([Course(id=i, title=f"Курс {i}", description="-", category="test", price=990) for i in range(1, 21)])
+        session.add_all([
+            User(id=i, telegram_id=1_000_000 + i, full_name=f"Пользователь {i}", phone="-")
+            for i in range(1, count // 3 + 2)
+        ])
+        await session.flush()
+        for i in range(count):
+            yookassa_id = f"fake-{i:08d}"
+            statuses[yookassa_id] = rng.choices(
+                ["succeeded", "canceled", "pending", "waiting_for_capture", "missing"], [60, 29, 8, 2, 1]
+            )[0]
+            session.add(Payment(
+                user_id=rng.randint(1, count // 3 + 1),
+                course_id=rng.randint(1, 20),
+                amount=Decimal("990.00"),
+                yookassa_payment_id=yookassa_id,
+                status="pending",
+                created_at=old + timedelta(seconds=i % 600),
+            ))
+        # Свежий платёж сверка трогать не должна
+        session.add(Payment(user_id=1, course_id=1, amount=Decimal("990.00"),
+                            yookassa_payment_id="fake-fresh", status="pending", created_at=datetime.now()))
+        statuses["fake-fresh"] = "succeeded"
+        # Старше окна сверки - не запрашиваются и не меняются
+        expired = datetime.now() - timedelta(days=30)
+        for i in range(10):
+            session.add(Payment(user_id=1, course_id=1, amount=Decimal("990.00"),
+                                yookassa_payment_id=f"fake-expired-{i}", status="pending", created_at=expired))
+            statuses[f"fake-expired-{i}"] = "succeeded"
+        await session.commit()
+    return statuses
+
+
+def _expected(payment_id: int, yookassa_id: str, remote: str, passes: list[set]) -> str:
+    """Статус после проходов сверки; passes - id платежей с ошибкой провайдера в каждом проходе"""
+    if yookassa_id.startswith("fake-expired") or yookassa_id == "fake-fresh":
+        return "pending"
+    if remote == "missing":
+        # Отмена - после ответа 404 в двух проходах подряд
+        confirmed = len(passes) >= 2 and not any(payment_id in failed for failed in passes[-2:])
+        return "canceled" if confirmed else "pending"
+    if remote not in ("succeeded", "canceled") or all(payment_id in failed for failed in passes):
+        return "pending"
+    return remote
+
+
+async def _verify(statuses: dict, passes: list[set]) -> list[str]:
+    from sqlalchemy import func, select
+    from backend.database import async_session, Payment, UserCourse
+
+    problems = []
+    async with async_session() as session:
+        rows = (await session.execute(select(Payment.id, Payment.yookassa_payment_id, Payment.status))).all()
+        purchases = {
+            tuple(row) for row in await session.execute(
+                select(Payment.user_id, Payment.course_id).where(Payment.status == "succeeded")
+            )
+        }
+        enrolled = (await session.execute(select(func.count(UserCourse.id)))).scalar()
+    for payment_id, yookassa_id, status in rows:
+        expected = _expected(payment_id, yookassa_id, statuses[yookassa_id], passes)
+        if status != expected:
+            problems.append(f"платёж {payment_id} ({yookassa_id}): {status}, ожидался {expected}")
+    if enrolled != len(purchases):
+        problems.append(f"user_courses: {enrolled} записей, оплаченных пар (пользователь, курс): {len(purchases)}")
+    return problems
+
+
+async def run_fake(args) -> int:
+    from backend.database.database import create_engine_and_session
+    from backend.services.payment_reconciliation import PaymentReconciler
+
+    create_engine_and_session()
+    print(f"🌱 Создаём {args.fake} pending-платежей...")
+    statuses = await _seed(args.fake, args.seed)
+    provider = FakeProvider(statuses, latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+    reconciler = PaymentReconciler(
+        provider,
+        page_size=args.page_size,
+        concurrency=args.concurrency,
+        rate_limit=args.rate,
+        stale_after=600,
+    )
+    stats = await reconciler.run_once()
+
+    print(f"\n📊 Проход: {stats.seconds:.1f} с, страниц {stats.pages}, проверено {stats.checked}")
+    print(f"   оплачено {stats.succeeded}, отменено {stats.canceled}, выдано курсов {stats.enrolled}")
+    print(f"   без изменений {stats.unchanged}, ошибок провайдера {stats.errors}")
+    print(f"   запросов {provider.requests}, одновременно до {provider.max_in_flight}, "
+          f"в секунду до {provider.max_per_second}")
+
+    passes = [set(stats.failed_ids)]
+    problems = await _verify(statuses, passes)
+    if provider.requests > args.fake:
+        problems.append(f"запросов {provider.requests} > {args.fake}: запрашивались платежи старше окна сверки")
+    if provider.max_in_flight > args.concurrency:
+        problems.append(f"одновременных запросов {provider.max_in_flight} > {args.concurrency}")
+    # +1: окно в секунду может захватить границы двух интервалов
+    if provider.max_per_second > args.rate + 1:
+        problems.append(f"запросов в секунду {provider.max_per_second} > {args.rate}")
+    if not problems:
+        second = await reconciler.run_once()
+        print(f"\n🔁 Повторный проход: проверено {second.checked} (оставшиеся pending), "
+              f"оплачено {second.succeeded}, отменено {second.canceled}, неизвестны провайдеру {second.not_found}")
+        passes.append(set(second.failed_ids))
+        problems = await _verify(statuses, passes)
+    if problems:
+        print(f"\n❌ Проверка не прошла ({len(problems)}):")
+        for problem in problems[:20]:
+            print(f"   - {problem}")
+        return 1
+    print("\n✅ Статусы, выдача курсов и лимиты в порядке")
+    return 0
+
+
+async def run_real() -> int:
+    from backend.database.database import create_engine_and_session
+    from backend.services.payment_reconciliation import (
+        PaymentReconciler, close_yookassa_provider, get_yookassa_provider,
+    )
+
+    provider = get_yookassa_provider()
+    if provider is None:
+        print("❌ ЮKassa не настроена (YUKASSA_SHOP_ID / YUKASSA_SECRET_KEY)")
+        return 1
+    create_engine_and_session()
+    try:
+        stats = await PaymentReconciler(provider).run_once()
+    finally:
+        await close_yookassa_provider()
+    print(f"✅ Проверено {stats.checked}: оплачено {stats.succeeded}, отменено {stats.canceled}, "
+          f"ошибок {stats.errors}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сверка pending-платежей с ЮKassa")
+    parser.add_argument("--fake", type=int, metavar="N", help="N платежей во временной SQLite и фейковый провайдер")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=500.0, help="Запросов в секунду")
+    parser.add_argument("--latency", type=float, default=0.02, help="Средняя задержка провайдера (сек)")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Доля ошибок провайдера")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.fake:
+        database = os.path.join(tempfile.mkdtemp(prefix="reconcile_"), "payments.db")
+        # Настройки читаются при импорте backend.config - до любых импортов backend
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{database}"
+        os.environ["ENVIRONMENT"] = "test"
+        sys.exit(asyncio.run(run_fake(args)))
+    sys.exit(asyncio.run(run_real()))
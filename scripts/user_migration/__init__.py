@@ -0,0 +1,28 @@
+"""
+Перенос пользователей и их данных между БД (например, локальная -> Railway)
+
+Данные пользователя: users, user_courses, user_progress, user_achievements,
+favorites, payments. Вместо users.id в файлах telegram_id - в целевой БД
+id пользователей другие. Курсы, уроки и ачивки переносятся по id: каталог
+в обеих БД должен совпадать (строки с неизвестными id пропускаются).
+
+Экспорт - потоком (server-side cursor, yield_per) в файлы каталога:
+    <dir>/users.ndjson, <dir>/user_courses.ndjson, ... (или .csv)
+Память не зависит от числа пользователей.
+
+Импорт - по таблице в транзакции:
+- файл загружается в временную staging-таблицу через COPY (PostgreSQL);
+  в другие БД (SQLite для разработки) - пачками INSERT
+- одним INSERT ... SELECT ... ON CONFLICT сливается в основную таблицу:
+  users - ON CONFLICT (telegram_id) DO UPDATE, у остальных таблиц
+  пользователь находится по telegram_id, прогресс не откатывается
+  (пройденное остаётся пройденным, watch_time - максимум)
+Повторный импорт того же каталога ничего не дублирует.
+
+Модули:
+- merge - таблицы, staging-таблицы и операторы слияния
+- files - форматы файлов (NDJSON, CSV) и строка прогресса
+- export - выгрузка в файлы
+- loaders - загрузка в staging (COPY или INSERT) и слияние
+- cli - командная строка (запуск: scripts/export_users.py)
+"""
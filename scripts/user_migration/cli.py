@@ -0,0 +1,95 @@
+"""
+Командная строка переноса пользователей
+
+    python3 scripts/export_users.py export --out dump/ [--format csv] [--database-url URL]
+    python3 scripts/export_users.py import dump/ --database-url 'postgresql://...'
+    python3 scripts/export_users.py migrate 'postgresql://...'   # экспорт + импорт через временный каталог
+    python3 scripts/export_users.py 'postgresql://...'           # то же, что migrate
+
+Без --database-url экспорт читает БД из .env, импорт пишет в RAILWAY_DATABASE_URL.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from backend.config import settings
+
+from .export import export_data
+from .files import FORMATS
+from .loaders import import_data
+
+
+def _async_url(url: str) -> str:
+    for prefix in ("postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+asyncpg://", 1)
+    return url
+
+
+def _target_url(url: Optional[str]) -> str:
+    url = url or os.getenv("RAILWAY_DATABASE_URL")
+    if not url:
+        print("\n❌ Ошибка: не указана целевая БД (--database-url или RAILWAY_DATABASE_URL)")
+        print("\n💡 Как получить DATABASE_URL из Railway:")
+        print("   1. Зайдите на railway.app")
+        print("   2. Ваш проект → PostgreSQL сервис → Variables")
+        print("   3. Скопируйте DATABASE_URL")
+        sys.exit(1)
+    return url
+
+
+def _print_summary(title: str, counts: dict) -> None:
+    print(f"\n📊 {title}:")
+    for name, count in counts.items():
+        if isinstance(count, tuple):
+            print(f"   {name:<18} строк в файле: {count[0]}, вставлено/обновлено: {count[1]}")
+        else:
+            print(f"   {name:<18} {count}")
+
+
+async def main(argv: list[str]) -> None:
+    # Старый вызов: export_users.py 'postgresql://...' - перенос в указанную БД
+    if len(argv) == 1 and "://" in argv[0]:
+        argv = ["migrate", argv[0]]
+
+    parser = argparse.ArgumentParser(description="Перенос пользователей и их данных между БД")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Выгрузить данные в файлы")
+    export_parser.add_argument("--out", type=Path, default=Path("users_export"), help="Каталог для файлов")
+    export_parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    export_parser.add_argument("--database-url", help="Исходная БД (по умолчанию из .env)")
+
+    import_parser = commands.add_parser("import", help="Загрузить файлы в БД")
+    import_parser.add_argument("directory", type=Path, help="Каталог с файлами экспорта")
+    import_parser.add_argument("--database-url", help="Целевая БД (по умолчанию RAILWAY_DATABASE_URL)")
+
+    migrate_parser = commands.add_parser("migrate", help="Экспорт из БД .env и импорт в целевую БД")
+    migrate_parser.add_argument("target", nargs="?", help="Целевая БД (по умолчанию RAILWAY_DATABASE_URL)")
+    migrate_parser.add_argument("--format", choices=FORMATS, default="ndjson")
+
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("🚀 Перенос пользователей")
+    print("=" * 60)
+
+    if args.command == "export":
+        counts = await export_data(_async_url(args.database_url or settings.database_url), args.out, args.format)
+        _print_summary(f"Выгружено в {args.out}", counts)
+    elif args.command == "import":
+        counts = await import_data(_async_url(_target_url(args.database_url)), args.directory)
+        _print_summary("Импорт", counts)
+    else:
+        target = _target_url(args.target)
+        with tempfile.TemporaryDirectory(prefix="users_export_") as directory:
+            print("\n🔍 Экспорт из локальной БД...")
+            await export_data(_async_url(settings.database_url), Path(directory), args.format)
+            print(f"\n🔍 Импорт в {target[:50]}...")
+            counts = await import_data(_async_url(target), Path(directory))
+        _print_summary("Итоги", counts)
+    print("\n✅ Готово")
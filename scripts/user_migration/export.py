@@ -0,0 +1,50 @@
+"""
+Экспорт: таблицы переноса потоком в файлы каталога
+"""
+
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.database.models import User
+
+from .files import BATCH_SIZE, Progress, csv_line, ndjson_line
+from .merge import SPECS, TableSpec
+
+
+def _export_query(spec: TableSpec):
+    source = spec.source
+    if source is User.__table__:
+        return select(*(source.c[name] for name in spec.columns)).order_by(source.c.id)
+    columns = [User.telegram_id if name == "telegram_id" else source.c[name] for name in spec.columns]
+    return select(*columns).join_from(source, User, source.c.user_id == User.id).order_by(source.c.id)
+
+
+async def export_data(database_url: str, directory: Path, fmt: str) -> dict[str, int]:
+    """Все таблицы SPECS в файлы directory/<таблица>.<fmt>; возвращает число строк по таблицам"""
+    directory.mkdir(parents=True, exist_ok=True)
+    engine = create_async_engine(database_url, echo=False)
+    counts = {}
+    try:
+        async with engine.connect() as conn:
+            for spec in SPECS:
+                total = (await conn.execute(select(func.count()).select_from(spec.source))).scalar()
+                progress = Progress(spec.name, total)
+                path = directory / f"{spec.name}.{fmt}"
+                with open(path, "wb") as file:
+                    if fmt == "csv":
+                        file.write(csv_line(spec.columns))
+                    # Server-side cursor: в памяти только текущая пачка строк
+                    result = await conn.stream(_export_query(spec).execution_options(yield_per=BATCH_SIZE))
+                    async for partition in result.partitions():
+                        if fmt == "csv":
+                            file.write(b"".join(csv_line(row) for row in partition))
+                        else:
+                            file.write(b"".join(ndjson_line(spec.columns, row) for row in partition))
+                        progress.update(len(partition))
+                progress.finish(f"-> {path}")
+                counts[spec.name] = progress.done
+    finally:
+        await engine.dispose()
+    return counts
@@ -0,0 +1,99 @@
+"""
+Файлы переноса: NDJSON и CSV (как COPY ... CSV), строка прогресса
+"""
+
+import csv
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+import orjson
+
+from .merge import TableSpec
+
+# Строк за одну выборку курсора экспорта / за один INSERT в staging без COPY
+BATCH_SIZE = 5000
+FORMATS = ("ndjson", "csv")
+
+
+class Progress:
+    """Строка прогресса в stderr (не чаще двух раз в секунду)"""
+
+    def __init__(self, label: str, total: int, unit: str = "строк"):
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        self.started = time.monotonic()
+        self._printed = 0.0
+
+    def update(self, count: int) -> None:
+        self.done += count
+        now = time.monotonic()
+        if now - self._printed >= 0.5:
+            self._printed = now
+            self._print("\r")
+
+    def finish(self, note: str = "") -> None:
+        self._print("\r", note)
+        sys.stderr.write("\n")
+
+    def _print(self, prefix: str, note: str = "") -> None:
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        percent = f" ({self.done / self.total:.0%})" if self.total else ""
+        sys.stderr.write(
+            f"{prefix}   {self.label:<18} {_number(self.done):>12} {self.unit}{percent}"
+            f"  {_number(self.done / elapsed)}/с {note}"
+        )
+        sys.stderr.flush()
+
+
+def _number(value: float) -> str:
+    return f"{value:,.0f}".replace(",", " ")
+
+
+def _csv_value(value) -> str:
+    # Как COPY ... CSV: NULL - пустое поле без кавычек, пустая строка - ""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        text = "true" if value else "false"
+    elif isinstance(value, (datetime, date)):
+        text = value.isoformat()
+    else:
+        text = str(value)
+    if text == "" or any(char in text for char in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def csv_line(values) -> bytes:
+    return (",".join(_csv_value(value) for value in values) + "\n").encode()
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def ndjson_line(columns: tuple[str, ...], values) -> bytes:
+    return orjson.dumps(dict(zip(columns, values)), default=_json_default) + b"\n"
+
+
+def data_file(directory: Path, name: str) -> tuple[Path, str]:
+    for fmt in FORMATS:
+        path = directory / f"{name}.{fmt}"
+        if path.exists():
+            return path, fmt
+    raise FileNotFoundError(f"{name}.ndjson / {name}.csv не найден в {directory}")
+
+
+def csv_header(path: Path, spec: TableSpec) -> list[str]:
+    with open(path, newline="", encoding="utf-8") as file:
+        header = next(csv.reader(file), [])
+    if sorted(header) != sorted(spec.columns):
+        raise ValueError(f"{path.name}: колонки {header}, ожидались {list(spec.columns)}")
+    return header
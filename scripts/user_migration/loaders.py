@@ -0,0 +1,134 @@
+"""
+Импорт: файл -> временная staging-таблица -> слияние в основную таблицу
+
+PostgreSQL - COPY через asyncpg (NDJSON перекодируется в CSV на лету),
+другие БД (SQLite для разработки) - пачками INSERT с приведением типов.
+"""
+
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import AsyncIterator
+
+import orjson
+from sqlalchemy import Boolean, Column, DateTime, Integer, Numeric, func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from backend.database.upsert import dialect_insert
+
+from .files import BATCH_SIZE, Progress, csv_header, csv_line, data_file
+from .merge import SPECS, TableSpec
+
+# Байт в одном куске данных COPY
+COPY_CHUNK = 1024 * 1024
+
+
+async def _copy_chunks(path: Path, fmt: str, spec: TableSpec, progress: Progress) -> AsyncIterator[bytes]:
+    """Данные для COPY ... FORMAT csv: CSV-файл как есть, NDJSON - построчно в CSV"""
+    with open(path, "rb") as file:
+        if fmt == "csv":
+            while chunk := file.read(COPY_CHUNK):
+                progress.update(len(chunk))
+                yield chunk
+            return
+        buffer = []
+        size = 0
+        for line in file:
+            progress.update(len(line))
+            if not line.strip():
+                continue
+            row = orjson.loads(line)
+            buffer.append(csv_line(row.get(name) for name in spec.columns))
+            size += len(buffer[-1])
+            if size >= COPY_CHUNK:
+                yield b"".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield b"".join(buffer)
+
+
+async def _copy_into_stage(conn: AsyncConnection, path: Path, fmt: str, spec: TableSpec, progress: Progress) -> None:
+    columns = csv_header(path, spec) if fmt == "csv" else list(spec.columns)
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_to_table(
+        spec.stage.name,
+        source=_copy_chunks(path, fmt, spec, progress),
+        columns=columns,
+        format="csv",
+        header=fmt == "csv",
+    )
+
+
+def _parse(column: Column, value, fmt: str):
+    # Без COPY значения приводятся к типам колонок здесь.
+    # csv.reader не отличает NULL от "" - в CSV пустое поле считается NULL
+    if value is None or (value == "" and fmt == "csv"):
+        return None
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return value if isinstance(value, bool) else value.lower() in ("true", "t", "1")
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Numeric):
+        return Decimal(str(value))
+    if isinstance(column_type, Integer):
+        return int(value)
+    return value
+
+
+async def _insert_into_stage(conn: AsyncConnection, path: Path, fmt: str, spec: TableSpec, progress: Progress) -> None:
+    stage = spec.stage
+
+    def rows():
+        with open(path, "rb") as file:
+            if fmt == "csv":
+                text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+                for row in csv.DictReader(text):
+                    # Позиция в файле - с точностью до буфера чтения
+                    progress.update(file.tell() - progress.done)
+                    yield row
+                return
+            for line in file:
+                progress.update(len(line))
+                if line.strip():
+                    yield orjson.loads(line)
+
+    batch = []
+    for row in rows():
+        batch.append({column.name: _parse(column, row.get(column.name), fmt) for column in stage.c})
+        if len(batch) >= BATCH_SIZE:
+            await conn.execute(stage.insert(), batch)
+            batch = []
+    if batch:
+        await conn.execute(stage.insert(), batch)
+
+
+async def import_data(database_url: str, directory: Path) -> dict[str, tuple[int, int]]:
+    """Файлы из directory в БД; возвращает (строк в файле, вставлено/обновлено) по таблицам"""
+    engine = create_async_engine(database_url, echo=False)
+    dialect = engine.dialect.name
+    insert = dialect_insert(dialect)
+    counts = {}
+    try:
+        for spec in SPECS:
+            path, fmt = data_file(directory, spec.name)
+            progress = Progress(spec.name, path.stat().st_size, unit="байт")
+            async with engine.begin() as conn:
+                await conn.run_sync(spec.stage.create, checkfirst=False)
+                if dialect == "postgresql":
+                    await _copy_into_stage(conn, path, fmt, spec, progress)
+                else:
+                    await _insert_into_stage(conn, path, fmt, spec, progress)
+                staged = (await conn.execute(select(func.count()).select_from(spec.stage))).scalar()
+                merged = 0
+                for statement in spec.merge(insert, spec.stage):
+                    merged += (await conn.execute(statement)).rowcount
+                if dialect != "postgresql":
+                    await conn.run_sync(spec.stage.drop)
+            progress.finish(f"строк: {staged}, вставлено/обновлено: {merged}")
+            counts[spec.name] = (staged, merged)
+    finally:
+        await engine.dispose()
+    return counts
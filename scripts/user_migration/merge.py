@@ -0,0 +1,163 @@
+"""
+Таблицы переноса: колонки файлов, staging-таблицы и слияние в основные таблицы
+
+Слияние - INSERT ... SELECT из staging с ON CONFLICT: users по telegram_id,
+остальные таблицы находят пользователя по telegram_id и пропускают строки
+с неизвестными курсами, уроками и ачивками.
+"""
+
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import Column, MetaData, Table, and_, case, exists, func, select
+
+from backend.database.models import (
+    Achievement, Course, Favorite, Lesson, Payment, User, UserAchievement, UserCourse, UserProgress,
+)
+
+_stage_metadata = MetaData()
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    name: str
+    source: Table
+    stage: Table
+    # Колонки файла: telegram_id вместо user_id (у users - свои колонки)
+    columns: tuple[str, ...]
+    # (insert, staging-таблица) -> операторы слияния в основную таблицу
+    merge: Callable
+
+
+def _stage_table(spec_name: str, table: Table, columns: tuple[str, ...]) -> Table:
+    """Временная таблица с типами колонок файла; в PostgreSQL удаляется при коммите"""
+    stage_columns = [
+        Column(name, User.__table__.c.telegram_id.type if name == "telegram_id" else table.c[name].type)
+        for name in columns
+    ]
+    return Table(
+        f"stage_{spec_name}", _stage_metadata, *stage_columns,
+        prefixes=["TEMPORARY"], postgresql_on_commit="DROP",
+    )
+
+
+USER_COLUMNS = (
+    "telegram_id", "username", "full_name", "phone", "city",
+    "consent_personal_data", "is_active", "points", "created_at",
+)
+
+
+def _merge_users(insert, stage: Table) -> list:
+    statement = insert(User).from_select(
+        USER_COLUMNS,
+        select(*(stage.c[name] for name in USER_COLUMNS)).where(stage.c.telegram_id.isnot(None)),
+    )
+    updated = {name: statement.excluded[name] for name in USER_COLUMNS if name not in ("telegram_id", "created_at")}
+    return [statement.on_conflict_do_update(
+        index_elements=[User.telegram_id],
+        set_={**updated, "updated_at": func.now()},
+    )]
+
+
+def _merge_user_courses(insert, stage: Table) -> list:
+    statement = insert(UserCourse).from_select(
+        ["user_id", "course_id", "purchased_at", "completed_at", "is_completed"],
+        select(User.id, stage.c.course_id, stage.c.purchased_at, stage.c.completed_at, stage.c.is_completed)
+        .where(User.telegram_id == stage.c.telegram_id, stage.c.course_id.in_(select(Course.id))),
+    )
+    return [statement.on_conflict_do_update(
+        index_elements=[UserCourse.user_id, UserCourse.course_id],
+        set_={
+            "is_completed": UserCourse.is_completed | statement.excluded.is_completed,
+            "completed_at": func.coalesce(UserCourse.completed_at, statement.excluded.completed_at),
+        },
+    )]
+
+
+def _merge_user_progress(insert, stage: Table) -> list:
+    statement = insert(UserProgress).from_select(
+        ["user_id", "lesson_id", "completed", "completed_at", "watch_time"],
+        select(User.id, stage.c.lesson_id, stage.c.completed, stage.c.completed_at, stage.c.watch_time)
+        .where(User.telegram_id == stage.c.telegram_id, stage.c.lesson_id.in_(select(Lesson.id))),
+    )
+    excluded = statement.excluded
+    return [statement.on_conflict_do_update(
+        index_elements=[UserProgress.user_id, UserProgress.lesson_id],
+        set_={
+            "completed": UserProgress.completed | excluded.completed,
+            "completed_at": func.coalesce(UserProgress.completed_at, excluded.completed_at),
+            "watch_time": case(
+                (excluded.watch_time > UserProgress.watch_time, excluded.watch_time),
+                else_=UserProgress.watch_time,
+            ),
+        },
+    )]
+
+
+def _merge_user_achievements(insert, stage: Table) -> list:
+    return [insert(UserAchievement).from_select(
+        ["user_id", "achievement_id", "earned_at"],
+        select(User.id, stage.c.achievement_id, stage.c.earned_at)
+        .where(User.telegram_id == stage.c.telegram_id, stage.c.achievement_id.in_(select(Achievement.id))),
+    ).on_conflict_do_nothing(index_elements=[UserAchievement.user_id, UserAchievement.achievement_id])]
+
+
+def _merge_favorites(insert, stage: Table) -> list:
+    return [insert(Favorite).from_select(
+        ["user_id", "course_id", "created_at"],
+        select(User.id, stage.c.course_id, stage.c.created_at)
+        .where(User.telegram_id == stage.c.telegram_id, stage.c.course_id.in_(select(Course.id))),
+    ).on_conflict_do_nothing(index_elements=[Favorite.user_id, Favorite.course_id])]
+
+
+def _merge_payments(insert, stage: Table) -> list:
+    columns = ["user_id", "course_id", "amount", "yookassa_payment_id", "status", "payment_method", "created_at", "paid_at"]
+
+    def source(*conditions):
+        return select(
+            User.id, stage.c.course_id, stage.c.amount, stage.c.yookassa_payment_id,
+            stage.c.status, stage.c.payment_method, stage.c.created_at, stage.c.paid_at,
+        ).where(User.telegram_id == stage.c.telegram_id, stage.c.course_id.in_(select(Course.id)), *conditions)
+
+    # Платежи ЮKassa - по yookassa_payment_id; succeeded не откатывается
+    statement = insert(Payment).from_select(columns, source(stage.c.yookassa_payment_id.isnot(None)))
+    with_provider_id = statement.on_conflict_do_update(
+        index_elements=[Payment.yookassa_payment_id],
+        set_={
+            "status": case((Payment.status == "succeeded", Payment.status), else_=statement.excluded.status),
+            "payment_method": func.coalesce(statement.excluded.payment_method, Payment.payment_method),
+            "paid_at": func.coalesce(Payment.paid_at, statement.excluded.paid_at),
+        },
+    )
+    # Без id ЮKassa ключа нет - такой же платёж (пользователь, курс, время) не вставляем
+    same_payment = exists().where(and_(
+        Payment.user_id == User.id,
+        Payment.course_id == stage.c.course_id,
+        Payment.created_at == stage.c.created_at,
+        Payment.yookassa_payment_id.is_(None),
+    ))
+    without_provider_id = insert(Payment).from_select(
+        columns, source(stage.c.yookassa_payment_id.is_(None), ~same_payment)
+    )
+    return [with_provider_id, without_provider_id]
+
+
+def _spec(name: str, model, columns: tuple[str, ...], merge: Callable) -> TableSpec:
+    table = model.__table__
+    return TableSpec(name, table, _stage_table(name, table, columns), columns, merge)
+
+
+# Порядок важен: пользователи импортируются первыми
+SPECS = (
+    _spec("users", User, USER_COLUMNS, _merge_users),
+    _spec("user_courses", UserCourse,
+          ("telegram_id", "course_id", "purchased_at", "completed_at", "is_completed"), _merge_user_courses),
+    _spec("user_progress", UserProgress,
+          ("telegram_id", "lesson_id", "completed", "completed_at", "watch_time"), _merge_user_progress),
+    _spec("user_achievements", UserAchievement,
+          ("telegram_id", "achievement_id", "earned_at"), _merge_user_achievements),
+    _spec("favorites", Favorite, ("telegram_id", "course_id", "created_at"), _merge_favorites),
+    _spec("payments", Payment,
+          ("telegram_id", "course_id", "amount", "yookassa_payment_id", "status",
+           "payment_method", "created_at", "paid_at"), _merge_payments),
+)